@@ -1,31 +1,43 @@
+"""
+Growth/Equity section of every AMFI workbook in amfi_downloads.
+
+The extraction engine lives in the Django app, so run from the repository
+root with market_project on the import path:
+
+    PYTHONPATH=market_project python AMFI_MANIPULATION.py
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
 import pandas as pd
 from pathlib import Path
 
+from market_data.services.amfi_reader import (
+    PANDAS_READER,
+    READERS,
+    STREAM_READER,
+    stream_section,
+)
+from market_data.services.amfi_sections import (
+    SectionNotFound,
+    extract_section,
+)
+
 # ==========================
 # CONFIG
 # ==========================
 input_dir = Path("amfi_downloads")
 output_dir = Path("extracted_growth_equity")
-output_dir.mkdir(exist_ok=True)
-
-START_KEYWORDS = ["growth", "equity", "oriented"]
-END_KEYWORDS = ["sub total", "subtotal", "sub-total"]
 
-HEADER_KEYWORDS = [
-    "scheme", "schemes",
-    "net", "assets",
-    "aum",
-    "rs.", "₹"
-]
 
 # ==========================
-# PROCESS FILES
+# PROCESS ONE FILE
 # ==========================
-for file in input_dir.iterdir():
-    if file.suffix not in [".xls", ".xlsx"]:
-        continue
-
-    print(f"\nProcessing {file.name}")
+def read_section(file):
+    """
+    Whole-sheet pandas read, then the shared section engine.
+    """
 
     # --------------------------
     # READ EXCEL (robust)
@@ -36,64 +48,41 @@ for file in input_dir.iterdir():
         try:
             df_raw = pd.read_excel(file, header=None, engine="xlrd")
         except Exception as e:
-            print(f"  ❌ Failed to read file: {e}")
-            continue
-
-    df_raw = df_raw.astype(str)
-
-    # --------------------------
-    # DETECT HEADER ROW
-    # --------------------------
-    header_row = None
-    for i, row in df_raw.iterrows():
-        row_text = " ".join(row).lower()
-        if any(k in row_text for k in HEADER_KEYWORDS):
-            header_row = i
-            break
-
-    if header_row is None:
-        print("  ❌ Header row not found")
-        continue
+            raise OSError(f"Failed to read file: {e}")
 
     # --------------------------
-    # FIX HEADERS
+    # FIND GROWTH / EQUITY SECTION
     # --------------------------
-    df = df_raw.copy()
-    df.columns = df.iloc[header_row]
-    df = df.iloc[header_row + 1:].reset_index(drop=True)
+    return extract_section(df_raw, include_end=True)
 
-    # remove junk columns
-    df = df.loc[:, df.columns.notna()]
-    df = df.loc[:, ~df.columns.astype(str).str.contains("nan", case=False)]
 
-    df_str = df.astype(str)
+def stream_read_section(file):
+    """
+    Lazy row-by-row read that stops at the section's Sub Total.
+    """
+    try:
+        section = stream_section(file, include_end=True)
+    except SectionNotFound:
+        raise
+    except Exception as e:
+        raise OSError(f"Failed to read file: {e}")
 
-    # --------------------------
-    # FIND START ROW
-    # --------------------------
-    start_idx = None
-    for i, row in df_str.iterrows():
-        if all(k in " ".join(row).lower() for k in START_KEYWORDS):
-            start_idx = i
-            break
+    return pd.DataFrame(section.rows, columns=section.labels)
 
-    # --------------------------
-    # FIND END ROW
-    # --------------------------
-    end_idx = None
-    for i in range(start_idx + 1 if start_idx is not None else 0, len(df)):
-        if any(k in " ".join(df_str.iloc[i]).lower() for k in END_KEYWORDS):
-            end_idx = i
-            break
 
-    if start_idx is None or end_idx is None:
-        print("  ❌ Growth / Equity section not found")
-        continue
-
-    # --------------------------
-    # SLICE SECTION
-    # --------------------------
-    section_df = df.iloc[start_idx:end_idx + 1].copy()
+def process_file(file, reader=PANDAS_READER):
+    """
+    Extract the Growth / Equity section of one report into
+    extracted_growth_equity/. Runs in a worker process, so it returns
+    a (status, message) pair instead of printing.
+    """
+    try:
+        if reader == STREAM_READER:
+            section_df = stream_read_section(file)
+        else:
+            section_df = read_section(file)
+    except (OSError, SectionNotFound) as e:
+        return False, str(e)
 
     # --------------------------
     # REMOVE CATEGORY HEADER ROWS
@@ -106,13 +95,7 @@ for file in input_dir.iterdir():
     section_df = section_df.dropna(
         subset=numeric_cols,
         how="all"
-    )
-
-    # --------------------------
-    # FINAL CLEANUP
-    # --------------------------
-    section_df = section_df.loc[:, section_df.columns.notna()]
-    section_df = section_df.reset_index(drop=True)
+    ).reset_index(drop=True)
 
     # --------------------------
     # SAVE
@@ -120,6 +103,65 @@ for file in input_dir.iterdir():
     output_file = output_dir / f"{file.stem}_growth_equity.xlsx"
     section_df.to_excel(output_file, index=False)
 
-    print(f"  ✅ Saved → {output_file.name}")
+    return True, f"Saved → {output_file.name}"
+
+
+def safe_process_file(file, reader=PANDAS_READER):
+    try:
+        return process_file(file, reader)
+    except Exception as e:
+        return False, f"{type(e).__name__}: {e}"
+
+
+# ==========================
+# PROCESS FILES
+# ==========================
+def main():
+    parser = argparse.ArgumentParser(
+        description="Extract the Growth / Equity section of every AMFI report"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of parallel processes (default: 1)",
+    )
+    parser.add_argument(
+        "--reader",
+        choices=READERS,
+        default=PANDAS_READER,
+        help="pandas: load whole sheets; stream: read rows lazily and "
+             "stop at the Growth/Equity Sub Total",
+    )
+    args = parser.parse_args()
+
+    output_dir.mkdir(exist_ok=True)
+
+    # sorted, so the log reads the same on every run
+    files = sorted(
+        file for file in input_dir.iterdir()
+        if file.suffix in [".xls", ".xlsx"]
+    )
+
+    process = partial(safe_process_file, reader=args.reader)
+
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(process, files))
+    else:
+        results = [process(file) for file in files]
+
+    failed = 0
+    for file, (ok, message) in zip(files, results):
+        print(f"\nProcessing {file.name}")
+        print(f"  {'✅' if ok else '❌'} {message}")
+        failed += not ok
+
+    if failed:
+        print(f"\n⚠ {failed} of {len(files)} file(s) failed.")
+    else:
+        print("\n🎯 All files processed successfully.")
+
 
-print("\n🎯 All files processed successfully.")
+if __name__ == "__main__":
+    main()
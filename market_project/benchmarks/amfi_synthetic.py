@@ -0,0 +1,215 @@
+"""
+Synthetic AMFI monthly report generator.
+
+Writes workbooks with the AMFI layout (title row, header row, Income/Debt,
+Growth/Equity and Hybrid sections with Sub Totals, trailing notes) so the
+ingestion pipeline can be measured at any scale.
+
+    python benchmarks/amfi_synthetic.py OUT_DIR [--years 5] [--categories 11]
+        [--noise-rows 20] [--format xls|xlsx]
+"""
+import argparse
+import calendar
+import random
+from pathlib import Path
+
+
+MONTHS = [
+    "jan", "feb", "mar", "apr", "may", "jun",
+    "jul", "aug", "sep", "oct", "nov", "dec"
+]
+
+EQUITY_CATEGORIES = [
+    "Multi Cap Fund",
+    "Large Cap Fund",
+    "Large & Mid Cap Fund",
+    "Mid Cap Fund",
+    "Small Cap Fund",
+    "Dividend Yield Fund",
+    "Value Fund/Contra Fund",
+    "Focused Fund",
+    "Sectoral/Thematic Funds",
+    "ELSS",
+    "Flexi Cap Fund",
+]
+
+DEBT_CATEGORIES = [
+    "Overnight Fund",
+    "Liquid Fund",
+    "Ultra Short Duration Fund",
+    "Low Duration Fund",
+    "Money Market Fund",
+    "Short Duration Fund",
+    "Corporate Bond Fund",
+    "Gilt Fund",
+]
+
+HYBRID_CATEGORIES = [
+    "Conservative Hybrid Fund",
+    "Balanced Hybrid Fund/Aggressive Hybrid Fund",
+    "Dynamic Asset Allocation/Balanced Advantage Fund",
+    "Multi Asset Allocation Fund",
+    "Arbitrage Fund",
+]
+
+ROMAN = [
+    "i", "ii", "iii", "iv", "v", "vi", "vii", "viii", "ix", "x",
+    "xi", "xii", "xiii", "xiv", "xv", "xvi", "xvii", "xviii", "xix", "xx",
+]
+
+
+def roman(n):
+    return ROMAN[n] if n < len(ROMAN) else str(n + 1)
+
+
+def equity_categories(count):
+    names = EQUITY_CATEGORIES[:count]
+    names += [f"Thematic Fund {i}" for i in range(count - len(names))]
+    return names
+
+
+# ======================================================
+# SHEET LAYOUT
+# ======================================================
+
+def report_rows(year, month_index, categories, noise_rows, rng):
+    """
+    The cell grid of one monthly report: a list of 11-cell rows, None for
+    blank cells.
+    """
+    month_name = calendar.month_name[month_index]
+    last_day = calendar.monthrange(year, month_index)[1]
+    as_on = f"{month_name} {last_day}, {year}"
+    blank = [None] * 11
+
+    rows = [
+        blank,
+        [f"Monthly Report for the month of {month_name} {year}"] + [None] * 10,
+        [
+            "Sr ",
+            "Scheme Name ",
+            f"No. of Schemes as on {as_on}",
+            f"No. of Folios as on {as_on}",
+            f"Funds Mobilized for the month of {month_name} {year} (INR in crore)",
+            f"Repurchase/Redemption for the month of {month_name} {year} (INR in crore)",
+            f"Net Inflow (+ve)/Outflow (-ve) for the month of {month_name} {year} (INR in crore)",
+            f"Net Assets Under Management as on {as_on} (INR in crore)",
+            f"Average Net Assets Under Management for the month {month_name} {year} (INR in crore)",
+            f"No. of segregated portfolios created as on {as_on}",
+            f"Net Assets Under Management in segregated portfolio as on {as_on} (INR in crore)",
+        ],
+        ["A", "Open ended Schemes"] + [None] * 9,
+    ]
+
+    def section(number, title, names):
+        rows.append([number, title] + [None] * 9)
+        totals = [0.0] * 9
+        for i, name in enumerate(names):
+            mobilised = rng.uniform(100, 10000)
+            redeemed = rng.uniform(100, 10000)
+            aum = rng.uniform(5000, 500000)
+            values = [
+                rng.randint(5, 250),
+                rng.randint(10000, 30000000),
+                mobilised,
+                redeemed,
+                mobilised - redeemed,
+                aum,
+                aum * rng.uniform(0.97, 1.03),
+                0,
+                0,
+            ]
+            totals = [t + v for t, v in zip(totals, values)]
+            rows.append([roman(i), name] + values)
+        rows.append([None, f"Sub Total - {number} (i+ii+...)"] + totals)
+        rows.append(blank)
+
+    section("I", "Income/Debt Oriented Schemes", DEBT_CATEGORIES)
+    section("II", "Growth/Equity Oriented Schemes", categories)
+    section("III", "Hybrid Schemes", HYBRID_CATEGORIES)
+
+    for i in range(noise_rows):
+        rows.append([None, f"Note {i + 1}: figures are provisional and subject to revision."] + [None] * 9)
+
+    return rows
+
+
+# ======================================================
+# WRITERS
+# ======================================================
+
+def _write_xlsx(path, rows):
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Report")
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def _write_xls(path, rows):
+    import xlwt
+
+    wb = xlwt.Workbook()
+    ws = wb.add_sheet("Report")
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            if value is not None:
+                ws.write(r, c, value)
+    wb.save(str(path))
+
+
+def write_report(path, year, month_index, categories=len(EQUITY_CATEGORIES),
+                 noise_rows=20, seed=None):
+    """
+    Write one synthetic report; the format follows the file extension.
+    Returns the Growth/Equity category names it contains.
+    """
+    path = Path(path)
+    rng = random.Random(seed if seed is not None else f"{year}-{month_index}")
+    names = equity_categories(categories)
+    rows = report_rows(year, month_index, names, noise_rows, rng)
+
+    if path.suffix == ".xlsx":
+        _write_xlsx(path, rows)
+    else:
+        _write_xls(path, rows)
+    return names
+
+
+def generate(out_dir, years=5, categories=len(EQUITY_CATEGORIES), noise_rows=20,
+             fmt="xls", last_year=2025):
+    """
+    One report per month for ``years`` years ending with ``last_year``,
+    named like the AMFI originals (am<mon><year>repo.<fmt>).
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = []
+    for year in range(last_year - years + 1, last_year + 1):
+        for month_index, month in enumerate(MONTHS, start=1):
+            path = out_dir / f"am{month}{year}repo.{fmt}"
+            write_report(path, year, month_index, categories, noise_rows)
+            paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--categories", type=int, default=len(EQUITY_CATEGORIES))
+    parser.add_argument("--noise-rows", type=int, default=20)
+    parser.add_argument("--format", choices=["xls", "xlsx"], default="xls")
+    args = parser.parse_args()
+
+    paths = generate(
+        args.out_dir, args.years, args.categories, args.noise_rows, args.format
+    )
+    print(f"Wrote {len(paths)} report(s) to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
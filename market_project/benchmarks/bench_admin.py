@@ -0,0 +1,204 @@
+"""
+AmfiMonthlyData admin changelist latency and query count against table
+size, with the stock ModelAdmin behaviour and with the cached one.
+
+Fills a scratch SQLite database with ``--rows`` synthetic rows per level
+(plus their MonthlyBucketSummary rows), then loads changelist pages as a
+superuser: unfiltered, filtered by year, by year and month, and a deep
+page. "stock" patches the admin back to full COUNTs (Paginator,
+show_full_result_count), filter lookups scanned from the table and an
+ordering the admin has to complete with "-pk";
+"cached" is the admin as shipped, measured cold (empty cache, as after an
+ingest) and warm. Reported: median milliseconds over ``--repeat`` loads
+and queries per load.
+
+    python benchmarks/bench_admin.py [--rows 20000,100000,400000]
+        [--repeat 5] [--output results.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from django_env import setup_django  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+CATEGORIES = 200
+
+URL = "/admin/market_data/amfimonthlydata/"
+
+
+def fill(total_rows):
+    """
+    Top the table up to ``total_rows`` rows: CATEGORIES categories per
+    month, months counting up from January 1900.
+    """
+    from market_data.models import AmfiMonthlyData, SchemeCategory
+    from market_data.services.amfi_analytics import rebuild_bucket_summaries
+
+    categories = list(SchemeCategory.objects.filter(name__startswith="Bench "))
+    if not categories:
+        SchemeCategory.objects.bulk_create(
+            SchemeCategory(name=f"Bench {i:03d}", bucket="small_cap" if i % 7 else "")
+            for i in range(CATEGORIES)
+        )
+        categories = list(SchemeCategory.objects.filter(name__startswith="Bench "))
+
+    existing = AmfiMonthlyData.objects.count()
+    batch = []
+    for n in range(existing, total_rows):
+        month_number, column = divmod(n, CATEGORIES)
+        period = date(1900 + month_number // 12, month_number % 12 + 1, 1)
+        batch.append(AmfiMonthlyData(
+            month=period.strftime("%B %Y"),
+            period=period,
+            category=categories[column],
+            net_inflow=float(n % 997) - 498.5,
+        ))
+        if len(batch) == 5000:
+            AmfiMonthlyData.objects.bulk_create(batch)
+            batch = []
+    AmfiMonthlyData.objects.bulk_create(batch)
+    rebuild_bucket_summaries()
+
+
+def pages(total_rows):
+    last_year = 1900 + (total_rows // CATEGORIES - 1) // 12
+    return {
+        "all": {},
+        "year": {"year": last_year},
+        "year+month": {"year": last_year, "month_num": 6},
+        "page 100": {"p": 100},
+    }
+
+
+def stock_period_index():
+    # the lookups as the filters used to build them: distinct months
+    # read from every AmfiMonthlyData row on each load
+    from market_data.models import AmfiMonthlyData
+    from market_data.services.amfi_admin_cache import build_period_index
+
+    return build_period_index(AmfiMonthlyData.objects.dates("period", "month"))
+
+
+def stock_admin():
+    from django.core.paginator import Paginator
+
+    from market_data.admin import AmfiMonthlyDataAdmin
+
+    return mock.patch.multiple(
+        AmfiMonthlyDataAdmin,
+        paginator=Paginator,
+        show_full_result_count=True,
+        ordering=("period", "category_id"),
+    ), mock.patch("market_data.admin.period_index", stock_period_index)
+
+
+def load(client, params):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = client.get(URL, params)
+        seconds = time.perf_counter() - started
+    assert response.status_code == 200, response.status_code
+    return seconds, len(queries)
+
+
+def measure(client, params, repeat):
+    timings, counts = [], set()
+    for _ in range(repeat):
+        seconds, queries = load(client, params)
+        timings.append(seconds)
+        counts.add(queries)
+    return {
+        "ms": round(statistics.median(timings) * 1000, 2),
+        "queries": max(counts),
+    }
+
+
+def run_level(client, total_rows, repeat):
+    from django.core.cache import cache
+
+    fill(total_rows)
+    results = {}
+    for name, params in pages(total_rows).items():
+        patches = stock_admin()
+        for patch in patches:
+            patch.start()
+        try:
+            load(client, params)
+            stock = measure(client, params, repeat)
+        finally:
+            for patch in patches:
+                patch.stop()
+
+        cache.clear()
+        seconds, queries = load(client, params)
+        results[name] = {
+            "stock": stock,
+            "cached_cold": {"ms": round(seconds * 1000, 2), "queries": queries},
+            "cached_warm": measure(client, params, repeat),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--rows",
+        type=lambda v: [int(x) for x in v.split(",")],
+        default=[20000, 100000, 400000],
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="JSON results path")
+    args = parser.parse_args()
+
+    levels = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        setup_django(
+            Path(scratch) / "bench.sqlite3",
+            DEBUG=False,
+            ALLOWED_HOSTS=["testserver"],
+        )
+        from django.contrib.auth.models import User
+        from django.test import Client
+
+        client = Client()
+        client.force_login(User.objects.create_superuser("bench", password="bench"))
+        for total_rows in sorted(args.rows):
+            levels[total_rows] = run_level(client, total_rows, args.repeat)
+
+    print(
+        f"\n{'rows':>8}  {'page':<12}{'stock ms':>10}{'q':>4}"
+        f"{'cold ms':>10}{'q':>4}{'warm ms':>10}{'q':>4}"
+    )
+    for total_rows, results in levels.items():
+        for name, row in results.items():
+            print(
+                f"{total_rows:>8}  {name:<12}"
+                + "".join(
+                    f"{row[mode]['ms']:>10.1f}{row[mode]['queries']:>4}"
+                    for mode in ("stock", "cached_cold", "cached_warm")
+                )
+            )
+
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"admin-{time.strftime('%Y%m%d%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"levels": levels}, indent=2))
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+Load test of the AMFI API under one ASGI worker (async views) and one
+threaded WSGI worker (sync views); "asgi_sync" serves the sync views
+through the ASGI handler for reference.
+
+Requests are driven in-process against the Django application objects
+(no HTTP server needed): ``--concurrency`` clients each send requests
+back to back, a mix of summary, batch summaries, compare and columnar
+pivot calls. The WSGI worker serves them on ``--threads`` threads, the
+ASGI worker on a single event loop. Every level reports req/s and
+p50/p95/p99 latency.
+
+    python benchmarks/bench_asgi_wsgi.py [--concurrency 1,8,32,128]
+        [--requests 2000] [--threads 8] [--no-cache] [--db-latency MS]
+        [--output results.json]
+
+--no-cache bypasses the response cache so every request reaches the
+ORM; --db-latency adds a blocking delay per query to mimic a database
+across the network.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from django_env import setup_django  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# asgi_sync: the sync views behind the ASGI handler, for reference
+MODES = ["wsgi", "asgi", "asgi_sync"]
+
+YEARS = range(2021, 2026)
+MONTH_NAMES = [
+    "January", "February", "March", "April", "May", "June", "July",
+    "August", "September", "October", "November", "December",
+]
+CATEGORIES = [
+    "Large Cap Fund", "Mid Cap Fund", "Small Cap Fund", "Flexi Cap Fund",
+    "ELSS", "Focused Fund", "Value Fund/Contra Fund", "Sectoral/Thematic Funds",
+    "Multi Cap Fund", "Large & Mid Cap Fund", "Dividend Yield Fund",
+]
+
+
+def month_labels():
+    return [f"{name} {year}" for year in YEARS for name in MONTH_NAMES]
+
+
+def request_mix():
+    """
+    (path, query string) pairs cycled through by every client.
+    """
+    from urllib.parse import urlencode
+
+    months = month_labels()
+    mix = []
+    for i, month in enumerate(months):
+        mix.append(("/api/amfi/summary/", urlencode({"month": month})))
+        mix.append(("/api/amfi/compare/", urlencode(
+            {"from": months[i - 1], "to": month}
+        )))
+        if i % 6 == 0:
+            mix.append(("/api/amfi/summaries/", urlencode(
+                {"months": ",".join(months[max(0, i - 24):i + 1])}
+            )))
+            mix.append(("/api/amfi/year-summary/", urlencode(
+                {"from": YEARS[0], "to": YEARS[-1], "format": "columnar"}
+            )))
+    return mix
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, round((len(sorted_values) - 1) * q / 100))
+    return sorted_values[index]
+
+
+def summarize(latencies, wall, errors):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(wall, 4),
+        "requests_per_second": round(len(latencies) / wall, 1),
+        **{
+            f"p{q}_ms": round(percentile(latencies, q) * 1000, 2)
+            for q in (50, 95, 99)
+        },
+    }
+
+
+# ======================================================
+# WORKER SETUP (runs in a subprocess per mode)
+# ======================================================
+
+def prepare(mode, db_path, no_cache, db_latency_ms):
+    os.environ["AMFI_ASYNC_VIEWS"] = "1" if mode == "asgi" else "0"
+
+    caches = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+    if no_cache:
+        caches["default"] = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+
+    setup_django(
+        db_path, DEBUG=False, ALLOWED_HOSTS=["localhost"], CACHES=caches,
+    )
+
+    from market_data.services.amfi_ingest import upsert_month
+
+    for i, month in enumerate(month_labels()):
+        upsert_month(month, [
+            (category, float((i * 7 + j * 13) % 500 - 250))
+            for j, category in enumerate(CATEGORIES)
+        ])
+
+    if db_latency_ms:
+        from django.db.backends.signals import connection_created
+
+        def slow_query(execute, sql, params, many, context):
+            time.sleep(db_latency_ms / 1000)
+            return execute(sql, params, many, context)
+
+        def install(sender, connection, **kwargs):
+            # fires on every reconnect of the same wrapper object
+            if slow_query not in connection.execute_wrappers:
+                connection.execute_wrappers.append(slow_query)
+
+        connection_created.connect(install, weak=False)
+        from django.db import connections
+        connections.close_all()
+
+
+# ======================================================
+# DRIVERS
+# ======================================================
+
+def run_wsgi(concurrency, total, threads):
+    from django.core.wsgi import get_wsgi_application
+    from io import BytesIO
+
+    app = get_wsgi_application()
+    mix = request_mix()
+    server_slots = threading.Semaphore(threads)
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def call(path, query):
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "HTTP_HOST": "localhost",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": BytesIO(b""),
+            "wsgi.errors": sys.stderr,
+        }
+        status = []
+        body = app(environ, lambda s, h, exc_info=None: status.append(s))
+        b"".join(body)
+        if hasattr(body, "close"):
+            body.close()
+        return int(status[0].split()[0])
+
+    def client():
+        while True:
+            with lock:
+                n = next(counter, None)
+            if n is None:
+                return
+            path, query = mix[n % len(mix)]
+            started = time.perf_counter()
+            with server_slots:
+                status = call(path, query)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                errors[0] += status != 200
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    return summarize(latencies, time.perf_counter() - started, errors[0])
+
+
+def run_asgi(concurrency, total):
+    from django.core.asgi import get_asgi_application
+
+    app = get_asgi_application()
+    mix = request_mix()
+
+    async def call(path, query):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(b"host", b"localhost")],
+            "client": ("127.0.0.1", 50000),
+            "server": ("localhost", 80),
+        }
+        sent_body = False
+        never = asyncio.Event()
+        status = []
+
+        async def receive():
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # the client stays connected until Django cancels this
+            await never.wait()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+
+        await app(scope, receive, send)
+        return status[0]
+
+    async def main():
+        latencies, errors = [], 0
+        counter = iter(range(total))
+
+        async def client():
+            nonlocal errors
+            for n in counter:
+                path, query = mix[n % len(mix)]
+                started = time.perf_counter()
+                status = await call(path, query)
+                latencies.append(time.perf_counter() - started)
+                errors += status != 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return summarize(latencies, time.perf_counter() - started, errors)
+
+    return asyncio.run(main())
+
+
+def worker(args):
+    with tempfile.TemporaryDirectory() as scratch:
+        prepare(args.worker, Path(scratch) / "bench.sqlite3", args.no_cache, args.db_latency)
+
+        levels = {}
+        for concurrency in args.concurrency:
+            if args.worker in ("asgi", "asgi_sync"):
+                levels[concurrency] = run_asgi(concurrency, args.requests)
+            else:
+                levels[concurrency] = run_wsgi(concurrency, args.requests, args.threads)
+    print(json.dumps(levels))
+
+
+# ======================================================
+# CLI
+# ======================================================
+
+def print_report(results, levels):
+    print(
+        f"\n{'clients':>8}  {'mode':<10}{'req/s':>9}{'p50 ms':>9}"
+        f"{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+    )
+    for concurrency in levels:
+        for mode in MODES:
+            row = results[mode][str(concurrency)]
+            print(
+                f"{concurrency:>8}  {mode:<10}{row['requests_per_second']:>9.0f}"
+                f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+                f"{row['errors']:>8}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--concurrency",
+        type=lambda v: [int(x) for x in v.split(",")],
+        default=[1, 8, 32, 128],
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8, help="WSGI worker threads")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--db-latency", type=float, default=0, metavar="MS")
+    parser.add_argument("--output", help="JSON results path")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    results = {}
+    for mode in MODES:
+        command = [
+            sys.executable, __file__, "--worker", mode,
+            "--concurrency", ",".join(map(str, args.concurrency)),
+            "--requests", str(args.requests),
+            "--threads", str(args.threads),
+            "--db-latency", str(args.db_latency),
+        ]
+        if args.no_cache:
+            command.append("--no-cache")
+        output = subprocess.run(command, capture_output=True, text=True, check=True)
+        results[mode] = json.loads(output.stdout.strip().splitlines()[-1])
+
+    print_report(results, args.concurrency)
+
+    document = {
+        "parameters": {
+            "requests": args.requests,
+            "threads": args.threads,
+            "no_cache": args.no_cache,
+            "db_latency_ms": args.db_latency,
+        },
+        "results": results,
+    }
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"asgi-wsgi-{time.strftime('%Y%m%d%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2))
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
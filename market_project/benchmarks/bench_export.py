@@ -0,0 +1,163 @@
+"""
+Memory and throughput of the streaming AMFI export against history size.
+
+Fills a scratch SQLite database with ``--rows`` synthetic AmfiMonthlyData
+rows per level, then drains export_stream for every format (and gzipped
+CSV), recording wall time, output size and Python heap peak (tracemalloc,
+in a separate pass). A "materialized" baseline builds the same CSV from
+list(queryset) to show what the streaming path avoids.
+
+    python benchmarks/bench_export.py [--rows 20000,100000,400000]
+        [--output results.json]
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from django_env import setup_django  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+CATEGORIES = 200
+
+
+def fill(total_rows):
+    """
+    Top the table up to ``total_rows`` rows: CATEGORIES categories per
+    month, months counting up from January 1900.
+    """
+    from market_data.models import AmfiMonthlyData, SchemeCategory
+
+    categories = list(SchemeCategory.objects.filter(name__startswith="Bench "))
+    if not categories:
+        SchemeCategory.objects.bulk_create(
+            SchemeCategory(name=f"Bench {i:03d}", bucket="small_cap" if i % 7 else "")
+            for i in range(CATEGORIES)
+        )
+        categories = list(SchemeCategory.objects.filter(name__startswith="Bench "))
+
+    existing = AmfiMonthlyData.objects.count()
+    batch = []
+    for n in range(existing, total_rows):
+        month_number, column = divmod(n, CATEGORIES)
+        period = date(1900 + month_number // 12, month_number % 12 + 1, 1)
+        batch.append(AmfiMonthlyData(
+            month=period.strftime("%B %Y"),
+            period=period,
+            category=categories[column],
+            net_inflow=float(n % 997) - 498.5,
+        ))
+        if len(batch) == 5000:
+            AmfiMonthlyData.objects.bulk_create(batch)
+            batch = []
+    AmfiMonthlyData.objects.bulk_create(batch)
+
+
+def materialized_csv(qs):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for month, period, category, bucket, net_inflow in list(qs):
+        writer.writerow([month, period.isoformat(), category, bucket, net_inflow])
+    return [buffer.getvalue().encode()]
+
+
+def drain(chunks):
+    size = count = 0
+    for chunk in chunks:
+        size += len(chunk)
+        count += 1
+    return size, count
+
+
+def measure(make_chunks):
+    # timed without tracemalloc, which slows allocation-heavy code several
+    # times over; the heap peak comes from a second, traced pass
+    started = time.perf_counter()
+    size, chunks = drain(make_chunks())
+    seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    drain(make_chunks())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": round(seconds, 4),
+        "output_mb": round(size / 1024 / 1024, 2),
+        "chunks": chunks,
+        "peak_heap_mb": round(peak / 1024 / 1024, 2),
+    }
+
+
+def run_level(total_rows):
+    from market_data.services.amfi_export import (
+        export_queryset,
+        export_stream,
+        parquet_available,
+    )
+
+    fill(total_rows)
+    cases = {
+        "csv": lambda: export_stream("csv", export_queryset()),
+        "csv.gz": lambda: export_stream("csv", export_queryset(), compress=True),
+        "ndjson": lambda: export_stream("ndjson", export_queryset()),
+        "materialized csv": lambda: materialized_csv(export_queryset()),
+    }
+    if parquet_available():
+        cases["parquet"] = lambda: export_stream("parquet", export_queryset())
+
+    results = {}
+    for name, make_chunks in cases.items():
+        results[name] = measure(make_chunks)
+        results[name]["rows_per_second"] = round(
+            total_rows / results[name]["seconds"]
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--rows",
+        type=lambda v: [int(x) for x in v.split(",")],
+        default=[20000, 100000, 400000],
+    )
+    parser.add_argument("--output", help="JSON results path")
+    args = parser.parse_args()
+
+    levels = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        setup_django(Path(scratch) / "bench.sqlite3")
+        for total_rows in sorted(args.rows):
+            levels[total_rows] = run_level(total_rows)
+
+    print(
+        f"\n{'rows':>8}  {'output':<18}{'seconds':>9}{'rows/s':>10}"
+        f"{'MB out':>8}{'heap MB':>9}"
+    )
+    for total_rows, results in levels.items():
+        for name, row in results.items():
+            print(
+                f"{total_rows:>8}  {name:<18}{row['seconds']:>9.2f}"
+                f"{row['rows_per_second']:>10}{row['output_mb']:>8.1f}"
+                f"{row['peak_heap_mb']:>9.2f}"
+            )
+
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"export-{time.strftime('%Y%m%d%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"levels": levels}, indent=2))
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
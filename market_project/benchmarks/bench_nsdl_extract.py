@@ -0,0 +1,136 @@
+"""
+NSDL sector page extraction: the legacy ``pd.read_html`` path (every
+table of the page into DataFrames, as test1.py does) against
+parse_fii_report with the stdlib html.parser and the streaming lxml
+extractor.
+
+Each method runs in its own subprocess, so peak RSS (which also sees
+libxml2's C allocations) is not shared between them. Reported: median
+milliseconds over ``--repeat`` runs, the RSS growth of the first run
+(after a warm-up on a tiny page) and the Python heap peak (tracemalloc).
+
+    python benchmarks/bench_nsdl_extract.py [nsdl_page.html] [--repeat 20]
+        [--output results.json]
+"""
+import argparse
+import io
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_DIR))
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+SAMPLE_PAGE = PROJECT_DIR.parent / "nsdl_page.html"
+
+METHODS = ["pd.read_html", "html.parser", "lxml"]
+
+# parsed once before measuring, so one-off parser set-up (imports,
+# libxml2 initialisation) is not counted as per-page memory
+WARMUP_PAGE = b"<table><tr><td>Sectors</td></tr><tr><td>1</td></tr></table>"
+
+
+def extractor(method):
+    if method == "pd.read_html":
+        import pandas as pd
+
+        # test1.py: every table of the page, only the first one is used
+        return lambda data: pd.read_html(io.StringIO(data.decode("utf-8")))
+
+    from market_data.services.nsdl_fii_extract import parse_fii_report
+
+    if method == "html.parser":
+        return lambda data: parse_fii_report(data.decode("utf-8"), method)
+    return lambda data: parse_fii_report(data, method)
+
+
+def max_rss_mb():
+    # kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def worker(args):
+    data = Path(args.page).read_bytes()
+    extract = extractor(args.worker)
+
+    try:
+        extract(WARMUP_PAGE)
+    except Exception:
+        pass
+
+    before = max_rss_mb()
+    result = extract(data)
+    rss_growth = max_rss_mb() - before
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        extract(data)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    extract(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rows = len(result.rows) if hasattr(result, "rows") else sum(len(df) for df in result)
+    print(json.dumps({
+        "ms": round(statistics.median(timings) * 1000, 2),
+        "rss_growth_mb": round(rss_growth, 2),
+        "peak_heap_mb": round(peak / 1024 / 1024, 2),
+        "output": rows,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("page", nargs="?", default=str(SAMPLE_PAGE))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="JSON results path")
+    parser.add_argument("--worker", choices=METHODS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    results = {}
+    for method in METHODS:
+        output = subprocess.run(
+            [sys.executable, __file__, args.page, "--repeat", str(args.repeat),
+             "--worker", method],
+            capture_output=True, text=True, check=True,
+        )
+        results[method] = json.loads(output.stdout.strip().splitlines()[-1])
+
+    size_kb = Path(args.page).stat().st_size / 1024
+    print(f"\n{Path(args.page).name}: {size_kb:.0f} KB")
+    print(f"{'method':<14}{'ms':>9}{'RSS +MB':>10}{'heap MB':>10}  output")
+    for method, row in results.items():
+        unit = "DataFrame rows" if method == "pd.read_html" else "typed rows"
+        print(
+            f"{method:<14}{row['ms']:>9.2f}{row['rss_growth_mb']:>10.2f}"
+            f"{row['peak_heap_mb']:>10.2f}  {row['output']} {unit}"
+        )
+
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"nsdl-extract-{time.strftime('%Y%m%d%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "page": str(args.page),
+        "repeat": args.repeat,
+        "results": results,
+    }, indent=2))
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Stage-by-stage benchmark of the fetch_amfi_files ingestion pipeline.
+
+Generates synthetic AMFI reports (or uses an existing directory), then
+times each stage separately over every file: read (read_excel), section
+detect, row conversion and DB write (bulk upsert into a scratch SQLite
+database). The streaming reader is timed end-to-end for comparison.
+Results are written as JSON so runs can be compared between commits.
+
+Memory is reported as the process-wide peak RSS. ``--trace-memory`` adds
+the Python heap peak of each stage (tracemalloc, reset before every
+call); tracing slows every stage down, so compare timings only between
+runs with the same setting.
+
+    python benchmarks/bench_pipeline.py [--years 5] [--categories 11]
+        [--noise-rows 20] [--format xls] [--reports-dir DIR]
+        [--trace-memory] [--output results.json] [--compare previous.json]
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from amfi_synthetic import MONTHS, generate  # noqa: E402
+from django_env import PROJECT_DIR, setup_django  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+STAGES = ["read", "detect", "convert", "db_write", "stream_extract"]
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, and a high-water mark for the whole
+    # process: it cannot be split by stage
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def month_label(path):
+    """amnov2025repo.xls -> November 2025"""
+    import calendar
+
+    stem = path.stem
+    month = stem[2:5]
+    year = stem[5:9]
+    return f"{calendar.month_name[MONTHS.index(month) + 1]} {year}"
+
+
+class StageTimer:
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.seconds = {stage: 0.0 for stage in STAGES}
+        # bytes, largest single call of the stage (only when tracing)
+        self.peak_heap = {stage: 0 for stage in STAGES}
+
+    def run(self, stage, func, *args):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+
+        started = time.perf_counter()
+        result = func(*args)
+        self.seconds[stage] += time.perf_counter() - started
+
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1] - before
+            self.peak_heap[stage] = max(self.peak_heap[stage], peak)
+        return result
+
+
+def run_benchmark(paths, db_path, trace_memory=False):
+    import pandas as pd
+
+    setup_django(db_path)
+
+    from market_data.services.amfi_categories import CategoryMap
+    from market_data.services.amfi_ingest import upsert_month
+    from market_data.services.amfi_reader import stream_section_rows
+    from market_data.services.amfi_sections import locate_section, section_rows
+
+    def read_sheet(path):
+        return pd.read_excel(path, header=None)
+
+    timer = StageTimer(trace_memory)
+    total_rows = total_bytes = 0
+    category_map = CategoryMap.load()
+    if trace_memory:
+        tracemalloc.start()
+
+    for path in paths:
+        total_bytes += path.stat().st_size
+
+        df_raw = timer.run("read", read_sheet, path)
+        bounds = timer.run("detect", locate_section, df_raw)
+        rows = timer.run("convert", section_rows, df_raw, bounds)
+        timer.run("db_write", upsert_month, month_label(path), rows, category_map)
+
+        streamed = timer.run("stream_extract", stream_section_rows, path)
+        if streamed != rows:
+            print(f"  ! {path.name}: streaming reader disagrees with pandas path")
+
+        total_rows += len(rows)
+
+    if trace_memory:
+        tracemalloc.stop()
+
+    files = len(paths)
+    stages = {}
+    for stage in STAGES:
+        seconds = timer.seconds[stage]
+        stages[stage] = {
+            "seconds": round(seconds, 6),
+            "ms_per_file": round(seconds * 1000 / files, 3),
+            "files_per_second": round(files / seconds, 2) if seconds else None,
+            "rows_per_second": round(total_rows / seconds, 1) if seconds else None,
+        }
+        if trace_memory:
+            stages[stage]["peak_heap_mb"] = round(timer.peak_heap[stage] / 1024 / 1024, 2)
+
+    pipeline_seconds = sum(
+        timer.seconds[stage] for stage in ["read", "detect", "convert", "db_write"]
+    )
+    return {
+        "files": files,
+        "rows": total_rows,
+        "input_mb": round(total_bytes / 1024 / 1024, 3),
+        "stages": stages,
+        "pipeline_seconds": round(pipeline_seconds, 6),
+        "trace_memory": trace_memory,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def print_report(result, previous=None):
+    print(
+        f"\n{result['files']} files, {result['rows']} rows, "
+        f"{result['input_mb']} MB input, peak RSS {result['peak_rss_mb']} MB\n"
+    )
+    traced = result.get("trace_memory")
+    header = f"{'stage':<16}{'total s':>10}{'ms/file':>10}{'rows/s':>12}"
+    if traced:
+        header += f"{'heap MB':>9}"
+    if previous:
+        header += f"{'vs prev':>10}"
+    print(header)
+
+    for stage, numbers in result["stages"].items():
+        line = (
+            f"{stage:<16}{numbers['seconds']:>10.3f}{numbers['ms_per_file']:>10.2f}"
+            f"{numbers['rows_per_second'] or 0:>12.0f}"
+        )
+        if traced:
+            line += f"{numbers['peak_heap_mb']:>9.2f}"
+        before = previous and previous["stages"].get(stage)
+        if before and before["seconds"]:
+            line += f"{numbers['seconds'] / before['seconds']:>9.2f}x"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--categories", type=int, default=11)
+    parser.add_argument("--noise-rows", type=int, default=20)
+    parser.add_argument("--format", choices=["xls", "xlsx"], default="xls")
+    parser.add_argument(
+        "--reports-dir",
+        help="Benchmark existing reports instead of generating synthetic ones",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Report each stage's Python heap peak (slows every stage down)",
+    )
+    parser.add_argument("--output", help="JSON results path")
+    parser.add_argument("--compare", help="Earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        scratch = Path(scratch)
+
+        if args.reports_dir:
+            paths = sorted(Path(args.reports_dir).glob("am*repo.xls*"))
+        else:
+            paths = generate(
+                scratch / "reports", args.years, args.categories,
+                args.noise_rows, args.format,
+            )
+        if not paths:
+            sys.exit("No reports to benchmark")
+
+        result = run_benchmark(paths, scratch / "bench.sqlite3", args.trace_memory)
+
+    document = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "parameters": {
+            "years": args.years,
+            "categories": args.categories,
+            "noise_rows": args.noise_rows,
+            "format": args.format,
+            "reports_dir": args.reports_dir,
+        },
+        **result,
+    }
+
+    previous = None
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text())
+
+    print_report(document, previous)
+
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"pipeline-{document['commit']}-{datetime.now():%Y%m%d%H%M%S}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2))
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
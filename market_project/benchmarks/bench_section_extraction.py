@@ -0,0 +1,126 @@
+"""
+Section-detection benchmark: legacy iterrows keyword scan vs. the
+vectorized engine in market_data.services.amfi_sections.
+
+Each workbook is read once; only header / section detection and row
+conversion are timed.
+
+    python benchmarks/bench_section_extraction.py [amfi_downloads] [--repeat N]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from market_data.services.amfi_sections import section_rows  # noqa: E402
+
+
+START_KEYWORDS = ["growth", "equity", "oriented"]
+END_KEYWORDS = ["sub total", "subtotal", "sub-total"]
+HEADER_KEYWORDS = ["scheme", "net", "assets", "aum", "rs.", "₹"]
+
+
+def legacy_section_rows(df_raw):
+    """
+    The pre-engine fetch_amfi_files logic, kept verbatim as the baseline.
+    """
+    df_raw = df_raw.astype(str)
+
+    header_row = None
+    for i, row in df_raw.iterrows():
+        if any(k in " ".join(row).lower() for k in HEADER_KEYWORDS):
+            header_row = i
+            break
+
+    df = df_raw.copy()
+    df.columns = df.iloc[header_row]
+    df = df.iloc[header_row + 1:].reset_index(drop=True)
+    df = df.loc[:, df.columns.notna()]
+    df_str = df.astype(str)
+
+    start_idx, end_idx = None, None
+    for i, row in df_str.iterrows():
+        if all(k in " ".join(row).lower() for k in START_KEYWORDS):
+            start_idx = i
+            break
+
+    for i in range(start_idx + 1, len(df_str)):
+        if any(k in " ".join(df_str.iloc[i]).lower() for k in END_KEYWORDS):
+            end_idx = i
+            break
+
+    section_df = df.iloc[start_idx:end_idx].copy()
+    section_df = section_df.dropna(how="all").reset_index(drop=True)
+
+    rows = []
+    for _, row in section_df.iterrows():
+        scheme = str(row.iloc[1]).strip()
+        net_inflow = row.iloc[6]
+        if (
+            not scheme
+            or "sub total" in scheme.lower()
+            or "growth/equity" in scheme.lower()
+            or pd.isna(net_inflow)
+        ):
+            continue
+        try:
+            rows.append((scheme, float(net_inflow)))
+        except ValueError:
+            continue
+    return tuple(rows)
+
+
+def best_of(func, df_raw, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(df_raw)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "directory",
+        nargs="?",
+        default=str(Path(__file__).resolve().parents[2] / "amfi_downloads"),
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    files = sorted(Path(args.directory).glob("*.xls*"))
+    if not files:
+        sys.exit(f"No reports found in {args.directory}")
+
+    print(f"{'file':<24}{'rows':>6}{'legacy ms':>12}{'engine ms':>12}{'speedup':>10}")
+
+    total_legacy = total_engine = 0.0
+    for path in files:
+        df_raw = pd.read_excel(path, header=None)
+
+        legacy, legacy_rows = best_of(legacy_section_rows, df_raw, args.repeat)
+        engine, engine_rows = best_of(section_rows, df_raw, args.repeat)
+
+        if [r[0] for r in legacy_rows] != [r[0] for r in engine_rows]:
+            print(f"  ! {path.name}: engine output differs from legacy")
+
+        total_legacy += legacy
+        total_engine += engine
+        print(
+            f"{path.name:<24}{len(engine_rows):>6}"
+            f"{legacy * 1000:>12.2f}{engine * 1000:>12.2f}{legacy / engine:>9.1f}x"
+        )
+
+    print(
+        f"{'TOTAL':<24}{'':>6}{total_legacy * 1000:>12.2f}"
+        f"{total_engine * 1000:>12.2f}{total_legacy / total_engine:>9.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
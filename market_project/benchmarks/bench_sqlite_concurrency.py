@@ -0,0 +1,314 @@
+"""
+API read latency while a bulk ingest writes, under the stock SQLite
+settings ("default") and the production profile (WAL, pragmas,
+IMMEDIATE transactions, persistent connections; see settings.py).
+
+Each profile runs in its own subprocess against a fresh scratch
+database seeded with ``--history`` months. ``--readers`` threads then
+send API requests through the WSGI application (response cache off, so
+every request reads the database) while a separate ingest process, like
+the cron job, writes ``--months`` more months with upsert_month, one
+short transaction per month. Reported: read p50/p95/p99/max, failed
+reads ("database is locked" and other 500s), reads/s and the ingest's
+wall time and errors, overall and per endpoint.
+
+    python benchmarks/bench_sqlite_concurrency.py [--readers 8]
+        [--history 120] [--months 240] [--categories 40]
+        [--output results.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from django_env import setup_django  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+PROFILES = ["default", "production"]
+
+MONTH_NAMES = [
+    "January", "February", "March", "April", "May", "June", "July",
+    "August", "September", "October", "November", "December",
+]
+
+
+def month_label(n):
+    return f"{MONTH_NAMES[n % 12]} {2000 + n // 12}"
+
+
+def month_rows(n, categories):
+    names = ["Small Cap Fund", "Large Cap Fund", "Mid Cap Fund", "ELSS"]
+    names += [f"Category {i:02d}" for i in range(categories - len(names))]
+    return [(name, float((n * 31 + i * 17) % 900 - 450)) for i, name in enumerate(names)]
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, round((len(sorted_values) - 1) * q / 100))
+    return sorted_values[index]
+
+
+def latency_stats(latencies):
+    latencies = sorted(latencies)
+    return {
+        "reads": len(latencies),
+        **{
+            f"p{q}_ms": round(percentile(latencies, q) * 1000, 2)
+            for q in (50, 95, 99)
+        },
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+
+
+# ======================================================
+# WORKERS (a reader and a writer process per profile)
+# ======================================================
+
+def request_mix(history):
+    mix = []
+    for n in range(0, history, 7):
+        mix.append(("/api/amfi/summary/", {"month": month_label(n)}))
+        mix.append(("/api/amfi/compare/", {"from": month_label(n), "to": month_label(n + 1)}))
+        mix.append(("/api/amfi/year-summary/", {"year": 2000 + n // 12}))
+    mix.append(("/api/amfi/timeseries/", {"bucket": "small_cap", "windows": "3,12"}))
+    return [(path, urlencode(params)) for path, params in mix]
+
+
+def setup(profile, db_path):
+    os.environ["AMFI_SQLITE_PROFILE"] = profile
+    os.environ["AMFI_ASYNC_VIEWS"] = "0"
+    setup_django(
+        db_path,
+        DEBUG=False,
+        ALLOWED_HOSTS=["localhost"],
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+    )
+
+
+def ingest(args):
+    """
+    The writer process: set up, report ready, wait for "go" on stdin,
+    ingest, print the result as JSON.
+    """
+    setup(args.profile, args.ingest)
+
+    from market_data.services.amfi_categories import CategoryMap
+    from market_data.services.amfi_ingest import upsert_month
+
+    category_map = CategoryMap.load()
+    print("ready", flush=True)
+    sys.stdin.readline()
+
+    errors = []
+    started = time.perf_counter()
+    for n in range(args.history, args.history + args.months):
+        try:
+            upsert_month(month_label(n), month_rows(n, args.categories), category_map)
+        except Exception as e:
+            errors.append(str(e))
+    seconds = time.perf_counter() - started
+
+    print(json.dumps({
+        "ingest_seconds": round(seconds, 3),
+        "months_per_second": round(args.months / seconds, 1),
+        "write_errors": len(errors),
+        "first_write_error": errors[0] if errors else None,
+    }), flush=True)
+
+
+def worker(args):
+    """
+    The reader process: seed the database, run the reader threads, start
+    the ingest process and measure reads until it finishes.
+    """
+    import logging
+
+    with tempfile.TemporaryDirectory() as scratch:
+        db_path = Path(scratch) / "bench.sqlite3"
+        setup(args.worker, db_path)
+        # failed reads are counted, not printed
+        logging.getLogger("django.request").setLevel(logging.CRITICAL)
+
+        from django.core.wsgi import get_wsgi_application
+        from django.db import connection, connections
+
+        from market_data.services.amfi_categories import CategoryMap
+        from market_data.services.amfi_ingest import upsert_month
+
+        category_map = CategoryMap.load()
+        for n in range(args.history):
+            upsert_month(month_label(n), month_rows(n, args.categories), category_map)
+        journal_mode = connection.cursor().execute("PRAGMA journal_mode").fetchone()[0]
+        connections.close_all()
+
+        app = get_wsgi_application()
+        mix = request_mix(args.history)
+        stop = threading.Event()
+        lock = threading.Lock()
+        latencies, failures = [], [0]
+        by_path = {}
+
+        def call(path, query):
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": path,
+                "QUERY_STRING": query,
+                "SERVER_NAME": "localhost",
+                "SERVER_PORT": "80",
+                "HTTP_HOST": "localhost",
+                "wsgi.url_scheme": "http",
+                "wsgi.input": BytesIO(b""),
+                "wsgi.errors": sys.stderr,
+            }
+            status = []
+            body = app(environ, lambda s, h, exc_info=None: status.append(s))
+            b"".join(body)
+            body.close()
+            return int(status[0].split()[0])
+
+        def reader(offset):
+            n = offset
+            while not stop.is_set():
+                path, query = mix[n % len(mix)]
+                n += 1
+                started = time.perf_counter()
+                status = call(path, query)
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    by_path.setdefault(path, []).append(elapsed)
+                    failures[0] += status != 200
+
+        writer = subprocess.Popen(
+            [
+                sys.executable, __file__, "--ingest", str(db_path),
+                "--profile", args.worker,
+                "--history", str(args.history),
+                "--months", str(args.months),
+                "--categories", str(args.categories),
+            ],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        writer.stdout.readline()
+
+        threads = [
+            threading.Thread(target=reader, args=(i * 13,)) for i in range(args.readers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        # readers warm up (and open their connections) before the ingest
+        time.sleep(0.5)
+        with lock:
+            latencies.clear()
+            by_path.clear()
+            failures[0] = 0
+
+        started = time.perf_counter()
+        writer.stdin.write("go\n")
+        writer.stdin.flush()
+        ingest_result = json.loads(writer.stdout.readline())
+        seconds = time.perf_counter() - started
+        writer.wait()
+
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    print(json.dumps({
+        "journal_mode": journal_mode,
+        "failed_reads": failures[0],
+        "reads_per_second": round(len(latencies) / seconds, 1),
+        **latency_stats(latencies),
+        "endpoints": {path: latency_stats(values) for path, values in by_path.items()},
+        **ingest_result,
+    }))
+
+
+# ======================================================
+# CLI
+# ======================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--history", type=int, default=120, help="months seeded up front")
+    parser.add_argument("--months", type=int, default=240, help="months ingested under load")
+    parser.add_argument("--categories", type=int, default=40)
+    parser.add_argument("--output", help="JSON results path")
+    parser.add_argument("--worker", choices=PROFILES, help=argparse.SUPPRESS)
+    parser.add_argument("--ingest", metavar="DB", help=argparse.SUPPRESS)
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.ingest:
+        ingest(args)
+        return
+    if args.worker:
+        worker(args)
+        return
+
+    results = {}
+    for profile in PROFILES:
+        command = [
+            sys.executable, __file__, "--worker", profile,
+            "--readers", str(args.readers),
+            "--history", str(args.history),
+            "--months", str(args.months),
+            "--categories", str(args.categories),
+        ]
+        output = subprocess.run(command, capture_output=True, text=True, check=True)
+        results[profile] = json.loads(output.stdout.strip().splitlines()[-1])
+
+    print(
+        f"\n{'profile':<12}{'journal':>8}{'reads/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'p99 ms':>9}{'max ms':>9}{'failed':>8}{'ingest s':>10}{'w.err':>7}"
+    )
+    for profile, row in results.items():
+        print(
+            f"{profile:<12}{row['journal_mode']:>8}{row['reads_per_second']:>9.0f}"
+            f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+            f"{row['max_ms']:>9.1f}{row['failed_reads']:>8}"
+            f"{row['ingest_seconds']:>10.2f}{row['write_errors']:>7}"
+        )
+
+    print(f"\n{'endpoint':<26}{'profile':<12}{'reads':>7}{'p50 ms':>9}{'p99 ms':>9}")
+    for path in sorted(results[PROFILES[0]]["endpoints"]):
+        for profile, row in results.items():
+            stats = row["endpoints"].get(path)
+            if stats:
+                print(
+                    f"{path:<26}{profile:<12}{stats['reads']:>7}"
+                    f"{stats['p50_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+                )
+
+    document = {
+        "parameters": {
+            "readers": args.readers,
+            "history": args.history,
+            "months": args.months,
+            "categories": args.categories,
+        },
+        "results": results,
+    }
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"sqlite-concurrency-{time.strftime('%Y%m%d%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2))
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+NSDL USD extraction: the legacy test2.py path (full workbook load,
+ws.cell() copying with a new Font per cell, autosize by rescanning every
+column) against the read-only / write-only styled writer and the
+DataFrame and Parquet data modes.
+
+The source is a synthetic NSDL sector sheet (4 header rows, Sr. No.,
+Sectors, INR and USD blocks for two periods) repeated ``--scale`` times
+the 24 sectors of a real report. Each method runs in its own subprocess;
+reported: wall seconds and peak RSS.
+
+    python benchmarks/bench_usd_extract.py [--scale 1 --scale 100]
+        [--output results.json]
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from copy import copy
+from pathlib import Path
+
+import openpyxl
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_DIR))
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+METHODS = ["legacy", "styled", "dataframe", "parquet"]
+
+SECTORS = 24
+ASSET_CLASSES = ["Equity", "Debt General Limit", "Debt VRR", "Hybrid", "Total"]
+PERIODS = ["AUC as on December 15, 2025", "Net Investment December 01-15, 2025"]
+
+
+# ======================================================
+# SYNTHETIC SOURCE
+# ======================================================
+
+def build_source(path, scale):
+    """
+    A styled sheet shaped like the NSDL sector table: per period an INR
+    and a USD block of every asset class.
+    """
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Sector_Investment_Data"
+    block = len(ASSET_CLASSES)
+
+    ws.append(["", ""] + [p for p in PERIODS for _ in range(2 * block)])
+    ws.append(["", ""] + [c for _ in PERIODS for c in ("IN INR Cr.", "IN USD Mn") for _ in range(block)])
+    ws.append(["", ""] + ASSET_CLASSES * 2 * len(PERIODS))
+    ws.append(["Sr. No.", "Sectors"] + ASSET_CLASSES * 2 * len(PERIODS))
+
+    bold = Font(bold=True)
+    fill = PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")
+    right = Alignment(horizontal="right")
+    width = 2 + 2 * block * len(PERIODS)
+    for n in range(1, SECTORS * scale + 1):
+        ws.append([n, f"Sector {n}"] + [round(n * 1.5 + c, 2) for c in range(width - 2)])
+        row = ws.max_row
+        ws.cell(row, 2).font = bold
+        for col in range(3, width + 1):
+            ws.cell(row, col).alignment = right
+        if n % 2:
+            ws.cell(row, 2).fill = fill
+    ws.append(["", "Grand Total"] + [9999.0] * (width - 2))
+    wb.save(path)
+
+
+# ======================================================
+# LEGACY (test2.py before the rewrite, without the prints)
+# ======================================================
+
+def legacy_extract(excel_file, output_file):
+    wb = openpyxl.load_workbook(excel_file)
+    ws = wb.active
+
+    usd_header_col = None
+    for row_idx in range(1, min(11, ws.max_row + 1)):
+        for col_idx in range(1, ws.max_column + 1):
+            cell_value = ws.cell(row=row_idx, column=col_idx).value
+            if cell_value and "USD" in str(cell_value).upper():
+                usd_header_col = col_idx
+                break
+        if usd_header_col:
+            break
+    sector_col = 2
+
+    new_wb = openpyxl.Workbook()
+    new_ws = new_wb.active
+    for row_idx in range(1, ws.max_row + 1):
+        sources = [sector_col - 1, sector_col] + list(range(usd_header_col, ws.max_column + 1))
+        for new_col, col_idx in enumerate(sources, 1):
+            source_cell = ws.cell(row=row_idx, column=col_idx)
+            target_cell = new_ws.cell(row=row_idx, column=new_col)
+            target_cell.value = source_cell.value
+            target_cell.font = Font(bold=source_cell.font.bold, size=source_cell.font.size)
+            # test2.py assigned the style proxies themselves, which
+            # openpyxl 3.1 rejects across workbooks
+            target_cell.fill = copy(source_cell.fill)
+            target_cell.alignment = copy(source_cell.alignment)
+
+    header_fill = PatternFill(start_color="B8CCE4", end_color="B8CCE4", fill_type="solid")
+    for row in range(1, 5):
+        for col in range(1, new_ws.max_column + 1):
+            cell = new_ws.cell(row=row, column=col)
+            cell.font = Font(bold=True, size=10)
+            cell.fill = header_fill
+            cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+
+    for col_idx in range(1, new_ws.max_column + 1):
+        column_letter = get_column_letter(col_idx)
+        max_length = max((len(str(c.value)) for c in new_ws[column_letter] if c.value), default=0)
+        new_ws.column_dimensions[column_letter].width = max(min(max_length + 2, 50), 12)
+
+    new_wb.save(output_file)
+
+
+# ======================================================
+# MEASURE
+# ======================================================
+
+def run(method, source, output):
+    from market_data.services import nsdl_usd_extract
+
+    if method == "legacy":
+        legacy_extract(source, output)
+    elif method == "styled":
+        nsdl_usd_extract.write_usd_workbook(source, output)
+    elif method == "dataframe":
+        nsdl_usd_extract.usd_dataframe(source)
+    else:
+        nsdl_usd_extract.write_usd_parquet(source, output)
+
+
+def worker(args):
+    output = Path(tempfile.mkdtemp()) / ("out.parquet" if args.worker == "parquet" else "out.xlsx")
+    started = time.perf_counter()
+    run(args.worker, args.source, output)
+    print(json.dumps({
+        "seconds": round(time.perf_counter() - started, 3),
+        # kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, action="append",
+                        help="Sector rows as a multiple of a real report (repeatable)")
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=METHODS)
+    parser.add_argument("--output", help="JSON results path")
+    parser.add_argument("--worker", choices=METHODS, help=argparse.SUPPRESS)
+    parser.add_argument("--source", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    from market_data.services.nsdl_usd_extract import parquet_available
+
+    methods = [m for m in args.methods if m != "parquet" or parquet_available()]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scale or [1, 100]:
+            source = Path(tmp) / f"source-x{scale}.xlsx"
+            build_source(source, scale)
+            size_kb = source.stat().st_size / 1024
+            print(f"\nscale x{scale}: {SECTORS * scale} sector rows, {size_kb:.0f} KB")
+            print(f"{'method':<12}{'seconds':>10}{'peak RSS MB':>14}")
+
+            results[scale] = {}
+            for method in methods:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--worker", method, "--source", str(source)],
+                    capture_output=True, text=True, check=True,
+                )
+                row = json.loads(output.stdout.strip().splitlines()[-1])
+                results[scale][method] = row
+                print(f"{method:<12}{row['seconds']:>10.3f}{row['peak_rss_mb']:>14.1f}")
+
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"usd-extract-{time.strftime('%Y%m%d%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"results": results}, indent=2))
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Django bootstrap for benchmark scripts: points the project at a scratch
+SQLite database so runs never touch db.sqlite3.
+"""
+import os
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+
+
+def setup_django(db_path, **overrides):
+    """
+    Configure Django against ``db_path`` (migrated on the way in).
+    ``overrides`` replace settings, e.g. DEBUG=False.
+    """
+    if str(PROJECT_DIR) not in sys.path:
+        sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "market_project.settings")
+
+    # settings are read lazily, so patching the module first is enough
+    from market_project import settings
+
+    settings.DATABASES["default"]["NAME"] = str(db_path)
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command("migrate", verbosity=0)
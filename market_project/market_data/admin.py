@@ -1,6 +1,29 @@
+import calendar
+from datetime import date
+
 from django.contrib import admin
 from django.contrib.admin import SimpleListFilter
-from .models import AmfiMonthlyData
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.utils.functional import cached_property
+from .models import (
+    AmfiMonthlyData,
+    FiiFortnight,
+    FiiSector,
+    FiiSectorInvestment,
+    SchemeCategory,
+    SchemeCategoryAlias,
+)
+from market_data.services.amfi_admin_cache import cached_count, period_index
+from market_data.services.amfi_analytics import refresh_bucket_summaries
+from market_data.services.amfi_api_cache import bump_version
+from market_data.signals import refresh_deleted_months
+
+
+def _int_param(value, low, high):
+    if value and value.isdigit() and low <= int(value) <= high:
+        return int(value)
+    return None
 
 
 # =========================
@@ -11,17 +34,13 @@ class YearFilter(SimpleListFilter):
     parameter_name = "year"
 
     def lookups(self, request, model_admin):
-        years = (
-            AmfiMonthlyData.objects
-            .values_list("month", flat=True)
-            .distinct()
-        )
-        year_set = sorted({m.split()[-1] for m in years})
-        return [(y, y) for y in year_set]
+        return [(str(year), str(year)) for year in period_index()]
 
     def queryset(self, request, queryset):
-        if self.value():
-            return queryset.filter(month__endswith=self.value())
+        year = _int_param(self.value(), 1, 9999)
+        if year:
+            # BETWEEN Jan 1 and Dec 31: a range scan on the period index
+            return queryset.filter(period__year=year)
         return queryset
 
 
@@ -30,33 +49,34 @@ class YearFilter(SimpleListFilter):
 # =========================
 class MonthFilter(SimpleListFilter):
     title = "Month"
-    parameter_name = "month_name"
-
-    MONTH_ORDER = [
-        "Jan", "Feb", "Mar", "Apr", "May", "Jun",
-        "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"
-    ]
+    parameter_name = "month_num"
 
     def lookups(self, request, model_admin):
-        year = request.GET.get("year")
+        year = _int_param(request.GET.get("year"), 1, 9999)
         if not year:
             return []
 
-        months = (
-            AmfiMonthlyData.objects
-            .filter(month__endswith=year)
-            .values_list("month", flat=True)
-            .distinct()
-        )
-
-        month_set = {m.split()[0] for m in months}
-        ordered_months = [m for m in self.MONTH_ORDER if m in month_set]
-        return [(m, m) for m in ordered_months]
+        months = period_index().get(year, [])
+        return [(str(month), calendar.month_abbr[month]) for month in months]
 
     def queryset(self, request, queryset):
-        if self.value():
-            return queryset.filter(month__startswith=self.value())
-        return queryset
+        month = _int_param(self.value(), 1, 12)
+        if not month:
+            return queryset
+
+        year = _int_param(request.GET.get("year"), 1, 9999)
+        if year:
+            return queryset.filter(period=date(year, month, 1))
+        return queryset.filter(period__month=month)
+
+
+# =========================
+# PAGINATION (count cached per dataset version)
+# =========================
+class CachedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        return cached_count(self.object_list)
 
 
 # =========================
@@ -65,16 +85,95 @@ class MonthFilter(SimpleListFilter):
 @admin.register(AmfiMonthlyData)
 class AmfiMonthlyDataAdmin(admin.ModelAdmin):
     list_display = (
-        "scheme_category",
+        "category",
         "month",
         "net_inflow",
     )
+    list_select_related = ("category",)
 
     list_filter = (
         YearFilter,   # 👈 select Year first
         MonthFilter,  # 👈 then Month appears
     )
 
-    search_fields = ("scheme_category",)
-    ordering = ("month", "scheme_category")
+    search_fields = ("category__name",)
+    # calendar order, read straight off the (period, category) index: SQLite
+    # index entries end with the rowid, so "id" needs no sort step and
+    # makes the order total (the admin would otherwise append "-pk")
+    ordering = ("period", "category_id", "id")
+    list_per_page = 50
+
+    # one COUNT per filter and dataset version, and none for the
+    # unfiltered total shown next to filtered results
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+
+    # saves and deletes refresh MonthlyBucketSummary through the model's
+    # signals (market_data.signals)
+
+    # "delete selected": the rows and the one refresh of their months
+    # commit together
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic(using=queryset.db):
+            super().delete_queryset(request, queryset)
+            refresh_deleted_months(queryset.db)
+
+
+# =========================
+# SCHEME CATEGORIES
+# =========================
+class SchemeCategoryAliasInline(admin.TabularInline):
+    model = SchemeCategoryAlias
+    extra = 1
+
+
+@admin.register(SchemeCategory)
+class SchemeCategoryAdmin(admin.ModelAdmin):
+    list_display = ("name", "bucket", "created_at")
+    list_filter = ("bucket",)
+    search_fields = ("name", "aliases__alias")
+    inlines = [SchemeCategoryAliasInline]
+
+    # a category moving between buckets changes every month it appears in;
+    # a rename changes API output and admin search results
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and "bucket" in form.changed_data:
+            refresh_bucket_summaries(
+                obj.monthly_data.values_list("month", flat=True).distinct()
+            )
+        elif change and "name" in form.changed_data:
+            bump_version()
+
+
+# =========================
+# NSDL FII SECTOR DATA
+# =========================
+@admin.register(FiiSectorInvestment)
+class FiiSectorInvestmentAdmin(admin.ModelAdmin):
+    list_display = (
+        "sector",
+        "fortnight",
+        "asset_class",
+        "currency",
+        "auc",
+        "net_investment",
+    )
+    list_select_related = ("sector", "fortnight")
+    list_filter = ("currency", "asset_class", "fortnight")
+    search_fields = ("sector__name",)
+    # newest fortnight first
+    ordering = ("-fortnight", "sector", "asset_class", "currency")
     list_per_page = 50
+
+
+@admin.register(FiiFortnight)
+class FiiFortnightAdmin(admin.ModelAdmin):
+    list_display = ("start", "end", "period", "source")
+    date_hierarchy = "end"
+
+
+@admin.register(FiiSector)
+class FiiSectorAdmin(admin.ModelAdmin):
+    list_display = ("name", "created_at")
+    search_fields = ("name",)
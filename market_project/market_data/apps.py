@@ -1,5 +1,32 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, pre_delete, pre_save
 
 
 class MarketDataConfig(AppConfig):
     name = 'market_data'
+
+    def ready(self):
+        from market_data.models import AmfiMonthlyData
+        from market_data.signals import (
+            apply_sqlite_pragmas,
+            refresh_saved_month,
+            remember_deleted_month,
+            remember_month,
+        )
+
+        connection_created.connect(
+            apply_sqlite_pragmas, dispatch_uid="market_data.sqlite_pragmas"
+        )
+        pre_save.connect(
+            remember_month, sender=AmfiMonthlyData,
+            dispatch_uid="market_data.remember_month",
+        )
+        post_save.connect(
+            refresh_saved_month, sender=AmfiMonthlyData,
+            dispatch_uid="market_data.refresh_saved_month",
+        )
+        pre_delete.connect(
+            remember_deleted_month, sender=AmfiMonthlyData,
+            dispatch_uid="market_data.remember_deleted_month",
+        )
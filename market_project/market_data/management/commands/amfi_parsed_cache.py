@@ -0,0 +1,67 @@
+from datetime import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from market_data.services import amfi_frame_cache
+
+
+class Command(BaseCommand):
+    help = "Inspect, trim or purge the columnar parsed-sheet cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            default=str(amfi_frame_cache.CACHE_DIR),
+            help="Cache directory (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--purge",
+            action="store_true",
+            help="Delete cached frames",
+        )
+        parser.add_argument(
+            "--older-than",
+            type=float,
+            metavar="DAYS",
+            help="With --purge, only delete frames unused for DAYS days",
+        )
+        parser.add_argument(
+            "--max-size",
+            type=float,
+            metavar="MB",
+            help="Evict least recently used frames until the cache fits MB",
+        )
+
+    def handle(self, *args, **options):
+        cache_dir = Path(options["dir"])
+
+        if options["older_than"] is not None and not options["purge"]:
+            raise CommandError("--older-than requires --purge")
+
+        if options["purge"]:
+            older_than = options["older_than"]
+            removed = amfi_frame_cache.purge(
+                cache_dir,
+                older_than=older_than * 86400 if older_than is not None else None,
+            )
+            self.stdout.write(f"Removed {removed} cached frame(s)")
+
+        if options["max_size"] is not None:
+            removed = amfi_frame_cache.evict(
+                cache_dir, int(options["max_size"] * 1024 * 1024)
+            )
+            self.stdout.write(f"Evicted {removed} cached frame(s)")
+
+        stats = amfi_frame_cache.stats(cache_dir)
+        self.stdout.write(
+            f"{cache_dir}: {stats.entries} frame(s), "
+            f"{stats.total_bytes / 1024 / 1024:.2f} MB"
+        )
+        if stats.entries:
+            self.stdout.write(
+                f"  least recently used: {datetime.fromtimestamp(stats.oldest):%Y-%m-%d %H:%M}"
+            )
+            self.stdout.write(
+                f"  most recently used:  {datetime.fromtimestamp(stats.newest):%Y-%m-%d %H:%M}"
+            )
@@ -1,9 +1,31 @@
-import requests
-import pandas as pd
+import argparse
+import time
 from pathlib import Path
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from datetime import datetime
-from market_data.models import AmfiMonthlyData
+from market_data.services.amfi_downloader import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_RATE_LIMIT,
+    KNOWN_MISSING,
+    MISSING,
+    DownloadJob,
+    download_reports,
+)
+from market_data.services import amfi_frame_cache
+from market_data.services.amfi_categories import CategoryMap
+from market_data.services.amfi_extract import PARSER_VERSION, extract_reports
+from market_data.services.amfi_ingest import empty_counts, upsert_month
+from market_data.services.amfi_manifest import pending_files, record_ingested
+from market_data.services.amfi_metrics import (
+    FAILED,
+    INGESTED,
+    PERCENTILES,
+    SKIPPED,
+    UNCHANGED,
+    RunMetrics,
+)
+from market_data.services.amfi_reader import PANDAS_READER, READERS
 
 
 # ======================================================
@@ -35,9 +57,36 @@ MONTH_MAP = {
     "dec": "December",
 }
 
-START_KEYWORDS = ["growth", "equity", "oriented"]
-END_KEYWORDS = ["sub total", "subtotal", "sub-total"]
-HEADER_KEYWORDS = ["scheme", "net", "assets", "aum", "rs.", "₹"]
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# How long a "not published" answer is trusted, by report age in months.
+# A month's report appears early the following month, so recent months
+# are re-checked often; a month still missing after a year never will be.
+MISSING_TTL = [
+    (1, 6 * HOUR),
+    (3, DAY),
+    (12, 7 * DAY),
+    (None, 30 * DAY),
+]
+
+
+def missing_ttl(age_months):
+    for max_age, ttl in MISSING_TTL:
+        if max_age is None or age_months <= max_age:
+            return ttl
+
+
+# ======================================================
+# ARGUMENTS
+# ======================================================
+
+def _parse_since(value):
+    try:
+        parsed = datetime.strptime(value, "%Y-%m")
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected YYYY-MM, e.g. 2024-06")
+    return parsed.year, parsed.month
 
 
 # ======================================================
@@ -47,111 +96,247 @@ HEADER_KEYWORDS = ["scheme", "net", "assets", "aum", "rs.", "₹"]
 class Command(BaseCommand):
     help = "AMFI full pipeline: download → extract → store in DB"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=DEFAULT_CONCURRENCY,
+            help="Maximum number of parallel downloads",
+        )
+        parser.add_argument(
+            "--rate-limit",
+            type=float,
+            default=DEFAULT_RATE_LIMIT,
+            help="Maximum requests per second per host (0 = unlimited)",
+        )
+        parser.add_argument(
+            "--base-url",
+            default=BASE_URL,
+            help="Report server base URL",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-extract every report, even if it is unchanged",
+        )
+        parser.add_argument(
+            "--since",
+            type=_parse_since,
+            help="Only process reports from this month onwards (YYYY-MM)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Parse reports in N parallel processes (default: 1, in-process)",
+        )
+        parser.add_argument(
+            "--reader",
+            choices=READERS,
+            default=PANDAS_READER,
+            help="pandas: load whole sheets; stream: read rows lazily and "
+                 "stop at the Growth/Equity Sub Total",
+        )
+        parser.add_argument(
+            "--no-parsed-cache",
+            action="store_true",
+            help="Do not read or fill the columnar parsed-sheet cache",
+        )
+        parser.add_argument(
+            "--metrics-file",
+            type=Path,
+            help="Append one JSON line per report plus a run summary to this file",
+        )
+        parser.add_argument(
+            "--recheck-missing",
+            action="store_true",
+            help="Request every month again, ignoring remembered 404s",
+        )
+
     def handle(self, *args, **options):
         DOWNLOAD_DIR.mkdir(exist_ok=True)
         EXTRACTED_DIR.mkdir(exist_ok=True)
 
-        current_year = datetime.now().year
+        self.verbosity = options["verbosity"]
+        now = datetime.now()
+        current_year = now.year
+        base_url = options["base_url"].rstrip("/")
+        since = options["since"]
 
+        metrics = RunMetrics()
+
+        reports = []
         for year in range(current_year, current_year - 5, -1):
             for month in MONTHS:
-
                 filename = f"am{month}{year}repo.xls"
-                file_path = DOWNLOAD_DIR / filename
-                url = f"{BASE_URL}/{filename}"
-
-                # =========================
-                # DOWNLOAD
-                # =========================
-                if not file_path.exists():
-                    try:
-                        r = requests.get(url, timeout=30)
-                        if r.status_code == 200 and r.content:
-                            with open(file_path, "wb") as f:
-                                f.write(r.content)
-                        else:
-                            continue
-                    except requests.exceptions.RequestException:
-                        continue
-
-                # =========================
-                # READ EXCEL
-                # =========================
-                try:
-                    df_raw = pd.read_excel(file_path, header=None)
-                except Exception:
+                month_number = MONTHS.index(month) + 1
+                if since and (year, month_number) < since:
+                    continue
+
+                # future months cannot have a report yet
+                age_months = (now.year - year) * 12 + now.month - month_number
+                if age_months < 0:
                     continue
 
-                df_raw = df_raw.astype(str)
+                ttl = None if options["recheck_missing"] else missing_ttl(age_months)
+                job = DownloadJob(
+                    f"{base_url}/{filename}", DOWNLOAD_DIR / filename, missing_ttl=ttl
+                )
+                reports.append((year, month, job))
+                metrics.file(
+                    job.path, file=filename, month=f"{MONTH_MAP[month]} {year}",
+                    url=job.url,
+                )
 
-                # =========================
-                # FIND HEADER ROW
-                # =========================
-                header_row = None
-                for i, row in df_raw.iterrows():
-                    if any(k in " ".join(row).lower() for k in HEADER_KEYWORDS):
-                        header_row = i
-                        break
+        # =========================
+        # DOWNLOAD (concurrent, conditional)
+        # =========================
+        with metrics.stage("download"):
+            results = download_reports(
+                [job for _, _, job in reports],
+                concurrency=options["concurrency"],
+                rate_limit=options["rate_limit"],
+            )
 
-                if header_row is None:
-                    continue
+        for result in results:
+            self._report_download(result)
+            requested = result.status != KNOWN_MISSING
+            record = metrics.file(
+                result.path,
+                download_status=result.status,
+                http_status=result.http_status,
+                download_seconds=round(result.elapsed, 6) if requested else None,
+                download_bytes=result.bytes,
+            )
+            if not result.available:
+                record.outcome = (
+                    SKIPPED if result.status in (MISSING, KNOWN_MISSING) else FAILED
+                )
+                record.reason = result.error or f"HTTP {result.http_status}"
+                if result.status == KNOWN_MISSING:
+                    record.reason += " (remembered, not re-requested)"
 
-                df = df_raw.copy()
-                df.columns = df.iloc[header_row]
-                df = df.iloc[header_row + 1:].reset_index(drop=True)
-                df = df.loc[:, df.columns.notna()]
-                df_str = df.astype(str)
-
-                # =========================
-                # FIND GROWTH / EQUITY SECTION
-                # =========================
-                start_idx, end_idx = None, None
-
-                for i, row in df_str.iterrows():
-                    if all(k in " ".join(row).lower() for k in START_KEYWORDS):
-                        start_idx = i
-                        break
-
-                if start_idx is not None:
-                    for i in range(start_idx + 1, len(df_str)):
-                        if any(k in " ".join(df_str.iloc[i]).lower() for k in END_KEYWORDS):
-                            end_idx = i
-                            break
-
-                if start_idx is None or end_idx is None:
-                    continue
+        # =========================
+        # SKIP UNCHANGED FILES
+        # =========================
+        available = {
+            job.path: (year, month)
+            for (year, month, job), result in zip(reports, results)
+            if result.available
+        }
+        with metrics.stage("manifest"):
+            pending = pending_files(
+                list(available), PARSER_VERSION, force=options["force"]
+            )
 
-                section_df = df.iloc[start_idx:end_idx].copy()
-                section_df = section_df.dropna(how="all").reset_index(drop=True)
-
-                # =========================
-                # STORE INTO DB
-                # =========================
-                month_label = f"{MONTH_MAP[month]} {year}"
-
-                for _, row in section_df.iterrows():
-                    scheme = str(row.iloc[1]).strip()
-                    net_inflow = row.iloc[6]
-
-                    if (
-                        not scheme
-                        or "sub total" in scheme.lower()
-                        or "growth/equity" in scheme.lower()
-                        or pd.isna(net_inflow)
-                    ):
-                        continue
-
-                    try:
-                        net_inflow = float(net_inflow)
-                    except ValueError:
-                        continue
-
-                    AmfiMonthlyData.objects.update_or_create(
-                        month=month_label,
-                        scheme_category=scheme,
-                        defaults={"net_inflow": net_inflow},
-                    )
+        pending_paths = {state.path for state in pending}
+        for path in available:
+            if path not in pending_paths:
+                metrics.file(path, outcome=UNCHANGED, reason="unchanged since last ingest")
+
+        self.stdout.write(
+            f"{len(pending)} new or changed report(s), "
+            f"{len(available) - len(pending)} unchanged"
+        )
+
+        # =========================
+        # EXTRACT (process pool, parent owns DB writes)
+        # =========================
+        cache_dir = None
+        if not options["no_parsed_cache"] and amfi_frame_cache.cache_available():
+            cache_dir = amfi_frame_cache.CACHE_DIR
+
+        with metrics.stage("extract"):
+            extracted = extract_reports(
+                [state.path for state in pending],
+                workers=options["workers"],
+                reader=options["reader"],
+                cache_dir=cache_dir,
+            )
+
+        totals = empty_counts()
+        # category names resolve in memory for the whole run
+        category_map = CategoryMap.load()
+
+        for state, result in zip(pending, extracted):
+            record = metrics.file(state.path, parse_seconds=round(result.seconds, 6))
+
+            if not result.ok:
+                record.outcome, record.reason = FAILED, result.error
+                self.stderr.write(f"  {state.path.name}: skipped ({result.error})")
+                continue
+
+            year, month = available[state.path]
+            month_label = f"{MONTH_MAP[month]} {year}"
+
+            with metrics.stage("db"):
+                started = time.perf_counter()
+                # one short write transaction per report: rows, bucket
+                # summaries and manifest entry commit together
+                with transaction.atomic():
+                    counts = upsert_month(month_label, result.rows, category_map)
+                    record_ingested(state, PARSER_VERSION, len(result.rows))
+                db_seconds = time.perf_counter() - started
+
+            for key, value in counts.items():
+                totals[key] += value
+
+            record.rows_extracted = len(result.rows)
+            record.rows_written = counts["inserted"] + counts["updated"]
+            record.db_seconds = round(db_seconds, 6)
+            record.outcome = INGESTED
+
+        self.stdout.write(
+            f"Rows inserted: {totals['inserted']}, "
+            f"updated: {totals['updated']}, "
+            f"unchanged: {totals['unchanged']}"
+        )
+        if category_map.created:
+            self.stdout.write(self.style.WARNING(
+                f"New scheme categories (no KPI bucket until assigned or "
+                f"aliased in the admin): {', '.join(category_map.created)}"
+            ))
+        self._report_summary(metrics.summary())
+
+        if options["metrics_file"]:
+            with open(options["metrics_file"], "a") as handle:
+                metrics.write_jsonl(handle)
 
         self.stdout.write(
             self.style.SUCCESS("🎯 AMFI DOWNLOAD → EXTRACT → DB PIPELINE COMPLETE")
         )
+
+    def _report_download(self, result):
+        if self.verbosity < 1:
+            return
+
+        detail = f"HTTP {result.http_status}" if result.http_status else result.error
+        self.stdout.write(
+            f"  {result.path.name}: {result.status} "
+            f"({detail}, {result.bytes} bytes, {result.elapsed:.2f}s)"
+        )
+
+    def _report_summary(self, summary):
+        if self.verbosity < 1:
+            return
+
+        outcomes = ", ".join(
+            f"{name}: {count}" for name, count in sorted(summary["outcomes"].items())
+        )
+        self.stdout.write(f"Reports: {summary['files']} ({outcomes})")
+
+        stages = ", ".join(
+            f"{name} {seconds:.2f}s" for name, seconds in summary["stage_seconds"].items()
+        )
+        self.stdout.write(f"Wall time: {summary['wall_seconds']:.2f}s ({stages})")
+
+        for name, timing in summary["timings"].items():
+            if not timing["count"]:
+                continue
+            quantiles = " ".join(
+                f"p{q}={timing[f'p{q}'] * 1000:.0f}ms" for q in PERCENTILES
+            )
+            self.stdout.write(
+                f"  {name}: n={timing['count']} {quantiles} "
+                f"max={timing['max'] * 1000:.0f}ms"
+            )
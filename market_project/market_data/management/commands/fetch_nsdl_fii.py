@@ -0,0 +1,241 @@
+import argparse
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from market_data.services.amfi_downloader import REQUEST_TIMEOUT
+from market_data.services.amfi_ingest import empty_counts
+from market_data.services.amfi_metrics import FAILED, SKIPPED
+from market_data.services.nsdl_fii_crawler import (
+    BASE_URL,
+    BATCH_SIZE,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_RATE_LIMIT,
+    DOWNLOAD_DIR,
+    HEADERS,
+    crawl,
+    fortnight_ends,
+    latest_fortnight_end,
+)
+from market_data.services.nsdl_fii_extract import (
+    DEFAULT_PARSER,
+    PARSERS,
+    NsdlFormatError,
+    parse_fii_report,
+)
+from market_data.services.nsdl_fii_ingest import upsert_report
+
+
+# ======================================================
+# ARGUMENTS
+# ======================================================
+
+def _parse_day(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected YYYY-MM-DD, e.g. 2025-12-15")
+
+
+def _parse_date(value):
+    end = _parse_day(value)
+    if end.day != 15 and (end + timedelta(days=1)).day != 1:
+        raise argparse.ArgumentTypeError("a fortnight ends on the 15th or a month end")
+    return end
+
+
+# ======================================================
+# COMMAND
+# ======================================================
+
+class Command(BaseCommand):
+    help = "NSDL fortnightly FII sector report: download → parse → store in DB"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=_parse_date,
+            help="Fortnight end of the report (YYYY-MM-DD, the 15th or a month "
+                 "end; default: the last fortnight that has ended)",
+        )
+        parser.add_argument(
+            "--since",
+            type=_parse_day,
+            help="Backfill every fortnight from this date (YYYY-MM-DD) up to "
+                 "--until",
+        )
+        parser.add_argument(
+            "--until",
+            type=_parse_day,
+            help="Last date of a --since backfill (default: the last fortnight "
+                 "that has ended)",
+        )
+        parser.add_argument(
+            "--url",
+            help="Report URL (overrides --date)",
+        )
+        parser.add_argument(
+            "--base-url",
+            default=BASE_URL,
+            help="Report server base URL",
+        )
+        parser.add_argument(
+            "--file",
+            type=Path,
+            help="Parse a saved report page instead of downloading it",
+        )
+        parser.add_argument(
+            "--parser",
+            choices=PARSERS,
+            default=DEFAULT_PARSER,
+            help="lxml: stream the page and stop after the sector table "
+                 "(default when installed); html.parser: stdlib fallback",
+        )
+        parser.add_argument(
+            "--download-dir",
+            type=Path,
+            default=DOWNLOAD_DIR,
+            help="Where downloaded pages are kept between runs",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=DEFAULT_CONCURRENCY,
+            help="Maximum number of parallel downloads",
+        )
+        parser.add_argument(
+            "--rate-limit",
+            type=float,
+            default=DEFAULT_RATE_LIMIT,
+            help="Maximum requests per second to the report server (0 = unlimited)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Pages downloaded before they are parsed and stored",
+        )
+        parser.add_argument(
+            "--recheck",
+            action="store_true",
+            help="Request every page again, even settled pages already stored "
+                 "and remembered 404s",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-parse every page, even if its content is unchanged",
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+
+        if options["file"] or options["url"]:
+            self._handle_single(options)
+            return
+
+        latest = latest_fortnight_end(date.today())
+        if options["since"]:
+            until = min(options["until"] or latest, latest)
+            ends = fortnight_ends(options["since"], until)
+            if not ends:
+                raise CommandError(
+                    f"no fortnight ends between {options['since']} and {until}"
+                )
+        else:
+            ends = [options["date"] or latest]
+
+        pages = crawl(
+            ends,
+            base_url=options["base_url"],
+            download_dir=options["download_dir"],
+            concurrency=options["concurrency"],
+            rate_limit=options["rate_limit"],
+            batch_size=options["batch_size"],
+            parser=options["parser"],
+            recheck=options["recheck"],
+            force=options["force"],
+            progress=self._report_page,
+        )
+
+        if not options["since"] and pages[0].outcome in (SKIPPED, FAILED):
+            raise CommandError(
+                f"{pages[0].url}: {pages[0].error} (not published yet? try --date)"
+            )
+
+        outcomes = {}
+        totals = empty_counts()
+        for page in pages:
+            outcomes[page.outcome] = outcomes.get(page.outcome, 0) + 1
+            for key, value in page.counts.items():
+                totals[key] += value
+
+        self.stdout.write(
+            f"Pages: {len(pages)} ("
+            + ", ".join(f"{name}: {count}" for name, count in sorted(outcomes.items()))
+            + ")"
+        )
+        self.stdout.write(
+            f"Rows inserted: {totals['inserted']}, "
+            f"updated: {totals['updated']}, "
+            f"unchanged: {totals['unchanged']}"
+        )
+        failed = [page for page in pages if page.outcome in (SKIPPED, FAILED)]
+        if failed:
+            self.stdout.write(self.style.WARNING(
+                "Not stored: " + ", ".join(f"{page.end:%b %d, %Y}" for page in failed)
+            ))
+        self.stdout.write(self.style.SUCCESS("🎯 NSDL FII DOWNLOAD → PARSE → DB COMPLETE"))
+
+    def _handle_single(self, options):
+        if options["file"]:
+            source = str(options["file"])
+            try:
+                html = options["file"].read_text(encoding="utf-8", errors="replace")
+            except OSError as e:
+                raise CommandError(f"cannot read {source}: {e}")
+        else:
+            source = options["url"]
+            html = self._download(source)
+
+        try:
+            report = parse_fii_report(html, options["parser"])
+        except NsdlFormatError as e:
+            raise CommandError(f"{source}: {e}")
+
+        counts = upsert_report(report, source=source)
+
+        fortnights = ", ".join(
+            f"{start:%b %d}-{end:%d, %Y}" for end, start in sorted(report.fortnights.items())
+        )
+        self.stdout.write(f"Fortnights: {fortnights} ({len(report.rows)} rows parsed)")
+        self.stdout.write(
+            f"Rows inserted: {counts['inserted']}, "
+            f"updated: {counts['updated']}, "
+            f"unchanged: {counts['unchanged']}"
+        )
+        self.stdout.write(self.style.SUCCESS("🎯 NSDL FII DOWNLOAD → PARSE → DB COMPLETE"))
+
+    def _download(self, url):
+        if self.verbosity >= 1:
+            self.stdout.write(f"Downloading {url}")
+        try:
+            r = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            raise CommandError(f"{url}: {e}")
+
+        if r.status_code != 200 or not r.content:
+            raise CommandError(f"{url}: HTTP {r.status_code}")
+        return r.text
+
+    def _report_page(self, page):
+        if self.verbosity < 1:
+            return
+
+        detail = page.error or (
+            f"HTTP {page.http_status}, {page.rows} rows" if page.http_status
+            else "stored earlier, not re-requested"
+        )
+        self.stdout.write(f"  {page.path.name}: {page.outcome} ({detail})")
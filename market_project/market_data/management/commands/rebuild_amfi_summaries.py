@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from market_data.models import MonthlyBucketSummary
+from market_data.services.amfi_analytics import (
+    BUCKETS,
+    rebuild_bucket_summaries,
+    refresh_bucket_summaries,
+)
+
+
+class Command(BaseCommand):
+    help = "Recompute the materialized monthly bucket summaries from AmfiMonthlyData"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "months",
+            nargs="*",
+            help='Month labels to recompute, e.g. "November 2025" (default: all)',
+        )
+
+    def handle(self, *args, **options):
+        if options["months"]:
+            written = refresh_bucket_summaries(options["months"])
+        else:
+            written = rebuild_bucket_summaries()
+
+        self.stdout.write(
+            f"{written} summary row(s) written for {len(BUCKETS)} bucket(s); "
+            f"{MonthlyBucketSummary.objects.count()} in table"
+        )
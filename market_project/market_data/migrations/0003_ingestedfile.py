@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_data', '0002_alter_amfimonthlydata_net_inflow_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestedFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(help_text='Absolute path of the processed report', max_length=500, unique=True)),
+                ('size', models.BigIntegerField(help_text='File size in bytes when it was last processed')),
+                ('mtime', models.FloatField(help_text='File modification time (epoch seconds) when last processed')),
+                ('sha256', models.CharField(max_length=64)),
+                ('parser_version', models.CharField(help_text='Extraction logic version the file was processed with', max_length=20)),
+                ('row_count', models.IntegerField(default=0, help_text='Rows extracted from the file')),
+                ('ingested_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Ingested File',
+                'verbose_name_plural': 'Ingested Files',
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:44
+
+from datetime import date, datetime
+
+from django.db import migrations, models
+
+
+# frozen copy of amfi_periods.MONTH_FORMATS / parse_month_label
+MONTH_FORMATS = ["%B %Y", "%b %Y", "%Y-%m"]
+
+
+def parse_month_label(label):
+    for fmt in MONTH_FORMATS:
+        try:
+            parsed = datetime.strptime(label.strip(), fmt)
+        except ValueError:
+            continue
+        return date(parsed.year, parsed.month, 1)
+    return None
+
+
+def backfill_period(apps, schema_editor):
+    AmfiMonthlyData = apps.get_model("market_data", "AmfiMonthlyData")
+
+    # one UPDATE per distinct label, each served by the month index
+    labels = AmfiMonthlyData.objects.values_list("month", flat=True).distinct()
+    for label in list(labels):
+        period = parse_month_label(label)
+        if period is not None:
+            AmfiMonthlyData.objects.filter(month=label).update(period=period)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_data', '0003_ingestedfile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='amfimonthlydata',
+            name='period',
+            field=models.DateField(blank=True, editable=False, help_text='First day of the reporting month, derived from month', null=True),
+        ),
+        migrations.RunPython(backfill_period, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='amfimonthlydata',
+            index=models.Index(fields=['period', 'scheme_category'], name='market_data_period_bb774b_idx'),
+        ),
+    ]
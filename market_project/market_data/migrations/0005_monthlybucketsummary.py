@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:45
+
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+
+# frozen copy of amfi_analytics.BUCKETS at the time of this migration;
+# later bucket changes are applied with `manage.py rebuild_amfi_summaries`
+BUCKETS = {
+    "small_cap": ["Small Cap Fund"],
+    "large_midcap": [
+        "Large Cap Fund",
+        "Mid Cap Fund",
+        "Large & Mid Cap Fund",
+        "Flexi Cap Fund",
+        "Focused Fund",
+        "Value Fund/Contra Fund",
+        "Dividend Yield Fund",
+        "ELSS",
+        "Sectoral/Thematic Funds",
+    ],
+}
+
+
+def populate_summaries(apps, schema_editor):
+    AmfiMonthlyData = apps.get_model("market_data", "AmfiMonthlyData")
+    MonthlyBucketSummary = apps.get_model("market_data", "MonthlyBucketSummary")
+
+    aggregated = (
+        AmfiMonthlyData.objects
+        .values("month", "period")
+        .order_by()
+        .annotate(**{
+            name: Sum("net_inflow", filter=Q(scheme_category__in=categories))
+            for name, categories in BUCKETS.items()
+        })
+    )
+    MonthlyBucketSummary.objects.bulk_create([
+        MonthlyBucketSummary(
+            month=row["month"],
+            period=row["period"],
+            bucket=name,
+            net_inflow=row[name] or 0,
+        )
+        for row in aggregated
+        for name in BUCKETS
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_data', '0004_amfimonthlydata_period'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyBucketSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.CharField(help_text='Reporting month label, as stored on AmfiMonthlyData', max_length=20)),
+                ('period', models.DateField(blank=True, help_text='First day of the reporting month', null=True)),
+                ('bucket', models.CharField(help_text='KPI bucket, e.g. small_cap', max_length=50)),
+                ('net_inflow', models.FloatField(default=0, help_text="Summed net inflow of the bucket's categories (INR Crores)")),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Monthly Bucket Summary',
+                'verbose_name_plural': 'Monthly Bucket Summaries',
+                'indexes': [models.Index(fields=['period', 'bucket'], name='market_data_period_3be9cd_idx')],
+                'unique_together': {('month', 'bucket')},
+            },
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:47
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def create_amfi_version(apps, schema_editor):
+    DatasetVersion = apps.get_model("market_data", "DatasetVersion")
+    DatasetVersion.objects.get_or_create(
+        name="amfi", defaults={"version": 1, "updated_at": timezone.now()}
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_data', '0005_monthlybucketsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(help_text='When the data last changed (Last-Modified)')),
+            ],
+            options={
+                'verbose_name': 'Dataset Version',
+                'verbose_name_plural': 'Dataset Versions',
+            },
+        ),
+        migrations.RunPython(create_amfi_version, migrations.RunPython.noop),
+    ]
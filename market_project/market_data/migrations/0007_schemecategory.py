@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_data', '0006_datasetversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchemeCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Canonical category name, e.g. Small Cap Fund', max_length=200, unique=True)),
+                ('bucket', models.CharField(blank=True, db_index=True, default='', help_text='KPI bucket the category counts towards, e.g. small_cap (blank for none)', max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Scheme Category',
+                'verbose_name_plural': 'Scheme Categories',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='amfimonthlydata',
+            name='category',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='monthly_data', to='market_data.schemecategory'),
+        ),
+        # nullable while rows move to the FK, so 0009 can be reversed
+        migrations.AlterField(
+            model_name='amfimonthlydata',
+            name='scheme_category',
+            field=models.CharField(help_text='Scheme category like Large Cap, Mid Cap, Small Cap', max_length=200, null=True),
+        ),
+        migrations.CreateModel(
+            name='SchemeCategoryAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(help_text='Name as printed in a report, e.g. Sectoral / Thematic Fund', max_length=200, unique=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='market_data.schemecategory')),
+            ],
+            options={
+                'verbose_name': 'Scheme Category Alias',
+                'verbose_name_plural': 'Scheme Category Aliases',
+            },
+        ),
+    ]
@@ -0,0 +1,135 @@
+import re
+
+from django.db import migrations
+from django.db.models import Q, Sum
+
+
+# frozen copies of amfi_analytics.BUCKETS, amfi_categories.SEED_ALIASES
+# and amfi_categories.normalize_name at the time of this migration
+BUCKETS = {
+    "small_cap": ["Small Cap Fund"],
+    "large_midcap": [
+        "Large Cap Fund",
+        "Mid Cap Fund",
+        "Large & Mid Cap Fund",
+        "Flexi Cap Fund",
+        "Focused Fund",
+        "Value Fund/Contra Fund",
+        "Dividend Yield Fund",
+        "ELSS",
+        "Sectoral/Thematic Funds",
+    ],
+}
+
+SEED_ALIASES = {
+    "Sectoral Funds": "Sectoral/Thematic Funds",
+    "Thematic Funds": "Sectoral/Thematic Funds",
+    "Value Fund": "Value Fund/Contra Fund",
+    "Contra Fund": "Value Fund/Contra Fund",
+    "Equity Linked Savings Scheme": "ELSS",
+    "ELSS Funds": "ELSS",
+    "Multicap Fund": "Multi Cap Fund",
+    "Large and Mid Cap Fund": "Large & Mid Cap Fund",
+}
+
+
+def normalize_name(name):
+    name = " ".join(str(name).split())
+    name = re.sub(r"\s*([/&])\s*", r"\1", name).casefold()
+    return re.sub(r"\bfunds\b", "fund", name)
+
+
+def populate_categories(apps, schema_editor):
+    AmfiMonthlyData = apps.get_model("market_data", "AmfiMonthlyData")
+    SchemeCategory = apps.get_model("market_data", "SchemeCategory")
+    SchemeCategoryAlias = apps.get_model("market_data", "SchemeCategoryAlias")
+
+    buckets = {name: bucket for bucket, names in BUCKETS.items() for name in names}
+    stored = set(
+        AmfiMonthlyData.objects.values_list("scheme_category", flat=True).distinct()
+    )
+
+    # canonical categories first, so stored variants resolve onto them
+    ids, canonical = {}, {}
+    for name in sorted(set(buckets) | set(SEED_ALIASES.values())):
+        category = SchemeCategory.objects.create(name=name, bucket=buckets.get(name, ""))
+        ids[normalize_name(name)] = category.id
+        canonical[category.id] = name
+
+    for alias, name in SEED_ALIASES.items():
+        SchemeCategoryAlias.objects.create(alias=alias, category_id=ids[normalize_name(name)])
+        ids[normalize_name(alias)] = ids[normalize_name(name)]
+
+    for name in sorted(stored):
+        key = normalize_name(name)
+        if key not in ids:
+            category = SchemeCategory.objects.create(name=" ".join(name.split()))
+            ids[key] = category.id
+            canonical[category.id] = category.name
+        elif canonical[ids[key]] != name:
+            # a variant spelling: remember it as an alias
+            SchemeCategoryAlias.objects.get_or_create(
+                alias=name, defaults={"category_id": ids[key]}
+            )
+
+    # two stored spellings of one category in the same month: keep the
+    # most recently written row, as the pivots already did
+    seen = set()
+    duplicates = []
+    for row_id, month, name in (
+        AmfiMonthlyData.objects
+        .order_by("-id")
+        .values_list("id", "month", "scheme_category")
+    ):
+        key = (month, ids[normalize_name(name)])
+        if key in seen:
+            duplicates.append(row_id)
+        seen.add(key)
+    AmfiMonthlyData.objects.filter(id__in=duplicates).delete()
+
+    for name in stored:
+        AmfiMonthlyData.objects.filter(scheme_category=name).update(
+            category_id=ids[normalize_name(name)]
+        )
+
+    # variant spellings now count towards their category's bucket
+    MonthlyBucketSummary = apps.get_model("market_data", "MonthlyBucketSummary")
+    aggregated = (
+        AmfiMonthlyData.objects
+        .values("month", "period")
+        .order_by()
+        .annotate(**{
+            name: Sum("net_inflow", filter=Q(category__bucket=name))
+            for name in BUCKETS
+        })
+    )
+    MonthlyBucketSummary.objects.all().delete()
+    MonthlyBucketSummary.objects.bulk_create([
+        MonthlyBucketSummary(
+            month=row["month"],
+            period=row["period"],
+            bucket=name,
+            net_inflow=row[name] or 0,
+        )
+        for row in aggregated
+        for name in BUCKETS
+    ])
+
+
+def restore_names(apps, schema_editor):
+    AmfiMonthlyData = apps.get_model("market_data", "AmfiMonthlyData")
+    SchemeCategory = apps.get_model("market_data", "SchemeCategory")
+
+    for category_id, name in SchemeCategory.objects.values_list("id", "name"):
+        AmfiMonthlyData.objects.filter(category_id=category_id).update(scheme_category=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_data', '0007_schemecategory'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_categories, restore_names),
+    ]
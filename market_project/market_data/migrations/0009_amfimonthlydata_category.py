@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_data', '0008_populate_schemecategory'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='amfimonthlydata',
+            name='market_data_scheme__3e4d6e_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='amfimonthlydata',
+            name='market_data_period_bb774b_idx',
+        ),
+        migrations.AlterUniqueTogether(
+            name='amfimonthlydata',
+            unique_together={('month', 'category')},
+        ),
+        migrations.AlterField(
+            model_name='amfimonthlydata',
+            name='category',
+            field=models.ForeignKey(help_text='Scheme category like Large Cap, Mid Cap, Small Cap', on_delete=django.db.models.deletion.PROTECT, related_name='monthly_data', to='market_data.schemecategory'),
+        ),
+        migrations.AddIndex(
+            model_name='amfimonthlydata',
+            index=models.Index(fields=['period', 'category'], name='market_data_period_845560_idx'),
+        ),
+        migrations.RemoveField(
+            model_name='amfimonthlydata',
+            name='scheme_category',
+        ),
+    ]
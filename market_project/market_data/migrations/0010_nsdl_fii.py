@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_data', '0009_amfimonthlydata_category'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FiiFortnight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateField()),
+                ('end', models.DateField(help_text='Last day of the fortnight; AUC is reported as on this date', unique=True)),
+                ('period', models.DateField(db_index=True, help_text='First day of the month the fortnight falls in')),
+                ('source', models.CharField(blank=True, help_text='URL or file the fortnight was last loaded from', max_length=500)),
+            ],
+            options={
+                'verbose_name': 'FII Fortnight',
+                'verbose_name_plural': 'FII Fortnights',
+                'ordering': ['end'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FiiSector',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Sector as printed in the report, e.g. Financial Services', max_length=200, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'FII Sector',
+                'verbose_name_plural': 'FII Sectors',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FiiSectorInvestment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asset_class', models.CharField(help_text='e.g. equity, debt_vrr, mf_equity, aif (see nsdl_fii_extract.ASSET_CLASSES)', max_length=50)),
+                ('currency', models.CharField(help_text='INR (values in Crores) or USD (values in Millions)', max_length=3)),
+                ('auc', models.FloatField(blank=True, help_text='Assets under custody at the end of the fortnight', null=True)),
+                ('net_investment', models.FloatField(blank=True, help_text='Net investment during the fortnight', null=True)),
+                ('fortnight', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='investments', to='market_data.fiifortnight')),
+                ('sector', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='investments', to='market_data.fiisector')),
+            ],
+            options={
+                'verbose_name': 'FII Sector Investment',
+                'verbose_name_plural': 'FII Sector Investments',
+                'indexes': [models.Index(fields=['sector', 'fortnight'], name='market_data_sector__761db0_idx')],
+                'unique_together': {('fortnight', 'sector', 'asset_class', 'currency')},
+            },
+        ),
+    ]
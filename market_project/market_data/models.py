@@ -1,14 +1,88 @@
 from django.db import models
 
+from market_data.services.amfi_periods import parse_month_label
+
+
+class SchemeCategory(models.Model):
+    """
+    One row per AMFI scheme category. Reports name categories in text;
+    SchemeCategoryAlias maps renamed or respelled names onto these rows.
+    """
+    name = models.CharField(
+        max_length=200,
+        unique=True,
+        help_text="Canonical category name, e.g. Small Cap Fund"
+    )
+
+    bucket = models.CharField(
+        max_length=50,
+        blank=True,
+        default="",
+        db_index=True,
+        help_text="KPI bucket the category counts towards, e.g. small_cap (blank for none)"
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+
+    class Meta:
+        verbose_name = "Scheme Category"
+        verbose_name_plural = "Scheme Categories"
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class SchemeCategoryAlias(models.Model):
+    alias = models.CharField(
+        max_length=200,
+        unique=True,
+        help_text="Name as printed in a report, e.g. Sectoral / Thematic Fund"
+    )
+
+    category = models.ForeignKey(
+        SchemeCategory,
+        on_delete=models.CASCADE,
+        related_name="aliases"
+    )
+
+    class Meta:
+        verbose_name = "Scheme Category Alias"
+        verbose_name_plural = "Scheme Category Aliases"
+
+    def __str__(self):
+        return f"{self.alias} → {self.category}"
+
 
 class AmfiMonthlyData(models.Model):
+    """
+    Net inflow of one scheme category in one reporting month.
+
+    save() refreshes the month's MonthlyBucketSummary rows, and deletes
+    (one row or a queryset) refresh each month they touched once, on
+    commit (see market_data.signals). Bulk writes send no signals:
+    bulk_create / QuerySet.update() callers must run
+    refresh_bucket_summaries() themselves, as upsert_month does, or
+    rebuild with ``manage.py rebuild_amfi_summaries``.
+    """
     month = models.CharField(
         max_length=20,
         help_text="Reporting month, e.g. November 2025"
     )
 
-    scheme_category = models.CharField(
-        max_length=200,
+    period = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="First day of the reporting month, derived from month"
+    )
+
+    category = models.ForeignKey(
+        SchemeCategory,
+        on_delete=models.PROTECT,
+        related_name="monthly_data",
         help_text="Scheme category like Large Cap, Mid Cap, Small Cap"
     )
 
@@ -25,11 +99,233 @@ class AmfiMonthlyData(models.Model):
     class Meta:
         verbose_name = "AMFI Monthly Data"
         verbose_name_plural = "AMFI Monthly Data"
-        unique_together = ("month", "scheme_category")
+        unique_together = ("month", "category")
         indexes = [
             models.Index(fields=["month"]),
-            models.Index(fields=["scheme_category"]),
+            models.Index(fields=["period", "category"]),
+        ]
+
+    def __str__(self):
+        return f"{self.category} | {self.month}"
+
+    def save(self, *args, **kwargs):
+        # bulk writes set period themselves (see amfi_ingest.upsert_month)
+        self.period = parse_month_label(self.month)
+        super().save(*args, **kwargs)
+
+
+class MonthlyBucketSummary(models.Model):
+    """
+    Net inflow per month per KPI bucket (see amfi_analytics.BUCKETS),
+    recomputed whenever a month's AmfiMonthlyData rows change.
+    """
+    month = models.CharField(
+        max_length=20,
+        help_text="Reporting month label, as stored on AmfiMonthlyData"
+    )
+
+    period = models.DateField(
+        null=True,
+        blank=True,
+        help_text="First day of the reporting month"
+    )
+
+    bucket = models.CharField(
+        max_length=50,
+        help_text="KPI bucket, e.g. small_cap"
+    )
+
+    net_inflow = models.FloatField(
+        default=0,
+        help_text="Summed net inflow of the bucket's categories (INR Crores)"
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True
+    )
+
+    class Meta:
+        verbose_name = "Monthly Bucket Summary"
+        verbose_name_plural = "Monthly Bucket Summaries"
+        unique_together = ("month", "bucket")
+        indexes = [
+            models.Index(fields=["period", "bucket"]),
+        ]
+
+    def __str__(self):
+        return f"{self.bucket} | {self.month}"
+
+
+class IngestedFile(models.Model):
+    path = models.CharField(
+        max_length=500,
+        unique=True,
+        help_text="Absolute path of the processed report"
+    )
+
+    size = models.BigIntegerField(
+        help_text="File size in bytes when it was last processed"
+    )
+
+    mtime = models.FloatField(
+        help_text="File modification time (epoch seconds) when last processed"
+    )
+
+    sha256 = models.CharField(
+        max_length=64
+    )
+
+    parser_version = models.CharField(
+        max_length=20,
+        help_text="Extraction logic version the file was processed with"
+    )
+
+    row_count = models.IntegerField(
+        default=0,
+        help_text="Rows extracted from the file"
+    )
+
+    ingested_at = models.DateTimeField(
+        auto_now=True
+    )
+
+    class Meta:
+        verbose_name = "Ingested File"
+        verbose_name_plural = "Ingested Files"
+
+    def __str__(self):
+        return f"{self.path} ({self.row_count} rows)"
+
+
+class DatasetVersion(models.Model):
+    """
+    Counter bumped whenever AMFI data changes. API response caches key on
+    it, so one process's ingest invalidates every other process's cache.
+    """
+    name = models.CharField(
+        max_length=50,
+        unique=True
+    )
+
+    version = models.PositiveIntegerField(
+        default=0
+    )
+
+    updated_at = models.DateTimeField(
+        help_text="When the data last changed (Last-Modified)"
+    )
+
+    class Meta:
+        verbose_name = "Dataset Version"
+        verbose_name_plural = "Dataset Versions"
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class FiiSector(models.Model):
+    """
+    One row per sector of the NSDL fortnightly FPI/FII sector report
+    (BSE industry classification, plus "Sovereign" and "Others").
+    """
+    name = models.CharField(
+        max_length=200,
+        unique=True,
+        help_text="Sector as printed in the report, e.g. Financial Services"
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+
+    class Meta:
+        verbose_name = "FII Sector"
+        verbose_name_plural = "FII Sectors"
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class FiiFortnight(models.Model):
+    """
+    A reporting fortnight (1st-15th or 16th-month end). ``period`` is the
+    month it falls in, the same key as AmfiMonthlyData.period.
+    """
+    start = models.DateField()
+
+    end = models.DateField(
+        unique=True,
+        help_text="Last day of the fortnight; AUC is reported as on this date"
+    )
+
+    period = models.DateField(
+        db_index=True,
+        help_text="First day of the month the fortnight falls in"
+    )
+
+    source = models.CharField(
+        max_length=500,
+        blank=True,
+        help_text="URL or file the fortnight was last loaded from"
+    )
+
+    class Meta:
+        verbose_name = "FII Fortnight"
+        verbose_name_plural = "FII Fortnights"
+        ordering = ["end"]
+
+    def __str__(self):
+        return f"{self.start:%b %d} - {self.end:%b %d, %Y}"
+
+
+class FiiSectorInvestment(models.Model):
+    """
+    FPI/FII assets under custody and net investment for one fortnight,
+    sector, asset class and currency (INR Cr or USD Mn, as NSDL reports
+    both). Report totals are not stored; they are sums of these rows.
+    """
+    fortnight = models.ForeignKey(
+        FiiFortnight,
+        on_delete=models.CASCADE,
+        related_name="investments"
+    )
+
+    sector = models.ForeignKey(
+        FiiSector,
+        on_delete=models.PROTECT,
+        related_name="investments"
+    )
+
+    asset_class = models.CharField(
+        max_length=50,
+        help_text="e.g. equity, debt_vrr, mf_equity, aif (see nsdl_fii_extract.ASSET_CLASSES)"
+    )
+
+    currency = models.CharField(
+        max_length=3,
+        help_text="INR (values in Crores) or USD (values in Millions)"
+    )
+
+    auc = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Assets under custody at the end of the fortnight"
+    )
+
+    net_investment = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Net investment during the fortnight"
+    )
+
+    class Meta:
+        verbose_name = "FII Sector Investment"
+        verbose_name_plural = "FII Sector Investments"
+        unique_together = ("fortnight", "sector", "asset_class", "currency")
+        indexes = [
+            models.Index(fields=["sector", "fortnight"]),
         ]
 
     def __str__(self):
-        return f"{self.scheme_category} | {self.month}"
+        return f"{self.sector} | {self.asset_class} {self.currency} | {self.fortnight}"
@@ -0,0 +1,77 @@
+import hashlib
+
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+
+from market_data.models import MonthlyBucketSummary
+from market_data.services.amfi_api_cache import (
+    CACHE_ALIAS,
+    CACHE_TIMEOUT,
+    KEY_PREFIX,
+    current_version,
+)
+
+
+# ======================================================
+# REPORTED MONTHS (year -> months)
+# ======================================================
+
+def _index_key(version: int) -> str:
+    return f"{KEY_PREFIX}:period-index:v{version}"
+
+
+def build_period_index(periods):
+    """
+    {year: [month numbers]} from reporting period dates, both in calendar
+    order.
+    """
+    index = {}
+    for period in sorted(set(periods)):
+        index.setdefault(period.year, []).append(period.month)
+    return index
+
+
+def period_index():
+    """
+    Every reported month, grouped by year. Read from MonthlyBucketSummary
+    (a row per month per bucket, not per category) and cached for the
+    current dataset version, so an ingest invalidates it.
+    """
+    version, _ = current_version()
+    cache = caches[CACHE_ALIAS]
+
+    index = cache.get(_index_key(version))
+    if index is None:
+        index = build_period_index(
+            MonthlyBucketSummary.objects
+            .exclude(period=None)
+            .values_list("period", flat=True)
+            .distinct()
+        )
+        cache.set(_index_key(version), index, CACHE_TIMEOUT)
+    return index
+
+
+# ======================================================
+# ROW COUNTS
+# ======================================================
+
+def cached_count(qs):
+    """
+    ``qs.count()``, cached per (SQL, dataset version). SQLite keeps no
+    row estimate to read instead, and every data change bumps the version.
+    """
+    try:
+        sql, params = qs.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    digest = hashlib.sha256(f"{sql}|{params!r}".encode()).hexdigest()[:32]
+    version, _ = current_version()
+    key = f"{KEY_PREFIX}:count:v{version}:{qs.model._meta.label_lower}:{digest}"
+
+    cache = caches[CACHE_ALIAS]
+    count = cache.get(key)
+    if count is None:
+        count = qs.count()
+        cache.set(key, count, CACHE_TIMEOUT)
+    return count
@@ -1,5 +1,9 @@
-from django.db.models import Sum
-from market_data.models import AmfiMonthlyData
+from django.db.models import Q, Sum
+from django.db import transaction
+
+from market_data.models import AmfiMonthlyData, MonthlyBucketSummary
+from market_data.services.amfi_api_cache import bump_version
+from market_data.services.amfi_periods import period_key, year_range
 
 
 # ======================================================
@@ -18,6 +22,16 @@ LARGE_MIDCAP_BUCKET = [
     "Sectoral/Thematic Funds",
 ]
 
+# KPI name -> scheme categories summed into it. Seeds
+# SchemeCategory.bucket for newly seen categories; after that the column
+# decides membership (edit it in the admin)
+BUCKETS = {
+    "small_cap": ["Small Cap Fund"],
+    "large_midcap": LARGE_MIDCAP_BUCKET,
+}
+
+PIVOT_CHUNK_SIZE = 2000
+
 # AMFI uses abbreviated month names
 MONTH_INDEX = {
     "Jan": 1,
@@ -39,37 +53,138 @@ MONTH_INDEX = {
 # 1️⃣ MONTHLY SUMMARY (Single Month KPIs)
 # ======================================================
 
+def _summary(month: str, totals: dict):
+    return {
+        "month": month,
+        **{name: round(totals.get(name) or 0, 2) for name in BUCKETS},
+    }
+
+
+def aggregate_buckets(qs):
+    """
+    Bucket totals straight from AmfiMonthlyData rows, one conditional
+    aggregation query for every month in ``qs``, joining the category on
+    its integer key:
+
+        SELECT month, SUM(net_inflow) FILTER (WHERE category.bucket = ...), ...
+        FROM ... JOIN scheme_category ... GROUP BY month
+
+    Returns one dict per month ("month", "period" and a total per bucket).
+    """
+    return (
+        qs
+        .values("month", "period")
+        .order_by("period")
+        .annotate(**{
+            name: Sum("net_inflow", filter=Q(category__bucket=name))
+            for name in BUCKETS
+        })
+    )
+
+
+def _summaries_query(months):
+    return (
+        MonthlyBucketSummary.objects
+        .filter(month__in=months)
+        .order_by("period", "month")
+        .values_list("month", "bucket", "net_inflow")
+    )
+
+
+def _summaries(rows):
+    totals = {}
+    for month, bucket, net_inflow in rows:
+        totals.setdefault(month, {})[bucket] = net_inflow
+    return {month: _summary(month, values) for month, values in totals.items()}
+
+
+def monthly_summaries(months):
+    """
+    Bucket KPIs for every month in ``months``, read from the materialized
+    MonthlyBucketSummary table with one lookup on its (month, bucket) key.
+
+    Returns {month: summary} in calendar order for the months that have
+    data; months without any rows are left out.
+    """
+    months = list(dict.fromkeys(months))
+    if not months:
+        return {}
+    return _summaries(_summaries_query(months))
+
+
+async def amonthly_summaries(months):
+    months = list(dict.fromkeys(months))
+    if not months:
+        return {}
+    return _summaries([row async for row in _summaries_query(months)])
+
+
 def monthly_amfi_summary(month: str):
-    qs = AmfiMonthlyData.objects.filter(month=month)
+    return monthly_summaries([month]).get(month) or _summary(month, {})
 
-    small_cap = qs.filter(
-        scheme_category="Small Cap Fund"
-    ).aggregate(total=Sum("net_inflow"))["total"] or 0
 
-    large_midcap = qs.filter(
-        scheme_category__in=LARGE_MIDCAP_BUCKET
-    ).aggregate(total=Sum("net_inflow"))["total"] or 0
+async def amonthly_amfi_summary(month: str):
+    return (await amonthly_summaries([month])).get(month) or _summary(month, {})
 
-    return {
-        "month": month,
-        "small_cap": round(small_cap, 2),
-        "large_midcap": round(large_midcap, 2),
-    }
+
+def _summary_rows(aggregated):
+    return [
+        MonthlyBucketSummary(
+            month=row["month"],
+            period=row["period"],
+            bucket=name,
+            net_inflow=row[name] or 0,
+        )
+        for row in aggregated
+        for name in BUCKETS
+    ]
+
+
+def refresh_bucket_summaries(months):
+    """
+    Recompute the materialized summaries of ``months`` (labels) from
+    AmfiMonthlyData: one aggregate query, one DELETE, one bulk INSERT.
+    Months that no longer have rows lose their summaries. Bumps the
+    dataset version, which invalidates cached API responses.
+    """
+    months = list(dict.fromkeys(months))
+    if not months:
+        return 0
+
+    # no savepoint: usually runs inside upsert_month's transaction
+    with transaction.atomic(savepoint=False):
+        rows = _summary_rows(
+            aggregate_buckets(AmfiMonthlyData.objects.filter(month__in=months))
+        )
+        MonthlyBucketSummary.objects.filter(month__in=months).delete()
+        MonthlyBucketSummary.objects.bulk_create(rows)
+        bump_version()
+    return len(rows)
+
+
+def rebuild_bucket_summaries():
+    """
+    Recompute every month, e.g. after categories changed bucket.
+    """
+    with transaction.atomic():
+        rows = _summary_rows(aggregate_buckets(AmfiMonthlyData.objects.all()))
+        MonthlyBucketSummary.objects.all().delete()
+        MonthlyBucketSummary.objects.bulk_create(rows)
+        bump_version()
+    return len(rows)
 
 
 # ======================================================
 # 2️⃣ MONTH-TO-MONTH COMPARISON
 # ======================================================
 
-def compare_two_months(month_a: str, month_b: str):
-    if not AmfiMonthlyData.objects.filter(month=month_a).exists():
-        return {"error": f"No data for {month_a}"}
-
-    if not AmfiMonthlyData.objects.filter(month=month_b).exists():
-        return {"error": f"No data for {month_b}"}
+def _compare(month_a: str, month_b: str, summaries):
+    for month in (month_a, month_b):
+        if month not in summaries:
+            return {"error": f"No data for {month}"}
 
-    a = monthly_amfi_summary(month_a)
-    b = monthly_amfi_summary(month_b)
+    a = summaries[month_a]
+    b = summaries[month_b]
 
     return {
         "month_a": month_a,
@@ -79,32 +194,108 @@ def compare_two_months(month_a: str, month_b: str):
     }
 
 
+def compare_two_months(month_a: str, month_b: str):
+    return _compare(month_a, month_b, monthly_summaries([month_a, month_b]))
+
+
+async def acompare_two_months(month_a: str, month_b: str):
+    # both months in one lookup: cheaper than two concurrent queries,
+    # which the async ORM would run one after the other anyway
+    return _compare(month_a, month_b, await amonthly_summaries([month_a, month_b]))
+
+
 # ======================================================
 # 3️⃣ YEAR-WISE PIVOT (Month × Category Matrix)
 # ======================================================
 
 
-def amfi_year_pivot(year: str):
-    qs = AmfiMonthlyData.objects.filter(
-        month__startswith=f"{year}-"
+def _pivot_cells(from_year: int, to_year: int):
+    """
+    (period, category name, net_inflow) tuples for the year range in
+    calendar order, read as a range scan on the (period, category) index
+    without building model instances. If a month is stored under two
+    labels ("2025-11" and "November 2025"), the most recently written row
+    comes last.
+    """
+    return (
+        AmfiMonthlyData.objects
+        .filter(period__range=year_range(from_year, to_year))
+        .order_by("period", "category_id", "id")
+        .values_list("period", "category__name", "net_inflow")
     )
 
-    months = sorted(
-        qs.values_list("month", flat=True).distinct()
-    )
 
-    categories = sorted(
-        qs.values_list("scheme_category", flat=True).distinct()
-    )
+async def _acells(qs):
+    # not aiterator(): on values_list() querysets it runs the query in
+    # the event loop thread
+    return [row async for row in qs]
 
-    matrix = {month: {} for month in months}
 
-    for row in qs:
-        matrix[row.month][row.scheme_category] = row.net_inflow
+def _year_pivot(year: str, cells):
+    matrix = {}
+    categories = set()
+
+    for period, scheme_category, net_inflow in cells:
+        matrix.setdefault(period_key(period), {})[scheme_category] = net_inflow
+        categories.add(scheme_category)
 
     return {
         "year": year,
+        "months": list(matrix),
+        "categories": sorted(categories),
+        "matrix": matrix,
+    }
+
+
+def amfi_year_pivot(year: str):
+    """
+    Month x category matrix for one calendar year, keyed by "YYYY-MM" in
+    calendar order.
+    """
+    cells = _pivot_cells(int(year), int(year)).iterator(chunk_size=PIVOT_CHUNK_SIZE)
+    return _year_pivot(year, cells)
+
+
+async def aamfi_year_pivot(year: str):
+    return _year_pivot(year, await _acells(_pivot_cells(int(year), int(year))))
+
+
+def _columnar_pivot(from_year: int, to_year: int, cells):
+    values = {}
+    months = []
+    categories = set()
+
+    for period, scheme_category, net_inflow in cells:
+        month = period_key(period)
+        if not months or months[-1] != month:
+            months.append(month)
+        values[month, scheme_category] = net_inflow
+        categories.add(scheme_category)
+
+    categories = sorted(categories)
+    return {
+        "from": from_year,
+        "to": to_year,
         "months": months,
         "categories": categories,
-        "matrix": matrix,
+        "values": [
+            [values.get((month, category)) for category in categories]
+            for month in months
+        ],
     }
+
+
+def amfi_pivot_columnar(from_year: int, to_year: int):
+    """
+    Compact pivot for a range of years: a months array ("YYYY-MM",
+    calendar order), a sorted categories array and a dense
+    values[month][category] array with null for missing cells.
+    """
+    cells = _pivot_cells(from_year, to_year).iterator(chunk_size=PIVOT_CHUNK_SIZE)
+    return _columnar_pivot(from_year, to_year, cells)
+
+
+async def aamfi_pivot_columnar(from_year: int, to_year: int):
+    return _columnar_pivot(
+        from_year, to_year, await _acells(_pivot_cells(from_year, to_year))
+    )
@@ -0,0 +1,211 @@
+import hashlib
+import json
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from market_data.models import DatasetVersion
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+AMFI_DATASET = "amfi"
+
+# any backend works (locmem, file-based, ...): keys carry the dataset
+# version, so stale entries are never read and simply age out
+CACHE_ALIAS = getattr(settings, "AMFI_API_CACHE_ALIAS", "default")
+CACHE_TIMEOUT = getattr(settings, "AMFI_API_CACHE_TIMEOUT", 24 * 60 * 60)
+
+KEY_PREFIX = "amfi-api"
+
+# params the views read with getlist() and split on commas; every other
+# param is read with get() (its last value), so its values are kept as sent
+MULTI_VALUE_PARAMS = {"months", "category", "bucket", "windows"}
+
+
+# ======================================================
+# DATASET VERSION
+# ======================================================
+
+def current_version(name: str = AMFI_DATASET):
+    """
+    (version, updated_at) of the dataset; (0, None) before the first bump.
+    """
+    row = (
+        DatasetVersion.objects
+        .filter(name=name)
+        .values_list("version", "updated_at")
+        .first()
+    )
+    return row or (0, None)
+
+
+async def acurrent_version(name: str = AMFI_DATASET):
+    row = await (
+        DatasetVersion.objects
+        .filter(name=name)
+        .values_list("version", "updated_at")
+        .afirst()
+    )
+    return row or (0, None)
+
+
+def bump_version(name: str = AMFI_DATASET):
+    """
+    Mark the dataset as changed. Call inside the transaction that changed
+    it, so readers never see new data under the old version.
+    """
+    now = timezone.now()
+    updated = DatasetVersion.objects.filter(name=name).update(
+        version=F("version") + 1, updated_at=now
+    )
+    if not updated:
+        DatasetVersion.objects.get_or_create(
+            name=name, defaults={"version": 1, "updated_at": now}
+        )
+
+
+# ======================================================
+# RESPONSE CACHE
+# ======================================================
+
+def normalized_params(query_dict):
+    """
+    Query parameters in a canonical form: keys sorted, and the list params
+    (MULTI_VALUE_PARAMS) stripped and split on commas the way the views
+    read them, so equivalent URLs share one entry. Single-value params are
+    kept verbatim: "?month=A,B" and "?month=A&month=B" are different
+    requests.
+    """
+    params = []
+    for key in sorted(query_dict):
+        values = query_dict.getlist(key)
+        if key in MULTI_VALUE_PARAMS:
+            values = [
+                part.strip()
+                for value in values
+                for part in value.split(",")
+                if part.strip()
+            ]
+        params.append((key, values))
+    return params
+
+
+def cache_key(view_name: str, version: int, query_dict) -> str:
+    params = json.dumps(normalized_params(query_dict), separators=(",", ":"))
+    digest = hashlib.sha256(params.encode()).hexdigest()[:32]
+    return f"{KEY_PREFIX}:{view_name}:v{version}:{digest}"
+
+
+def _entry(response):
+    return {
+        "body": response.content,
+        "content_type": response["Content-Type"],
+        "etag": quote_etag(hashlib.sha256(response.content).hexdigest()[:32]),
+    }
+
+
+def _last_modified(updated_at):
+    return int(updated_at.timestamp()) if updated_at else None
+
+
+def set_validators(response, etag, updated_at):
+    response["ETag"] = etag
+    last_modified = _last_modified(updated_at)
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, no_cache=True)
+
+
+def _respond(request, entry, updated_at):
+    response = HttpResponse(entry["body"], content_type=entry["content_type"])
+    set_validators(response, entry["etag"], updated_at)
+
+    return get_conditional_response(
+        request,
+        etag=entry["etag"],
+        last_modified=_last_modified(updated_at),
+        response=response,
+    )
+
+
+def versioned_etag(view_name: str, version: int, query_dict) -> str:
+    """
+    ETag for responses that are not cached (streamed exports) but depend
+    only on their params and the dataset version.
+    """
+    key = cache_key(view_name, version, query_dict)
+    return quote_etag(hashlib.sha256(key.encode()).hexdigest()[:32])
+
+
+def not_modified(request, etag, updated_at):
+    """
+    A 304 (or 412) answer to a conditional request, or None to go on and
+    build the full response.
+    """
+    return get_conditional_response(
+        request, etag=etag, last_modified=_last_modified(updated_at)
+    )
+
+
+def cached_api(view):
+    """
+    Cache a JSON view's successful GET responses per (normalized params,
+    dataset version), and answer conditional requests with 304s.
+
+    Responses carry an ETag (hash of the body) and Last-Modified (time of
+    the last dataset change), with ``Cache-Control: no-cache`` so clients
+    revalidate instead of trusting a stale copy. Works on sync and async
+    views.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return await view(request, *args, **kwargs)
+
+            version, updated_at = await acurrent_version()
+            cache = caches[CACHE_ALIAS]
+            key = cache_key(view.__name__, version, request.GET)
+
+            entry = await cache.aget(key)
+            if entry is None:
+                response = await view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                entry = _entry(response)
+                await cache.aset(key, entry, CACHE_TIMEOUT)
+
+            return _respond(request, entry, updated_at)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return view(request, *args, **kwargs)
+
+        version, updated_at = current_version()
+        cache = caches[CACHE_ALIAS]
+        key = cache_key(view.__name__, version, request.GET)
+
+        entry = cache.get(key)
+        if entry is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            entry = _entry(response)
+            cache.set(key, entry, CACHE_TIMEOUT)
+
+        return _respond(request, entry, updated_at)
+
+    return wrapper
@@ -0,0 +1,99 @@
+import re
+
+from market_data.models import SchemeCategory, SchemeCategoryAlias
+from market_data.services.amfi_analytics import BUCKETS
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# names AMFI has printed for a category besides its canonical one;
+# spacing, case and "Fund"/"Funds" differences are handled by
+# normalize_name and need no entry here
+SEED_ALIASES = {
+    "Sectoral Funds": "Sectoral/Thematic Funds",
+    "Thematic Funds": "Sectoral/Thematic Funds",
+    "Value Fund": "Value Fund/Contra Fund",
+    "Contra Fund": "Value Fund/Contra Fund",
+    "Equity Linked Savings Scheme": "ELSS",
+    "ELSS Funds": "ELSS",
+    "Multicap Fund": "Multi Cap Fund",
+    "Large and Mid Cap Fund": "Large & Mid Cap Fund",
+}
+
+
+def normalize_name(name: str) -> str:
+    """
+    Lookup key for a category name: case-folded, single-spaced, no spaces
+    around "/" or "&", and "Funds" read as "Fund".
+    """
+    name = " ".join(str(name).split())
+    name = re.sub(r"\s*([/&])\s*", r"\1", name).casefold()
+    return re.sub(r"\bfunds\b", "fund", name)
+
+
+def default_bucket(name: str) -> str:
+    """
+    Bucket a newly seen category starts in: the BUCKETS entry listing it,
+    else none. After that the SchemeCategory.bucket column is what counts.
+    """
+    for bucket, members in BUCKETS.items():
+        if name in members:
+            return bucket
+    return ""
+
+
+# ======================================================
+# NAME -> CATEGORY MAP (loaded once per ingest run)
+# ======================================================
+
+class CategoryMap:
+    """
+    Resolves raw report names to SchemeCategory ids in memory. Load it
+    once per run (two queries); names nobody has seen before create new
+    categories, listed in ``created`` so the run can report them.
+    """
+
+    def __init__(self, ids=None):
+        self.ids = ids or {}
+        self.created = []
+
+    @classmethod
+    def load(cls):
+        ids = {}
+        for category_id, name in SchemeCategory.objects.values_list("id", "name"):
+            ids.setdefault(normalize_name(name), category_id)
+        # aliases win over a category that merely normalizes the same way
+        for alias, category_id in SchemeCategoryAlias.objects.values_list(
+            "alias", "category_id"
+        ):
+            ids[normalize_name(alias)] = category_id
+        return cls(ids)
+
+    def resolve_all(self, names):
+        """
+        {raw name: category id} for ``names``, creating categories for
+        unknown names with one bulk INSERT and one SELECT.
+        """
+        unknown = {}
+        for name in names:
+            key = normalize_name(name)
+            if key not in self.ids:
+                unknown.setdefault(key, " ".join(str(name).split()))
+
+        if unknown:
+            SchemeCategory.objects.bulk_create(
+                [
+                    SchemeCategory(name=name, bucket=default_bucket(name))
+                    for name in unknown.values()
+                ],
+                ignore_conflicts=True,
+            )
+            for category_id, name in SchemeCategory.objects.filter(
+                name__in=list(unknown.values())
+            ).values_list("id", "name"):
+                self.ids[normalize_name(name)] = category_id
+            self.created += list(unknown.values())
+
+        return {name: self.ids[normalize_name(name)] for name in names}
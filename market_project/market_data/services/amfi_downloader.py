@@ -0,0 +1,262 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.utils import formatdate
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RATE_LIMIT = 10.0  # requests per second, per host
+REQUEST_TIMEOUT = 30
+
+# ETag / Last-Modified of every file we saved, kept next to the files
+META_FILENAME = ".download_meta.json"
+
+DOWNLOADED = "downloaded"
+NOT_MODIFIED = "not_modified"
+MISSING = "missing"
+ERROR = "error"
+# answered from the negative cache, no request made
+KNOWN_MISSING = "known_missing"
+
+
+@dataclass
+class DownloadJob:
+    url: str
+    path: Path
+    # seconds a recorded "not published" answer is trusted (None: always ask)
+    missing_ttl: Optional[float] = None
+
+
+@dataclass
+class DownloadResult:
+    url: str
+    path: Path
+    status: str
+    http_status: Optional[int] = None
+    bytes: int = 0
+    elapsed: float = 0.0
+    error: str = ""
+
+    @property
+    def available(self):
+        return self.path.exists()
+
+
+# ======================================================
+# RATE LIMIT (per host)
+# ======================================================
+
+class HostRateLimiter:
+    """
+    Spaces requests to the same host at least 1 / rate seconds apart.
+    A rate of 0 (or None) disables limiting.
+    """
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str):
+        if not self.interval:
+            return
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+# ======================================================
+# SESSION
+# ======================================================
+
+def build_session(pool_size: int = DEFAULT_CONCURRENCY) -> requests.Session:
+    """
+    One keep-alive session shared by every worker thread.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# ======================================================
+# CONDITIONAL REQUEST METADATA
+# ======================================================
+
+def _load_meta(directory: Path) -> dict:
+    meta_path = directory / META_FILENAME
+    try:
+        return json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_meta(directory: Path, meta: dict):
+    meta_path = directory / META_FILENAME
+    tmp_path = meta_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(meta, indent=2, sort_keys=True))
+    tmp_path.replace(meta_path)
+
+
+def _conditional_headers(path: Path, entry: dict) -> dict:
+    if not path.exists():
+        return {}
+
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    headers["If-Modified-Since"] = entry.get("last_modified") or formatdate(
+        path.stat().st_mtime, usegmt=True
+    )
+    return headers
+
+
+# ======================================================
+# NEGATIVE CACHE
+# ======================================================
+
+def _is_definitive_missing(result: DownloadResult) -> bool:
+    """
+    404s and empty bodies mean "not published"; server errors and rate
+    limiting say nothing about the report and are always retried.
+    """
+    if result.status != MISSING:
+        return False
+    return result.http_status < 500 and result.http_status != 429
+
+
+def _known_missing(job: DownloadJob, entry: dict) -> bool:
+    checked = entry.get("missing_checked")
+    if job.missing_ttl is None or checked is None or job.path.exists():
+        return False
+    return time.time() - checked < job.missing_ttl
+
+
+# ======================================================
+# DOWNLOAD
+# ======================================================
+
+def _fetch(session, limiter, job: DownloadJob, entry: dict, timeout):
+    headers = _conditional_headers(job.path, entry)
+    limiter.wait(job.url)
+
+    started = time.monotonic()
+    try:
+        r = session.get(job.url, headers=headers, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        return DownloadResult(
+            job.url, job.path, ERROR,
+            elapsed=time.monotonic() - started, error=str(e),
+        ), None
+
+    elapsed = time.monotonic() - started
+
+    if r.status_code == 304:
+        return DownloadResult(
+            job.url, job.path, NOT_MODIFIED, 304, elapsed=elapsed
+        ), None
+
+    if r.status_code != 200 or not r.content:
+        return DownloadResult(
+            job.url, job.path, MISSING, r.status_code, elapsed=elapsed
+        ), None
+
+    tmp_path = job.path.with_name(job.path.name + ".part")
+    with open(tmp_path, "wb") as f:
+        f.write(r.content)
+    tmp_path.replace(job.path)
+
+    new_entry = {
+        "etag": r.headers.get("ETag", ""),
+        "last_modified": r.headers.get("Last-Modified", ""),
+    }
+    return DownloadResult(
+        job.url, job.path, DOWNLOADED, 200, len(r.content), elapsed
+    ), new_entry
+
+
+def download_reports(
+    jobs,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate_limit: Optional[float] = DEFAULT_RATE_LIMIT,
+    session: Optional[requests.Session] = None,
+    timeout: float = REQUEST_TIMEOUT,
+):
+    """
+    Fetch every job on a bounded thread pool sharing one pooled session.
+
+    Files already on disk are re-requested conditionally (ETag /
+    If-Modified-Since), so unchanged reports come back as 304 without a
+    body. "Not published" answers are remembered in the same metadata
+    file and not re-requested for the job's ``missing_ttl``. Results are
+    returned in job order.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+
+    own_session = session is None
+    if own_session:
+        session = build_session(concurrency)
+
+    limiter = HostRateLimiter(rate_limit)
+    metas = {}
+    for job in jobs:
+        directory = job.path.parent
+        if directory not in metas:
+            metas[directory] = _load_meta(directory)
+
+    def run(job):
+        entry = metas[job.path.parent].get(job.path.name, {})
+        if _known_missing(job, entry):
+            return DownloadResult(
+                job.url, job.path, KNOWN_MISSING, entry.get("http_status")
+            ), None
+
+        result, new_entry = _fetch(session, limiter, job, entry, timeout)
+        if _is_definitive_missing(result) and not job.path.exists():
+            new_entry = {
+                "missing_checked": time.time(),
+                "http_status": result.http_status,
+            }
+        return result, new_entry
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            outcomes = list(pool.map(run, jobs))
+    finally:
+        if own_session:
+            session.close()
+
+    changed = set()
+    results = []
+    for job, (result, new_entry) in zip(jobs, outcomes):
+        if new_entry is not None:
+            metas[job.path.parent][job.path.name] = new_entry
+            changed.add(job.path.parent)
+        results.append(result)
+
+    for directory in changed:
+        _save_meta(directory, metas[directory])
+
+    return results
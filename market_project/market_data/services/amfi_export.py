@@ -0,0 +1,178 @@
+import csv
+import importlib.util
+import io
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+
+from market_data.models import AmfiMonthlyData
+from market_data.services.amfi_periods import year_range
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# rows fetched per database round trip, and per output chunk / row group
+EXPORT_CHUNK_SIZE = 2000
+
+COLUMNS = ["month", "period", "category", "bucket", "net_inflow"]
+
+# format -> (content type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+GZIP_CONTENT_TYPE = "application/gzip"
+
+
+def parquet_available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+# ======================================================
+# ROWS
+# ======================================================
+
+def export_queryset(from_year=None, to_year=None, categories=(), buckets=()):
+    """
+    Filtered AmfiMonthlyData as (month, period, category, bucket,
+    net_inflow) tuples in calendar order, without model instances.
+    """
+    qs = AmfiMonthlyData.objects.all()
+    if from_year is not None:
+        qs = qs.filter(period__range=year_range(from_year, to_year))
+    if categories:
+        qs = qs.filter(category__name__in=categories)
+    if buckets:
+        qs = qs.filter(category__bucket__in=buckets)
+
+    return (
+        qs
+        .order_by("period", "category_id", "id")
+        .values_list("month", "period", "category__name", "category__bucket", "net_inflow")
+    )
+
+
+def _batches(rows):
+    # rows come from queryset.iterator(), so at most one database chunk
+    # and one output batch are held at a time
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == EXPORT_CHUNK_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ======================================================
+# WRITERS (each yields bytes, one chunk per batch)
+# ======================================================
+
+def csv_chunks(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(COLUMNS)
+    for batch in _batches(rows):
+        writer.writerows(
+            (month, period.isoformat() if period else "", category, bucket, net_inflow)
+            for month, period, category, bucket, net_inflow in batch
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # header only, for an empty export
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def ndjson_chunks(rows):
+    for batch in _batches(rows):
+        yield "".join(
+            json.dumps(dict(zip(COLUMNS, (
+                month, period.isoformat() if period else None,
+                category, bucket, net_inflow,
+            )))) + "\n"
+            for month, period, category, bucket, net_inflow in batch
+        ).encode()
+
+
+def parquet_chunks(rows):
+    """
+    One Parquet row group per batch, handed out as soon as it is written;
+    the footer follows the last one.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("month", pa.string()),
+        ("period", pa.date32()),
+        ("category", pa.string()),
+        ("bucket", pa.string()),
+        ("net_inflow", pa.float64()),
+    ])
+    sink = io.BytesIO()
+
+    def drain():
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    with pq.ParquetWriter(sink, schema) as writer:
+        for batch in _batches(rows):
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            yield drain()
+    yield drain()
+
+
+WRITERS = {
+    "csv": csv_chunks,
+    "ndjson": ndjson_chunks,
+    "parquet": parquet_chunks,
+}
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(output: str, qs, compress: bool = False):
+    """
+    Bytes of the export in ``output`` format, generated while the
+    queryset is read in EXPORT_CHUNK_SIZE chunks.
+    """
+    chunks = WRITERS[output](qs.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+    return gzip_chunks(chunks) if compress else chunks
+
+
+async def aexport_stream(output: str, qs, compress: bool = False):
+    """
+    Async iterator over export_stream for ASGI. A sync iterator would be
+    read into memory in full before the first byte is sent; here each
+    chunk is produced in the request's thread-sensitive executor, where
+    the ORM runs.
+    """
+    chunks = export_stream(output, qs, compress)
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    done = object()
+
+    while (chunk := await next_chunk(chunks, done)) is not done:
+        yield chunk
@@ -0,0 +1,118 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+
+from market_data.services import amfi_frame_cache
+from market_data.services.amfi_reader import (
+    PANDAS_READER,
+    STREAM_READER,
+    stream_section_rows,
+)
+from market_data.services.amfi_sections import SectionNotFound, section_rows
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# Bump whenever extract_rows() changes so every report is re-extracted
+PARSER_VERSION = "2"
+
+
+class ExtractionError(Exception):
+    pass
+
+
+@dataclass
+class ExtractResult:
+    path: Path
+    rows: tuple = ()
+    error: str = ""
+    # wall time spent in the worker, reading + section detection
+    seconds: float = 0.0
+
+    @property
+    def ok(self):
+        return not self.error
+
+
+# ======================================================
+# SINGLE FILE
+# ======================================================
+
+def extract_rows(file_path, reader: str = PANDAS_READER, cache_dir=None):
+    """
+    Read one AMFI monthly report and return the Growth/Equity section as
+    a tuple of (scheme_category, net_inflow) pairs.
+
+    ``reader`` is "pandas" (whole sheet through read_excel) or "stream"
+    (lazy rows, stops at the section's Sub Total). With a ``cache_dir``
+    the pandas reader goes through the columnar parsed-frame cache.
+
+    Raises ExtractionError if the file cannot be read or the section is
+    missing.
+    """
+    if reader == STREAM_READER:
+        try:
+            return stream_section_rows(file_path)
+        except SectionNotFound as e:
+            raise ExtractionError(str(e))
+        except Exception as e:
+            raise ExtractionError(f"unreadable workbook: {e}")
+
+    try:
+        if cache_dir is not None:
+            df_raw = amfi_frame_cache.load_raw_frame(file_path, cache_dir)
+        else:
+            df_raw = pd.read_excel(file_path, header=None)
+    except Exception as e:
+        raise ExtractionError(f"unreadable workbook: {e}")
+
+    try:
+        return section_rows(df_raw)
+    except SectionNotFound as e:
+        raise ExtractionError(str(e))
+
+
+def extract_report(file_path, reader: str = PANDAS_READER, cache_dir=None) -> ExtractResult:
+    """
+    Process-pool entry point: never raises, so one bad file cannot take
+    down the whole batch.
+    """
+    path = Path(file_path)
+    started = time.perf_counter()
+    try:
+        result = ExtractResult(path, extract_rows(path, reader, cache_dir))
+    except ExtractionError as e:
+        result = ExtractResult(path, error=str(e))
+    except Exception as e:
+        result = ExtractResult(path, error=f"{type(e).__name__}: {e}")
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+# ======================================================
+# MANY FILES (process pool)
+# ======================================================
+
+def extract_reports(paths, workers: int = 1, reader: str = PANDAS_READER,
+                    cache_dir=None):
+    """
+    Extract every path, fanning out to a ProcessPoolExecutor when
+    workers > 1. Results come back in input order whatever the
+    completion order, so downstream writes stay deterministic.
+    """
+    paths = [Path(p) for p in paths]
+    workers = max(1, min(workers, len(paths)))
+
+    extract = partial(extract_report, reader=reader, cache_dir=cache_dir)
+
+    if workers == 1:
+        return [extract(path) for path in paths]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(extract, paths))
@@ -0,0 +1,206 @@
+import importlib.util
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from market_data.services.amfi_hashing import file_sha256
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# next to amfi_downloads/
+CACHE_DIR = Path("amfi_parsed_cache")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Bump when the way a raw sheet is read or stored changes. Section rules
+# live on top of the cached frame, so PARSER_VERSION bumps keep hitting.
+FRAME_VERSION = "1"
+
+SUFFIX = ".feather"
+
+
+def cache_available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+@dataclass
+class CacheStats:
+    entries: int
+    total_bytes: int
+    oldest: float = None
+    newest: float = None
+
+
+# ======================================================
+# (DE)SERIALISATION
+# ======================================================
+
+def _is_number(value):
+    return isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+
+
+def _to_columnar(df_raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Arrow needs one type per column, but report sheets mix header text
+    and numbers in the same column. Each sheet column is stored as a
+    float column "<i>" plus, when it holds any text, a string column
+    "<i>s" carrying the non-numeric cells.
+    """
+    columns = {}
+    for i, col in enumerate(df_raw.columns):
+        values = df_raw[col].tolist()
+        numbers = [float(v) if _is_number(v) else np.nan for v in values]
+        texts = [
+            None if _is_number(v) or v is None or pd.isna(v) else str(v)
+            for v in values
+        ]
+        columns[str(i)] = np.array(numbers, dtype=float)
+        if any(t is not None for t in texts):
+            columns[f"{i}s"] = pd.Series(texts, dtype=object)
+    return pd.DataFrame(columns)
+
+
+def _from_columnar(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Back to the read_excel(header=None) shape: integer column labels,
+    numbers as floats, text as str and blanks as NaN.
+    """
+    columns = {}
+    i = 0
+    while str(i) in df.columns:
+        numbers = df[str(i)].to_numpy()
+        text_col = f"{i}s"
+        if text_col in df.columns:
+            texts = df[text_col].to_numpy(dtype=object)
+            has_text = df[text_col].notna().to_numpy()
+            values = numbers.astype(object)
+            values[has_text] = texts[has_text]
+            columns[i] = values
+        else:
+            columns[i] = numbers
+        i += 1
+    return pd.DataFrame(columns)
+
+
+# ======================================================
+# CACHE
+# ======================================================
+
+def cache_path(sha256: str, cache_dir: Path = CACHE_DIR) -> Path:
+    return Path(cache_dir) / f"{sha256}-v{FRAME_VERSION}{SUFFIX}"
+
+
+def get(sha256: str, cache_dir: Path = CACHE_DIR):
+    """
+    Cached raw frame for a file hash, or None. A hit refreshes the
+    entry's mtime, which is what LRU eviction orders by.
+    """
+    path = cache_path(sha256, cache_dir)
+    try:
+        df = pd.read_feather(path)
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+    return _from_columnar(df)
+
+
+def put(sha256: str, df_raw: pd.DataFrame, cache_dir: Path = CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES):
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    path = cache_path(sha256, cache_dir)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    _to_columnar(df_raw).to_feather(tmp_path)
+    tmp_path.replace(path)
+
+    evict(cache_dir, max_bytes)
+
+
+def load_raw_frame(file_path, cache_dir: Path = CACHE_DIR,
+                   max_bytes: int = DEFAULT_MAX_BYTES) -> pd.DataFrame:
+    """
+    ``pd.read_excel(file_path, header=None)``, served from the columnar
+    cache when the file's content has been parsed before. Also the entry
+    point for ad-hoc notebooks.
+    """
+    sha256 = file_sha256(Path(file_path))
+
+    df_raw = get(sha256, cache_dir)
+    if df_raw is not None:
+        return df_raw
+
+    df_raw = pd.read_excel(file_path, header=None)
+    put(sha256, df_raw, cache_dir, max_bytes)
+    return df_raw
+
+
+# ======================================================
+# MAINTENANCE
+# ======================================================
+
+def _entries(cache_dir: Path):
+    entries = []
+    for path in Path(cache_dir).glob(f"*{SUFFIX}"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    return sorted(entries)
+
+
+def evict(cache_dir: Path = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+    """
+    Delete least recently used entries until the cache fits max_bytes.
+    Returns the number of entries removed.
+    """
+    entries = _entries(cache_dir)
+    total = sum(size for _, size, _ in entries)
+
+    removed = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def stats(cache_dir: Path = CACHE_DIR) -> CacheStats:
+    entries = _entries(cache_dir)
+    if not entries:
+        return CacheStats(0, 0)
+    return CacheStats(
+        entries=len(entries),
+        total_bytes=sum(size for _, size, _ in entries),
+        oldest=entries[0][0],
+        newest=entries[-1][0],
+    )
+
+
+def purge(cache_dir: Path = CACHE_DIR, older_than: float = None) -> int:
+    """
+    Remove every entry, or only those unused for ``older_than`` seconds.
+    """
+    cutoff = time.time() - older_than if older_than is not None else None
+    removed = 0
+    for mtime, _, path in _entries(cache_dir):
+        if cutoff is not None and mtime >= cutoff:
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        removed += 1
+    return removed
@@ -0,0 +1,107 @@
+import math
+
+from django.db import transaction
+
+from market_data.models import AmfiMonthlyData
+from market_data.services.amfi_analytics import refresh_bucket_summaries
+from market_data.services.amfi_categories import CategoryMap
+from market_data.services.amfi_periods import parse_month_label
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+BULK_BATCH_SIZE = 500
+
+
+def _same_value(a, b):
+    if a is None or b is None:
+        return a is b
+    if math.isnan(a) and math.isnan(b):
+        return True
+    return a == b
+
+
+def empty_counts():
+    return {"inserted": 0, "updated": 0, "unchanged": 0}
+
+
+# ======================================================
+# BULK UPSERT (one month per transaction)
+# ======================================================
+
+def upsert_month(month_label: str, rows, category_map: CategoryMap = None):
+    """
+    Write every (scheme_category, net_inflow) row of one month with a
+    single bulk INSERT ... ON CONFLICT DO UPDATE inside one transaction.
+
+    Category names are resolved to SchemeCategory ids through
+    ``category_map``; pass one map for a whole run so names are looked up
+    in memory (a fresh map costs two queries).
+
+    Existing rows are read once up front so unchanged categories are not
+    rewritten and the caller gets inserted / updated / unchanged counts.
+    When anything was written, the month's MonthlyBucketSummary rows are
+    recomputed in the same transaction.
+    """
+    rows = list(rows)
+    counts = empty_counts()
+    if not rows:
+        return counts
+
+    if category_map is None:
+        category_map = CategoryMap.load()
+    category_ids = category_map.resolve_all([scheme for scheme, _ in rows])
+
+    # last value wins if a report lists a category twice (or under two
+    # of its names)
+    incoming = {}
+    for scheme, net_inflow in rows:
+        incoming[category_ids[scheme]] = net_inflow
+
+    period = parse_month_label(month_label)
+
+    with transaction.atomic():
+        existing = {
+            category_id: (net_inflow, stored_period)
+            for category_id, net_inflow, stored_period in (
+                AmfiMonthlyData.objects
+                .filter(month=month_label, category_id__in=list(incoming))
+                .values_list("category_id", "net_inflow", "period")
+            )
+        }
+
+        to_write = []
+        for category_id, net_inflow in incoming.items():
+            if category_id not in existing:
+                counts["inserted"] += 1
+            elif (
+                _same_value(existing[category_id][0], net_inflow)
+                and existing[category_id][1] == period
+            ):
+                counts["unchanged"] += 1
+                continue
+            else:
+                counts["updated"] += 1
+
+            to_write.append(
+                AmfiMonthlyData(
+                    month=month_label,
+                    period=period,
+                    category_id=category_id,
+                    net_inflow=net_inflow,
+                )
+            )
+
+        if to_write:
+            AmfiMonthlyData.objects.bulk_create(
+                to_write,
+                batch_size=BULK_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=["month", "category"],
+                update_fields=["net_inflow", "period"],
+            )
+            refresh_bucket_summaries([month_label])
+
+    return counts
@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+from market_data.models import IngestedFile
+from market_data.services.amfi_hashing import file_sha256
+
+
+@dataclass
+class FileState:
+    path: Path
+    size: int
+    mtime: float
+    sha256: str = ""
+
+    @property
+    def key(self):
+        return str(self.path.resolve())
+
+
+# ======================================================
+# CHANGE DETECTION
+# ======================================================
+
+def pending_files(paths, parser_version: str, force: bool = False):
+    """
+    Return a FileState for every path that must be (re-)extracted.
+
+    A file is skipped when the manifest already holds it with the same
+    parser version and either the same size + mtime (no hashing needed)
+    or, after hashing, the same SHA-256. The manifest is read with a
+    single query.
+    """
+    states = []
+    for path in paths:
+        stat = path.stat()
+        states.append(FileState(path, stat.st_size, stat.st_mtime))
+
+    if force:
+        for state in states:
+            state.sha256 = file_sha256(state.path)
+        return states
+
+    manifest = {
+        entry.path: entry
+        for entry in IngestedFile.objects.filter(
+            path__in=[state.key for state in states]
+        )
+    }
+
+    pending = []
+    for state in states:
+        entry = manifest.get(state.key)
+
+        if entry is not None and entry.parser_version == parser_version:
+            if entry.size == state.size and entry.mtime == state.mtime:
+                continue
+
+            state.sha256 = file_sha256(state.path)
+            if entry.sha256 == state.sha256:
+                # touched but identical: remember the new stat so the
+                # next run takes the fast path again
+                entry.size, entry.mtime = state.size, state.mtime
+                entry.save(update_fields=["size", "mtime"])
+                continue
+        else:
+            state.sha256 = file_sha256(state.path)
+
+        pending.append(state)
+
+    return pending
+
+
+def record_ingested(state: FileState, parser_version: str, row_count: int):
+    IngestedFile.objects.update_or_create(
+        path=state.key,
+        defaults={
+            "size": state.size,
+            "mtime": state.mtime,
+            "sha256": state.sha256,
+            "parser_version": parser_version,
+            "row_count": row_count,
+        },
+    )
@@ -0,0 +1,149 @@
+import json
+import math
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+PERCENTILES = [50, 90, 95, 99]
+
+# timings summarised with percentiles at the end of a run
+TIMED_FIELDS = ["download_seconds", "parse_seconds", "db_seconds"]
+
+# per-file outcomes
+INGESTED = "ingested"
+UNCHANGED = "unchanged"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+
+@dataclass
+class FileMetrics:
+    """
+    One JSON-lines record: everything that happened to a single report
+    during a run.
+    """
+    file: str
+    month: str
+    url: str = ""
+    download_status: str = ""
+    http_status: int = None
+    # None when no request was made
+    download_seconds: float = None
+    download_bytes: int = 0
+    parse_seconds: float = None
+    rows_extracted: int = None
+    rows_written: int = None
+    db_seconds: float = None
+    outcome: str = ""
+    reason: str = ""
+
+
+def percentile(values, q):
+    """
+    Linear-interpolated percentile (same as numpy's default method).
+    """
+    values = sorted(values)
+    if not values:
+        return None
+    rank = (len(values) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+# ======================================================
+# RUN COLLECTOR
+# ======================================================
+
+@dataclass
+class RunMetrics:
+    """
+    Collects per-file records and stage wall times for one pipeline run
+    and writes them as JSON lines ({"type": "file"} per report, one
+    {"type": "summary"} at the end).
+    """
+    run_id: str = field(
+        default_factory=lambda: datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    )
+    files: dict = field(default_factory=dict)
+    stages: dict = field(default_factory=dict)
+    started: float = field(default_factory=time.monotonic)
+
+    def file(self, key, **values) -> FileMetrics:
+        """
+        Record for ``key`` (created on first use), updated with ``values``.
+        """
+        record = self.files.get(key)
+        if record is None:
+            record = self.files[key] = FileMetrics(**values)
+        else:
+            for name, value in values.items():
+                setattr(record, name, value)
+        return record
+
+    def stage(self, name):
+        """
+        Context manager adding the block's wall time to stage ``name``.
+        """
+        return _StageTimer(self, name)
+
+    def summary(self) -> dict:
+        records = list(self.files.values())
+
+        outcomes = {}
+        for record in records:
+            outcomes[record.outcome] = outcomes.get(record.outcome, 0) + 1
+
+        timings = {}
+        for name in TIMED_FIELDS:
+            values = [getattr(r, name) for r in records if getattr(r, name) is not None]
+            timings[name] = {
+                "count": len(values),
+                "total": round(sum(values), 6),
+                **{
+                    f"p{q}": _round(percentile(values, q))
+                    for q in PERCENTILES
+                },
+                "max": _round(max(values)) if values else None,
+            }
+
+        return {
+            "files": len(records),
+            "outcomes": outcomes,
+            "download_bytes": sum(r.download_bytes for r in records),
+            "rows_extracted": sum(r.rows_extracted or 0 for r in records),
+            "rows_written": sum(r.rows_written or 0 for r in records),
+            "timings": timings,
+            "stage_seconds": {k: round(v, 6) for k, v in self.stages.items()},
+            "wall_seconds": round(time.monotonic() - self.started, 6),
+        }
+
+    def write_jsonl(self, handle):
+        stamp = {"run_id": self.run_id}
+        for record in self.files.values():
+            handle.write(json.dumps({"type": "file", **stamp, **asdict(record)}) + "\n")
+        handle.write(json.dumps({"type": "summary", **stamp, **self.summary()}) + "\n")
+
+
+class _StageTimer:
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        stages = self.metrics.stages
+        stages[self.name] = stages.get(self.name, 0.0) + elapsed
+        return False
+
+
+def _round(value):
+    return None if value is None else round(value, 6)
@@ -0,0 +1,39 @@
+from datetime import date, datetime
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# "November 2025" (ingestion), "Nov 2025", and "2025-11" (older imports)
+MONTH_FORMATS = ["%B %Y", "%b %Y", "%Y-%m"]
+
+
+def parse_month_label(label: str):
+    """
+    First day of the reporting month a ``month`` label refers to, or None
+    if the label is not in a known format.
+    """
+    label = (label or "").strip()
+    for fmt in MONTH_FORMATS:
+        try:
+            parsed = datetime.strptime(label, fmt)
+        except ValueError:
+            continue
+        return date(parsed.year, parsed.month, 1)
+    return None
+
+
+def period_key(period: date) -> str:
+    """
+    Sortable "YYYY-MM" key used by the pivot / time-series outputs.
+    """
+    return period.strftime("%Y-%m")
+
+
+def year_range(year: int, to_year: int = None):
+    """
+    (first, last) period of a calendar year, or of ``year`` through
+    ``to_year``, for ``period__range``.
+    """
+    return date(year, 1, 1), date(year if to_year is None else to_year, 12, 1)
@@ -0,0 +1,206 @@
+import math
+from dataclasses import dataclass, field
+
+from market_data.services.amfi_sections import (
+    END_PATTERN,
+    HEADER_PATTERN,
+    NET_INFLOW_COLUMN,
+    SCHEME_COLUMN,
+    SKIP_ROW_PATTERN,
+    START_PATTERN,
+    SectionNotFound,
+    clean_labels,
+    find_column,
+)
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+PANDAS_READER = "pandas"
+STREAM_READER = "stream"
+READERS = [PANDAS_READER, STREAM_READER]
+
+ZIP_SIGNATURE = b"PK\x03\x04"
+
+
+@dataclass
+class StreamedSection:
+    """
+    Header labels and raw cell values of the kept columns, from the
+    "Growth/Equity Oriented Schemes" row down to the "Sub Total" row.
+    """
+    labels: list
+    rows: list = field(default_factory=list)
+
+
+# ======================================================
+# WORKBOOK STREAMS
+# ======================================================
+
+class XlsStream:
+    """
+    Legacy .xls through xlrd with ``on_demand=True``: only the first
+    sheet is loaded, and cells are read per requested column.
+    """
+
+    def __init__(self, path):
+        import xlrd
+
+        self.book = xlrd.open_workbook(str(path), on_demand=True)
+        self.sheet = self.book.sheet_by_index(0)
+
+    def rows(self, start_row=0, columns=None):
+        sheet = self.sheet
+        for r in range(start_row, sheet.nrows):
+            if columns is None:
+                values = sheet.row_values(r)
+            else:
+                width = sheet.row_len(r)
+                values = [
+                    sheet.cell_value(r, c) if c < width else None
+                    for c in columns
+                ]
+            yield [None if v == "" else v for v in values]
+
+    def close(self):
+        self.book.release_resources()
+
+
+class XlsxStream:
+    """
+    .xlsx through openpyxl ``read_only`` mode: rows are parsed from the
+    sheet XML lazily, and only the requested column range is read.
+    """
+
+    def __init__(self, path):
+        import openpyxl
+
+        # a file object, so openpyxl does not reject a mislabelled ".xls"
+        self.handle = open(path, "rb")
+        self.book = openpyxl.load_workbook(self.handle, read_only=True, data_only=True)
+        self.sheet = self.book.worksheets[0]
+
+    def rows(self, start_row=0, columns=None):
+        if columns is None:
+            for values in self.sheet.iter_rows(min_row=start_row + 1, values_only=True):
+                yield list(values)
+            return
+
+        first, last = min(columns), max(columns)
+        for values in self.sheet.iter_rows(
+            min_row=start_row + 1,
+            min_col=first + 1,
+            max_col=last + 1,
+            values_only=True,
+        ):
+            width = len(values)
+            yield [
+                values[c - first] if c - first < width else None
+                for c in columns
+            ]
+
+    def close(self):
+        self.book.close()
+        self.handle.close()
+
+
+def open_stream(path):
+    """
+    Pick the stream from the file signature rather than the extension:
+    AMFI has served .xlsx (zip) content under .xls names.
+    """
+    with open(path, "rb") as f:
+        signature = f.read(4)
+
+    if signature == ZIP_SIGNATURE:
+        return XlsxStream(path)
+    return XlsStream(path)
+
+
+def _row_text(values):
+    return " ".join("" if v is None else str(v) for v in values).lower()
+
+
+# ======================================================
+# STREAMING SECTION EXTRACTION
+# ======================================================
+
+def stream_section(path, column_patterns=None, include_end=False) -> StreamedSection:
+    """
+    Read rows lazily until the header row, then only the columns matching
+    ``column_patterns`` (all labelled columns if None) and stop as soon
+    as the section's "Sub Total" row is seen; the rest of the sheet is
+    never read.
+
+    Start / end markers are matched against the kept columns only.
+    """
+    stream = open_stream(path)
+    try:
+        header_row, labels = None, None
+        for i, values in enumerate(stream.rows()):
+            if HEADER_PATTERN.search(_row_text(values)):
+                header_row, labels = i, clean_labels(values)
+                break
+
+        if header_row is None:
+            raise SectionNotFound("header row not found")
+
+        if column_patterns is None:
+            columns = [i for i, label in enumerate(labels) if label]
+        else:
+            columns = [find_column(labels, pattern) for pattern in column_patterns]
+
+        section = StreamedSection([labels[c] for c in columns])
+        in_section = False
+
+        for values in stream.rows(header_row + 1, columns):
+            text = _row_text(values)
+
+            if not in_section:
+                if START_PATTERN.search(text):
+                    in_section = True
+                    section.rows.append(values)
+                continue
+
+            if END_PATTERN.search(text):
+                if include_end:
+                    section.rows.append(values)
+                return section
+
+            section.rows.append(values)
+    finally:
+        stream.close()
+
+    raise SectionNotFound("Growth / Equity section not found")
+
+
+def _to_float(value):
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+def stream_section_rows(path):
+    """
+    Streaming counterpart of amfi_sections.section_rows(): the same
+    (scheme_category, net_inflow) tuples, reading two columns only.
+    """
+    section = stream_section(path, [SCHEME_COLUMN, NET_INFLOW_COLUMN])
+
+    rows = []
+    for scheme, net_inflow in section.rows:
+        scheme = "" if scheme is None else str(scheme).strip()
+        net_inflow = _to_float(net_inflow)
+
+        if not scheme or SKIP_ROW_PATTERN.search(scheme.lower()) or net_inflow is None:
+            continue
+
+        rows.append((scheme, net_inflow))
+
+    return tuple(rows)
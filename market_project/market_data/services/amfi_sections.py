@@ -0,0 +1,178 @@
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+START_KEYWORDS = ["growth", "equity", "oriented"]
+END_KEYWORDS = ["sub total", "subtotal", "sub-total"]
+HEADER_KEYWORDS = ["scheme", "net", "assets", "aum", "rs.", "₹"]
+
+# any header keyword
+HEADER_PATTERN = re.compile("|".join(re.escape(k) for k in HEADER_KEYWORDS))
+
+# every start keyword, in any order, on one line
+START_PATTERN = re.compile(
+    "^" + "".join(f"(?=[^\n]*{re.escape(k)})" for k in START_KEYWORDS),
+    re.MULTILINE,
+)
+
+# any end keyword
+END_PATTERN = re.compile("|".join(re.escape(k) for k in END_KEYWORDS))
+
+# rows inside the section that are not scheme categories
+SKIP_ROW_PATTERN = re.compile(r"sub total|growth/equity")
+
+SCHEME_COLUMN = re.compile(r"scheme\s*name")
+NET_INFLOW_COLUMN = re.compile(r"net\s*inflow")
+
+
+class SectionNotFound(Exception):
+    pass
+
+
+@dataclass
+class SectionBounds:
+    """
+    Positional row indexes into the raw sheet: the header row, the
+    "Growth/Equity Oriented Schemes" row and its "Sub Total" row.
+    """
+    header_row: int
+    start: int
+    end: int
+
+
+# ======================================================
+# ROW TEXT
+# ======================================================
+
+def row_text(df_raw: pd.DataFrame) -> pd.Series:
+    """
+    One lowercased, space-joined string per row, built in a single pass
+    over the sheet's object array (blank cells render as "nan", which no
+    keyword matches).
+    """
+    cells = df_raw.to_numpy(dtype=object).tolist()
+    return pd.Series(
+        [" ".join(map(str, row)).replace("\n", " ").lower() for row in cells],
+        dtype=object,
+    )
+
+
+class SheetText:
+    """
+    The row texts joined into one newline-separated string, so each
+    marker lookup is a single precompiled-regex scan in C that stops at
+    the first hit, instead of a Python loop over rows.
+    """
+
+    def __init__(self, text: pd.Series):
+        lines = text.tolist()
+        self.joined = "\n".join(lines)
+        self.line_starts = np.cumsum([0] + [len(line) + 1 for line in lines[:-1]])
+
+    def first_match(self, pattern, start: int = 0):
+        """
+        Row index of the first match at or after row ``start``, or None.
+        """
+        if start >= len(self.line_starts):
+            return None
+        m = pattern.search(self.joined, int(self.line_starts[start]))
+        if m is None:
+            return None
+        return int(np.searchsorted(self.line_starts, m.start(), side="right")) - 1
+
+
+# ======================================================
+# SECTION DETECTION
+# ======================================================
+
+def locate_section(df_raw: pd.DataFrame, text: pd.Series = None) -> SectionBounds:
+    if text is None:
+        text = row_text(df_raw)
+    sheet = SheetText(text)
+
+    header_row = sheet.first_match(HEADER_PATTERN)
+    if header_row is None:
+        raise SectionNotFound("header row not found")
+
+    start = sheet.first_match(START_PATTERN, header_row + 1)
+    end = sheet.first_match(END_PATTERN, start + 1) if start is not None else None
+    if start is None or end is None:
+        raise SectionNotFound("Growth / Equity section not found")
+
+    return SectionBounds(header_row, start, end)
+
+
+def clean_labels(values):
+    """
+    Cleaned header text per cell; None where the header cell is blank.
+    """
+    labels = []
+    for value in values:
+        label = "" if value is None or pd.isna(value) else " ".join(str(value).split())
+        labels.append(label or None)
+    return labels
+
+
+def header_labels(df_raw: pd.DataFrame, header_row: int):
+    return clean_labels(df_raw.iloc[header_row].tolist())
+
+
+def find_column(labels, pattern) -> int:
+    for i, label in enumerate(labels):
+        if label and pattern.search(label.lower()):
+            return i
+    raise SectionNotFound(f"no column matching '{pattern.pattern}'")
+
+
+def extract_section(df_raw: pd.DataFrame, include_end: bool = False) -> pd.DataFrame:
+    """
+    The Growth/Equity section with columns named from the header row.
+    Columns without a header are dropped. ``include_end`` keeps the
+    "Sub Total" row.
+    """
+    bounds = locate_section(df_raw)
+    labels = header_labels(df_raw, bounds.header_row)
+
+    stop = bounds.end + 1 if include_end else bounds.end
+    keep = [i for i, label in enumerate(labels) if label]
+
+    section = df_raw.iloc[bounds.start:stop, keep].copy()
+    section.columns = [labels[i] for i in keep]
+    return section.reset_index(drop=True)
+
+
+def section_rows(df_raw: pd.DataFrame, bounds: SectionBounds = None):
+    """
+    (scheme_category, net_inflow) tuples for the Growth/Equity section.
+    Category headings, sub totals and non-numeric inflows are skipped.
+    Pass ``bounds`` to reuse an earlier locate_section() result.
+    """
+    if bounds is None:
+        bounds = locate_section(df_raw)
+    labels = header_labels(df_raw, bounds.header_row)
+    scheme_col = find_column(labels, SCHEME_COLUMN)
+    inflow_col = find_column(labels, NET_INFLOW_COLUMN)
+
+    block = df_raw.iloc[bounds.start:bounds.end]
+    schemes = [
+        "" if pd.isna(v) else str(v).strip()
+        for v in block.iloc[:, scheme_col].tolist()
+    ]
+    inflows = pd.to_numeric(
+        block.iloc[:, inflow_col].to_numpy(), errors="coerce"
+    ).astype(float)
+
+    return tuple(
+        (scheme, float(inflow))
+        for scheme, inflow in zip(schemes, inflows)
+        if scheme
+        and not SKIP_ROW_PATTERN.search(scheme.lower())
+        and not np.isnan(inflow)
+    )
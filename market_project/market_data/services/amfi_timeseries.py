@@ -0,0 +1,272 @@
+from datetime import date
+
+import numpy as np
+from django.core.cache import caches
+
+from market_data.models import AmfiMonthlyData
+from market_data.services.amfi_analytics import BUCKETS, PIVOT_CHUNK_SIZE
+from market_data.services.amfi_api_cache import (
+    CACHE_ALIAS,
+    CACHE_TIMEOUT,
+    KEY_PREFIX,
+    acurrent_version,
+    current_version,
+)
+from market_data.services.amfi_periods import period_key
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+ROLLING_WINDOWS = [3, 6, 12]
+
+# year-over-year compares a month with the same month a year earlier
+YOY_LAG = 12
+
+
+class UnknownSeries(ValueError):
+    pass
+
+
+def _month_number(period: date) -> int:
+    return period.year * 12 + period.month - 1
+
+
+def _period(month_number: int) -> date:
+    return date(month_number // 12, month_number % 12 + 1, 1)
+
+
+# ======================================================
+# MONTH x CATEGORY MATRIX
+# ======================================================
+
+def _cells_query():
+    # same ordering as the pivots: the latest row wins when a month is
+    # stored under two labels
+    return (
+        AmfiMonthlyData.objects
+        .exclude(period=None)
+        .order_by("period", "category_id", "id")
+        .values_list("period", "category__name", "category__bucket", "net_inflow")
+    )
+
+
+def build_matrix(cells):
+    """
+    Dense matrix from (period, category, bucket, net_inflow) tuples.
+
+    Returns (first month number, categories, buckets, values): values is
+    a float array of shape (months, categories) and buckets[i] the KPI
+    bucket of categories[i]. The month axis is contiguous, so months with
+    no report are rows of NaN and window arithmetic can work on positions.
+    """
+    latest = {}
+    bucket_of = {}
+    for period, category, bucket, net_inflow in cells:
+        latest[_month_number(period), category] = net_inflow
+        bucket_of[category] = bucket
+
+    if not latest:
+        return 0, [], [], np.empty((0, 0))
+
+    categories = sorted(bucket_of)
+    column = {category: i for i, category in enumerate(categories)}
+    first = min(month for month, _ in latest)
+    last = max(month for month, _ in latest)
+
+    keys = list(latest)
+    values = np.full((last - first + 1, len(categories)), np.nan)
+    values[
+        [month - first for month, _ in keys],
+        [column[category] for _, category in keys],
+    ] = [latest[key] for key in keys]
+    return first, categories, [bucket_of[c] for c in categories], values
+
+
+def _matrix_key(version: int) -> str:
+    return f"{KEY_PREFIX}:timeseries-matrix:v{version}"
+
+
+def load_matrix():
+    """
+    The whole month x category matrix, loaded with one query and kept in
+    the API cache for the current dataset version.
+    """
+    version, _ = current_version()
+    cache = caches[CACHE_ALIAS]
+
+    matrix = cache.get(_matrix_key(version))
+    if matrix is None:
+        matrix = build_matrix(_cells_query().iterator(chunk_size=PIVOT_CHUNK_SIZE))
+        cache.set(_matrix_key(version), matrix, CACHE_TIMEOUT)
+    return matrix
+
+
+async def aload_matrix():
+    version, _ = await acurrent_version()
+    cache = caches[CACHE_ALIAS]
+
+    matrix = await cache.aget(_matrix_key(version))
+    if matrix is None:
+        matrix = build_matrix([row async for row in _cells_query()])
+        await cache.aset(_matrix_key(version), matrix, CACHE_TIMEOUT)
+    return matrix
+
+
+# ======================================================
+# WINDOW ARITHMETIC (vectorized over every series at once)
+# ======================================================
+
+def series_columns(categories, category_buckets, values, names, buckets):
+    """
+    (labels, columns) for the requested categories and buckets: category
+    columns are taken as is, a bucket is the sum of the categories in it
+    (NaN only when none of them reported that month).
+    """
+    column = {category: i for i, category in enumerate(categories)}
+    labels, columns = [], []
+
+    for name in names:
+        if name not in column:
+            raise UnknownSeries(f"unknown category: {name}")
+        labels.append(("category", name))
+        columns.append(values[:, column[name]])
+
+    for name in buckets:
+        if name not in BUCKETS:
+            raise UnknownSeries(f"unknown bucket: {name}")
+        members = [i for i, bucket in enumerate(category_buckets) if bucket == name]
+        block = values[:, members]
+        observed = ~np.isnan(block).all(axis=1)
+        labels.append(("bucket", name))
+        columns.append(np.where(observed, np.nansum(block, axis=1), np.nan))
+
+    width = len(values)
+    return labels, np.column_stack(columns) if columns else np.empty((width, 0))
+
+
+def rolling_sum(series, window: int):
+    """
+    Trailing ``window``-month sums down axis 0, from two cumulative sums
+    (values and observed counts); NaN unless all months in the window
+    reported.
+    """
+    filled = np.nan_to_num(series)
+    observed = (~np.isnan(series)).astype(float)
+    zeros = np.zeros((1,) + series.shape[1:])
+
+    sums = np.concatenate([zeros, np.cumsum(filled, axis=0)])
+    counts = np.concatenate([zeros, np.cumsum(observed, axis=0)])
+
+    out = np.full(series.shape, np.nan)
+    if window <= len(series):
+        window_sums = sums[window:] - sums[:-window]
+        complete = counts[window:] - counts[:-window] == window
+        out[window - 1:] = np.where(complete, window_sums, np.nan)
+    return out
+
+
+def lagged(series, lag: int):
+    out = np.full(series.shape, np.nan)
+    if lag < len(series):
+        out[lag:] = series[:-lag]
+    return out
+
+
+def yoy(series):
+    """
+    (absolute change, percent change) against the same month a year
+    earlier. Flows change sign, so percentages are relative to the
+    magnitude of last year's value; NaN when it was zero.
+    """
+    previous = lagged(series, YOY_LAG)
+    change = series - previous
+    magnitude = np.abs(previous)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(magnitude > 0, change / magnitude * 100, np.nan)
+    return change, pct
+
+
+def cumulative(series):
+    """
+    Running total from the first month; months without a report add
+    nothing but stay NaN themselves.
+    """
+    return np.where(np.isnan(series), np.nan, np.nancumsum(series, axis=0))
+
+
+def _json_column(values):
+    return [None if v != v else v for v in np.round(values, 2).tolist()]
+
+
+# ======================================================
+# TIME SERIES
+# ======================================================
+
+def _timeseries(matrix, categories, buckets, from_period, to_period, windows):
+    first, all_categories, category_buckets, values = matrix
+    if not categories and not buckets:
+        buckets = list(BUCKETS)
+
+    labels, series = series_columns(
+        all_categories, category_buckets, values, categories, buckets
+    )
+
+    # the range is clipped to the data; windows and YoY still look back
+    # before it, cumulative flows start at its first month
+    start = max(_month_number(from_period) - first, 0) if from_period else 0
+    stop = len(values)
+    if to_period:
+        stop = min(_month_number(to_period) - first + 1, stop)
+    stop = max(stop, start)
+
+    rolling = {w: rolling_sum(series, w)[start:stop] for w in windows}
+    change, pct = (a[start:stop] for a in yoy(series))
+    running = cumulative(series[start:stop])
+    series = series[start:stop]
+
+    return {
+        "months": [period_key(_period(first + i)) for i in range(start, stop)],
+        "windows": list(windows),
+        "series": [
+            {
+                "kind": kind,
+                "name": name,
+                "net_inflow": _json_column(series[:, i]),
+                "rolling": {
+                    str(w): _json_column(rolling[w][:, i]) for w in windows
+                },
+                "yoy_change": _json_column(change[:, i]),
+                "yoy_pct": _json_column(pct[:, i]),
+                "cumulative": _json_column(running[:, i]),
+            }
+            for i, (kind, name) in enumerate(labels)
+        ],
+    }
+
+
+def amfi_timeseries(
+    categories=(), buckets=(), from_period=None, to_period=None,
+    windows=ROLLING_WINDOWS,
+):
+    """
+    Monthly net inflow per category / bucket with trailing rolling sums,
+    year-over-year change and cumulative flows, as columns aligned with a
+    contiguous "YYYY-MM" months array (null where a month has no data).
+    Defaults to every bucket over the whole history.
+
+    Raises UnknownSeries for a category or bucket that does not exist.
+    """
+    return _timeseries(
+        load_matrix(), categories, buckets, from_period, to_period, windows
+    )
+
+
+async def aamfi_timeseries(
+    categories=(), buckets=(), from_period=None, to_period=None,
+    windows=ROLLING_WINDOWS,
+):
+    return _timeseries(
+        await aload_matrix(), categories, buckets, from_period, to_period, windows
+    )
@@ -0,0 +1,79 @@
+from django.db.models import Sum
+
+from market_data.models import FiiSectorInvestment, MonthlyBucketSummary
+from market_data.services.amfi_analytics import BUCKETS
+from market_data.services.amfi_periods import period_key, year_range
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# AMFI reports INR Crores, so comparisons use NSDL's INR Cr columns
+FII_CURRENCY = "INR"
+
+FII_EQUITY = ["equity"]
+
+
+# ======================================================
+# FII NET INVESTMENT PER MONTH
+# ======================================================
+
+def monthly_fii_net_investment(
+    from_year=None, to_year=None, asset_classes=FII_EQUITY,
+    currency=FII_CURRENCY, sectors=(),
+):
+    """
+    FII net investment per month (both fortnights, every sector unless
+    ``sectors`` is given), one GROUP BY over FiiFortnight.period, the
+    same month key as AmfiMonthlyData.period.
+
+    Returns {"YYYY-MM": total} in calendar order.
+    """
+    qs = FiiSectorInvestment.objects.filter(
+        currency=currency, asset_class__in=asset_classes
+    )
+    if from_year:
+        qs = qs.filter(fortnight__period__range=year_range(from_year, to_year))
+    if sectors:
+        qs = qs.filter(sector__name__in=sectors)
+
+    return {
+        period_key(period): round(total or 0, 2)
+        for period, total in (
+            qs
+            .values("fortnight__period")
+            .order_by("fortnight__period")
+            .annotate(total=Sum("net_investment"))
+            .values_list("fortnight__period", "total")
+        )
+    }
+
+
+def amfi_vs_fii(from_year=None, to_year=None):
+    """
+    Domestic mutual fund bucket flows (MonthlyBucketSummary) next to FII
+    equity net investment, month by month, both in INR Crores. Months
+    with either side missing are included with that side null.
+
+    Returns a list of {"month": "YYYY-MM", <bucket>: ..., "fii_equity": ...}.
+    """
+    summaries = MonthlyBucketSummary.objects.exclude(period=None)
+    if from_year:
+        summaries = summaries.filter(period__range=year_range(from_year, to_year))
+
+    months = {}
+    for period, bucket, net_inflow in (
+        summaries.order_by("period", "month").values_list("period", "bucket", "net_inflow")
+    ):
+        months.setdefault(period_key(period), {})[bucket] = round(net_inflow, 2)
+
+    fii = monthly_fii_net_investment(from_year, to_year)
+    return [
+        {
+            "month": month,
+            **{name: months.get(month, {}).get(name) for name in BUCKETS},
+            "fii_equity": fii.get(month),
+        }
+        for month in sorted(set(months) | set(fii))
+    ]
@@ -0,0 +1,276 @@
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional
+
+from django.db import transaction
+
+from market_data.models import IngestedFile
+from market_data.services.amfi_downloader import (
+    ERROR,
+    KNOWN_MISSING,
+    DownloadJob,
+    build_session,
+    download_reports,
+)
+from market_data.services.amfi_ingest import empty_counts
+from market_data.services.amfi_manifest import pending_files, record_ingested
+from market_data.services.amfi_metrics import FAILED, INGESTED, SKIPPED, UNCHANGED
+from market_data.services.nsdl_fii_extract import (
+    DEFAULT_PARSER,
+    PARSER_VERSION,
+    NsdlFormatError,
+    parse_fii_report,
+)
+from market_data.services.nsdl_fii_ingest import upsert_report
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+BASE_URL = (
+    "https://www.fpi.nsdl.co.in/web/StaticReports/"
+    "Fortnightly_Sector_wise_FII_Investment_Data"
+)
+
+# e.g. FIIInvestSector_Dec152025.html for the fortnight ending Dec 15, 2025
+REPORT_NAME = "FIIInvestSector_{end:%b%d%Y}.html"
+
+# the NSDL server turns away clients that do not look like a browser
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Referer": "https://www.fpi.nsdl.co.in/",
+}
+
+DOWNLOAD_DIR = Path("nsdl_downloads")
+
+# a public site: fewer connections and a gentler pace than the AMFI portal
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE_LIMIT = 2.0  # requests per second
+
+# pages downloaded before they are parsed and stored; each page commits
+# on its own, so an interrupted run loses at most one batch of downloads
+BATCH_SIZE = 24
+
+# a page this old is final: once ingested it is not requested again
+SETTLED_DAYS = 45
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# How long a "not published" answer is trusted, by page age in days.
+# Pages appear a few days after the fortnight ends; an old page that is
+# still missing never will be.
+MISSING_TTL = [
+    (20, 6 * HOUR),
+    (60, DAY),
+    (365, 7 * DAY),
+    (None, 30 * DAY),
+]
+
+# page already ingested and settled, no request made
+CHECKPOINTED = "checkpointed"
+
+
+@dataclass
+class CrawlPage:
+    """
+    One fortnight page of a crawl and what happened to it.
+    """
+    end: date
+    url: str
+    path: Path
+    outcome: str = ""
+    download_status: str = ""
+    http_status: Optional[int] = None
+    rows: int = 0
+    counts: dict = field(default_factory=empty_counts)
+    error: str = ""
+
+
+# ======================================================
+# FORTNIGHTS
+# ======================================================
+
+def _month_end(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+def latest_fortnight_end(today: date) -> date:
+    """
+    The last fortnight that has ended by ``today``: the 15th, or the last
+    day of the previous month.
+    """
+    if today.day > 15:
+        return today.replace(day=15)
+    return today.replace(day=1) - timedelta(days=1)
+
+
+def fortnight_ends(since: date, until: date):
+    """
+    Every fortnight end (the 15th and the month end) from ``since`` to
+    ``until``, both included, oldest first.
+    """
+    end = since.replace(day=15) if since.day <= 15 else _month_end(since)
+    ends = []
+    while end <= until:
+        ends.append(end)
+        end = _month_end(end) if end.day == 15 else (end + timedelta(days=15)).replace(day=15)
+    return ends
+
+
+def report_name(end: date) -> str:
+    return REPORT_NAME.format(end=end)
+
+
+def report_url(end: date, base_url: str = BASE_URL) -> str:
+    return f"{base_url.rstrip('/')}/{report_name(end)}"
+
+
+def missing_ttl(age_days):
+    for max_age, ttl in MISSING_TTL:
+        if max_age is None or age_days <= max_age:
+            return ttl
+
+
+# ======================================================
+# CHECKPOINT
+# ======================================================
+
+def _checkpointed(pages, today: date):
+    """
+    Paths of the settled pages the manifest already holds with the
+    current parser. Rows and manifest entry commit together, so the
+    manifest is exactly what an interrupted crawl stored.
+    """
+    settled = {
+        str(page.path.resolve())
+        for page in pages
+        if (today - page.end).days > SETTLED_DAYS
+    }
+    return set(
+        IngestedFile.objects
+        .filter(path__in=settled, parser_version=PARSER_VERSION)
+        .values_list("path", flat=True)
+    )
+
+
+# ======================================================
+# CRAWL
+# ======================================================
+
+def _crawl_batch(batch, session, concurrency, rate_limit, parser, recheck, force, today):
+    jobs = [
+        DownloadJob(
+            page.url, page.path,
+            missing_ttl=None if recheck else missing_ttl((today - page.end).days),
+        )
+        for page in batch
+    ]
+    results = download_reports(
+        jobs, concurrency=concurrency, rate_limit=rate_limit, session=session
+    )
+
+    available = []
+    for page, result in zip(batch, results):
+        page.download_status, page.http_status = result.status, result.http_status
+        if result.available:
+            available.append(page)
+            continue
+        page.outcome = FAILED if result.status == ERROR else SKIPPED
+        page.error = result.error or f"HTTP {result.http_status}"
+        if result.status == KNOWN_MISSING:
+            page.error += " (remembered, not re-requested)"
+
+    pending = {
+        state.path: state
+        for state in pending_files(
+            [page.path for page in available], PARSER_VERSION, force=force
+        )
+    }
+
+    for page in available:
+        state = pending.get(page.path)
+        if state is None:
+            page.outcome = UNCHANGED
+            continue
+
+        try:
+            report = parse_fii_report(page.path.read_bytes(), parser)
+        except NsdlFormatError as e:
+            page.outcome, page.error = FAILED, str(e)
+            continue
+
+        # the page's rows and its manifest entry (the checkpoint) commit
+        # together
+        with transaction.atomic():
+            page.counts = upsert_report(report, source=page.url)
+            record_ingested(state, PARSER_VERSION, len(report.rows))
+        page.rows = len(report.rows)
+        page.outcome = INGESTED
+
+
+def crawl(
+    ends,
+    base_url: str = BASE_URL,
+    download_dir: Path = DOWNLOAD_DIR,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate_limit: Optional[float] = DEFAULT_RATE_LIMIT,
+    batch_size: int = BATCH_SIZE,
+    parser: str = DEFAULT_PARSER,
+    recheck: bool = False,
+    force: bool = False,
+    today: Optional[date] = None,
+    progress=None,
+):
+    """
+    Download, parse and store the NSDL page of every fortnight in
+    ``ends``, in batches, on one pooled keep-alive session with a per-host
+    rate limit.
+
+    Resumable: settled pages already in the manifest are not requested
+    (``recheck`` requests them again, and ignores remembered 404s). Pages
+    on disk are re-requested conditionally, and a page whose content hash
+    is unchanged is not parsed again (``force`` re-parses it).
+    ``progress(page)`` is called for every page once its batch is done.
+
+    Returns a CrawlPage per fortnight, oldest first.
+    """
+    today = today or date.today()
+    download_dir = Path(download_dir)
+    download_dir.mkdir(parents=True, exist_ok=True)
+
+    pages = [
+        CrawlPage(end, report_url(end, base_url), download_dir / report_name(end))
+        for end in sorted(ends)
+    ]
+    if not recheck:
+        done = _checkpointed(pages, today)
+        for page in pages:
+            if str(page.path.resolve()) in done:
+                page.outcome = CHECKPOINTED
+                if progress:
+                    progress(page)
+
+    todo = [page for page in pages if not page.outcome]
+    session = build_session(concurrency)
+    session.headers.update(HEADERS)
+    try:
+        for start in range(0, len(todo), max(1, batch_size)):
+            batch = todo[start:start + max(1, batch_size)]
+            _crawl_batch(
+                batch, session, concurrency, rate_limit, parser, recheck, force, today
+            )
+            if progress:
+                for page in batch:
+                    progress(page)
+    finally:
+        session.close()
+
+    return pages
@@ -0,0 +1,437 @@
+import importlib.util
+import io
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import chain
+from html.parser import HTMLParser
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# Bump whenever parse_fii_report() changes so every page is re-parsed
+PARSER_VERSION = "1"
+
+# (group header, column header), lowercased -> FiiSectorInvestment.asset_class.
+# Columns missing here (older or newer layouts) get a code built from
+# their headers, see asset_class_code()
+ASSET_CLASSES = {
+    ("equity", "equity"): "equity",
+    ("debt", "debt general limit"): "debt_general",
+    ("debt", "debt vrr"): "debt_vrr",
+    ("debt", "debt-far"): "debt_far",
+    ("hybrid", "hybrid"): "hybrid",
+    ("mutual funds", "equity"): "mf_equity",
+    ("mutual funds", "debt general limit"): "mf_debt",
+    ("mutual funds", "hybrid"): "mf_hybrid",
+    ("mutual funds", "solution oriented"): "mf_solution_oriented",
+    ("mutual funds", "other"): "mf_other",
+    ("alternative investment funds (aifs)", "aif"): "aif",
+}
+
+# "IN INR Cr." / "IN USD Mn"
+CURRENCY_PATTERN = re.compile(r"\bin\s+(inr|usd)\b")
+
+# "AUC as on November 30, 2025"
+AUC_PATTERN = re.compile(r"auc\s+as\s+on\s+([a-z]+)\s+(\d{1,2}),?\s*(\d{4})")
+
+# "Net Investment November 16-30, 2025"
+NET_INVESTMENT_PATTERN = re.compile(
+    r"net\s+investment\s+([a-z]+)\s+(\d{1,2})\s*-\s*(\d{1,2}),?\s*(\d{4})"
+)
+
+# html.parser: stdlib, builds every table of the page as lists of text;
+# lxml: streams the page and stops once the sector table is complete
+STDLIB_PARSER = "html.parser"
+LXML_PARSER = "lxml"
+PARSERS = [STDLIB_PARSER, LXML_PARSER]
+
+SECTOR_HEADER = "sectors"
+# rows searched for the Sectors header before a table is passed over
+HEADER_SEARCH_ROWS = 10
+TOTAL_HEADER = "total"
+END_ROW = "grand total"
+
+AUC = "auc"
+NET_INVESTMENT = "net_investment"
+
+
+class NsdlFormatError(Exception):
+    pass
+
+
+@dataclass
+class FiiColumn:
+    """
+    What one value column of the report holds.
+    """
+    measure: str
+    fortnight_end: date
+    asset_class: str
+    currency: str
+
+
+@dataclass
+class FiiReport:
+    # fortnight end -> fortnight start
+    fortnights: dict = field(default_factory=dict)
+    # (fortnight end, sector, asset class, currency, auc, net investment)
+    rows: list = field(default_factory=list)
+
+
+# ======================================================
+# HTML TABLES (stdlib parser, colspan / rowspan expanded)
+# ======================================================
+
+class _TableParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tables = []
+        self._stack = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self._stack.append({"rows": [], "row": None, "cell": None, "spans": {}})
+            return
+        if not self._stack:
+            return
+
+        table = self._stack[-1]
+        if tag == "tr":
+            table["row"] = []
+        elif tag in ("td", "th") and table["row"] is not None:
+            attrs = dict(attrs)
+            table["cell"] = {
+                "text": [],
+                "colspan": _span(attrs.get("colspan")),
+                "rowspan": _span(attrs.get("rowspan")),
+            }
+        elif tag == "br" and table["cell"] is not None:
+            table["cell"]["text"].append(" ")
+
+    def handle_endtag(self, tag):
+        if not self._stack:
+            return
+
+        table = self._stack[-1]
+        if tag in ("td", "th"):
+            self._close_cell(table)
+        elif tag == "tr":
+            self._close_row(table)
+        elif tag == "table":
+            self._close_row(table)
+            self.tables.append(self._stack.pop()["rows"])
+
+    def handle_data(self, data):
+        if self._stack and self._stack[-1]["cell"] is not None:
+            self._stack[-1]["cell"]["text"].append(data)
+
+    def _close_cell(self, table):
+        cell = table["cell"]
+        if cell is None:
+            return
+        table["cell"] = None
+
+        row, spans = table["row"], table["spans"]
+        text = " ".join("".join(cell["text"]).split())
+        for _ in range(cell["colspan"]):
+            _fill_spans(row, spans)
+            if cell["rowspan"] > 1:
+                spans[len(row)] = [cell["rowspan"] - 1, text]
+            row.append(text)
+
+    def _close_row(self, table):
+        self._close_cell(table)
+        if table["row"] is None:
+            return
+        _fill_spans(table["row"], table["spans"], trailing=True)
+        table["rows"].append(table["row"])
+        table["row"] = None
+
+
+def _fill_spans(row, spans, trailing=False):
+    """
+    Append to ``row`` the cells carried down from rowspans above, which
+    take their column first; with ``trailing``, also those past the
+    row's last cell ("" fills any gap). ``spans`` is {column: [rows
+    left, text]}, shared by every row of a table.
+    """
+    while len(row) in spans or (trailing and any(c >= len(row) for c in spans)):
+        column = len(row)
+        if column not in spans:
+            row.append("")
+            continue
+        remaining, text = spans[column]
+        row.append(text)
+        if remaining == 1:
+            del spans[column]
+        else:
+            spans[column][0] -= 1
+
+
+def _span(value):
+    # most cells carry no span attribute
+    if not value:
+        return 1
+    try:
+        return max(1, int(value))
+    except ValueError:
+        return 1
+
+
+def html_tables(html: str):
+    """
+    Every <table> in ``html`` as a list of rows of cell text, with
+    colspan / rowspan cells repeated into each column / row they cover.
+    Nested tables are returned separately.
+    """
+    parser = _TableParser()
+    parser.feed(html)
+    parser.close()
+    return parser.tables
+
+
+def lxml_available():
+    return importlib.util.find_spec("lxml") is not None
+
+
+DEFAULT_PARSER = LXML_PARSER if lxml_available() else STDLIB_PARSER
+
+
+# ======================================================
+# SECTOR TABLE (lxml, streaming)
+# ======================================================
+
+def _cell_text(cell):
+    if not len(cell):
+        return " ".join((cell.text or "").split())
+    for br in cell.iter("br"):
+        br.tail = " " + (br.tail or "")
+    return " ".join("".join(cell.itertext()).split())
+
+
+def _is_header(row):
+    return any(cell.lower() == SECTOR_HEADER for cell in row)
+
+
+def _lxml_row(tr, spans):
+    row = []
+    for cell in tr:
+        if cell.tag not in ("td", "th"):
+            continue
+        text = _cell_text(cell)
+        rowspan = _span(cell.get("rowspan"))
+        for _ in range(_span(cell.get("colspan"))):
+            if spans:
+                _fill_spans(row, spans)
+            if rowspan > 1:
+                spans[len(row)] = [rowspan - 1, text]
+            row.append(text)
+    _fill_spans(row, spans, trailing=True)
+    return row
+
+
+def lxml_sector_rows(html):
+    """
+    Rows of cell text of the first table with a Sectors header row in its
+    first HEADER_SEARCH_ROWS rows, spans expanded as in html_tables().
+
+    The page is read with lxml's iterparse: each row is handled when its
+    </tr> is parsed and then dropped from the tree, other tables are
+    discarded as they end, and parsing stops at the end of the sector
+    table, so the rest of the page is never parsed.
+    """
+    from lxml import etree
+
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+
+    events = etree.iterparse(
+        io.BytesIO(html),
+        events=("end",),
+        tag=("table", "tr"),
+        html=True,
+        encoding="utf-8",
+        huge_tree=True,
+    )
+    # per open table: its first rows (None once it is known to be the
+    # sector table) and the rowspans carried down
+    tables = {}
+    for _, element in events:
+        if element.tag == "table":
+            table = tables.pop(element, None)
+            if table and table["buffer"] is None:
+                return
+            element.clear()
+            continue
+
+        owner = next(element.iterancestors("table"), None)
+        if owner is None:
+            continue
+        table = tables.setdefault(owner, {"buffer": [], "spans": {}})
+        row = _lxml_row(element, table["spans"])
+
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+        if table["buffer"] is None:
+            yield row
+        elif _is_header(row):
+            yield from table["buffer"]
+            yield row
+            table["buffer"] = None
+        elif len(table["buffer"]) < HEADER_SEARCH_ROWS:
+            table["buffer"].append(row)
+
+
+# ======================================================
+# HEADERS
+# ======================================================
+
+def fortnight_start(end: date) -> date:
+    return end.replace(day=1 if end.day <= 15 else 16)
+
+
+@lru_cache(maxsize=256)
+def _date(month: str, day: str, year: str) -> date:
+    for fmt in ("%B %d %Y", "%b %d %Y"):
+        try:
+            return datetime.strptime(f"{month} {day} {year}", fmt).date()
+        except ValueError:
+            continue
+    raise NsdlFormatError(f"unreadable date: {month} {day}, {year}")
+
+
+def asset_class_code(group: str, column: str) -> str:
+    group, column = group.lower(), column.lower()
+    if (group, column) in ASSET_CLASSES:
+        return ASSET_CLASSES[group, column]
+    label = column if group in ("", column) else f"{group} {column}"
+    return re.sub(r"[^a-z0-9]+", "_", label).strip("_")
+
+
+def _columns(header_rows, fortnights):
+    """
+    {column index: FiiColumn} from the header rows (period, currency,
+    asset group, asset class, top to bottom). Total columns are left out.
+    """
+    columns = {}
+    width = max(len(row) for row in header_rows)
+    cell = lambda row, i: row[i] if i < len(row) else ""
+
+    for i in range(width):
+        text = " ".join(cell(row, i) for row in header_rows[:-2]).lower()
+        currency = CURRENCY_PATTERN.search(text)
+        group, column = cell(header_rows[-2], i), cell(header_rows[-1], i)
+        if not currency or column.lower() in ("", TOTAL_HEADER):
+            continue
+
+        if match := NET_INVESTMENT_PATTERN.search(text):
+            month, first, last, year = match.groups()
+            measure, end = NET_INVESTMENT, _date(month, last, year)
+            fortnights[end] = _date(month, first, year)
+        elif match := AUC_PATTERN.search(text):
+            measure, end = AUC, _date(*match.groups())
+            fortnights.setdefault(end, fortnight_start(end))
+        else:
+            continue
+
+        columns[i] = FiiColumn(
+            measure, end, asset_class_code(group, column), currency.group(1).upper()
+        )
+    return columns
+
+
+# ======================================================
+# REPORT
+# ======================================================
+
+def parse_number(text: str):
+    """
+    "5,71,606" (Indian grouping), "-1,257" or "(1,257)" as a float;
+    None for blanks and dashes.
+    """
+    text = text.replace(",", "").strip()
+    negative = text.startswith("(") and text.endswith(")")
+    text = text.strip("()")
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    return -value if negative else value
+
+
+def report_rows(rows):
+    """
+    FiiReport from the rows of one report table (lists of cell text, as
+    html_tables() or lxml_sector_rows() produce them), consumed once, top
+    to bottom.
+    """
+    rows = iter(rows)
+    header_rows = []
+    for row in rows:
+        header_rows.append(row)
+        if _is_header(row):
+            break
+    else:
+        raise NsdlFormatError("no Sectors header row")
+    if len(header_rows) < 3:
+        raise NsdlFormatError("no period / currency header rows")
+
+    sector_column = [cell.lower() for cell in header_rows[-1]].index(SECTOR_HEADER)
+    report = FiiReport()
+    columns = _columns(header_rows, report.fortnights)
+    if not columns:
+        raise NsdlFormatError("no AUC / Net Investment columns")
+
+    values = {}
+    for row in rows:
+        if sector_column >= len(row):
+            continue
+        sector = row[sector_column]
+        if sector.lower() == END_ROW:
+            break
+        if not sector:
+            continue
+
+        for i, column in columns.items():
+            value = parse_number(row[i]) if i < len(row) else None
+            if value is None:
+                continue
+            key = (column.fortnight_end, sector, column.asset_class, column.currency)
+            values.setdefault(key, {})[column.measure] = value
+
+    report.rows = [
+        (*key, measures.get(AUC), measures.get(NET_INVESTMENT))
+        for key, measures in values.items()
+    ]
+    return report
+
+
+def parse_fii_report(html, parser: str = DEFAULT_PARSER) -> FiiReport:
+    """
+    Parse an NSDL "Fortnightly Sector-wise FPI Investment" page: the first
+    table with a Sectors header, one row per sector, column groups per
+    "AUC as on ..." / "Net Investment ..." period, currency (INR Cr / USD
+    Mn) and asset class. Each page covers two fortnights. ``html`` is text,
+    or bytes in UTF-8.
+
+    Raises NsdlFormatError if no such table is found.
+    """
+    if parser == LXML_PARSER:
+        rows = lxml_sector_rows(html)
+        first = next(rows, None)
+        if first is None:
+            raise NsdlFormatError("no sector table in the page")
+        return report_rows(chain([first], rows))
+
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+    for table in html_tables(html):
+        if any(_is_header(row) for row in table[:HEADER_SEARCH_ROWS]):
+            return report_rows(table)
+    raise NsdlFormatError("no sector table in the page")
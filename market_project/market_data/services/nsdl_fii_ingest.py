@@ -0,0 +1,109 @@
+from django.db import transaction
+
+from market_data.models import FiiFortnight, FiiSector, FiiSectorInvestment
+from market_data.services.amfi_ingest import BULK_BATCH_SIZE, empty_counts
+from market_data.services.nsdl_fii_extract import FiiReport
+
+
+def _sector_ids(names):
+    """
+    {name: FiiSector id}, creating the sectors not seen before (two
+    queries, three when some are new).
+    """
+    ids = dict(FiiSector.objects.filter(name__in=names).values_list("name", "id"))
+    missing = [name for name in names if name not in ids]
+    if missing:
+        FiiSector.objects.bulk_create(
+            [FiiSector(name=name) for name in missing], ignore_conflicts=True
+        )
+        ids.update(
+            FiiSector.objects.filter(name__in=missing).values_list("name", "id")
+        )
+    return ids
+
+
+def _fortnight_ids(fortnights, source):
+    FiiFortnight.objects.bulk_create(
+        [
+            FiiFortnight(start=start, end=end, period=end.replace(day=1), source=source)
+            for end, start in fortnights.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["end"],
+        update_fields=["start", "period", "source"],
+    )
+    return dict(
+        FiiFortnight.objects
+        .filter(end__in=list(fortnights))
+        .values_list("end", "id")
+    )
+
+
+# ======================================================
+# BULK UPSERT (one report per transaction)
+# ======================================================
+
+def upsert_report(report: FiiReport, source: str = ""):
+    """
+    Write a parsed NSDL report with one bulk INSERT ... ON CONFLICT DO
+    UPDATE on (fortnight, sector, asset class, currency), inside one
+    transaction.
+
+    Reports overlap (each page repeats the previous fortnight), so
+    existing rows are read up front: unchanged rows are not rewritten, and
+    a measure the report does not carry keeps its stored value. Returns
+    inserted / updated / unchanged counts.
+    """
+    counts = empty_counts()
+    if not report.rows:
+        return counts
+
+    with transaction.atomic():
+        sector_ids = _sector_ids(sorted({row[1] for row in report.rows}))
+        fortnight_ids = _fortnight_ids(report.fortnights, source)
+
+        existing = {
+            (fortnight_id, sector_id, asset_class, currency): (auc, net_investment)
+            for fortnight_id, sector_id, asset_class, currency, auc, net_investment in (
+                FiiSectorInvestment.objects
+                .filter(fortnight_id__in=list(fortnight_ids.values()))
+                .values_list(
+                    "fortnight_id", "sector_id", "asset_class", "currency",
+                    "auc", "net_investment",
+                )
+            )
+        }
+
+        to_write = []
+        for end, sector, asset_class, currency, auc, net_investment in report.rows:
+            key = (fortnight_ids[end], sector_ids[sector], asset_class, currency)
+            stored = existing.get(key)
+            if stored is None:
+                counts["inserted"] += 1
+            else:
+                auc = stored[0] if auc is None else auc
+                net_investment = stored[1] if net_investment is None else net_investment
+                if (auc, net_investment) == stored:
+                    counts["unchanged"] += 1
+                    continue
+                counts["updated"] += 1
+
+            to_write.append(FiiSectorInvestment(
+                fortnight_id=key[0],
+                sector_id=key[1],
+                asset_class=asset_class,
+                currency=currency,
+                auc=auc,
+                net_investment=net_investment,
+            ))
+
+        if to_write:
+            FiiSectorInvestment.objects.bulk_create(
+                to_write,
+                batch_size=BULK_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=["fortnight", "sector", "asset_class", "currency"],
+                update_fields=["auc", "net_investment"],
+            )
+
+    return counts
@@ -0,0 +1,360 @@
+import importlib.util
+import pickle
+import tempfile
+from copy import copy
+from dataclasses import dataclass, field
+from itertools import chain, islice
+from typing import Optional
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+from market_data.services.nsdl_fii_extract import parse_number
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+USD_MARKER = "USD"
+SECTOR_MARKER = "Sector"
+
+# rows searched for the USD header, and the leading columns searched for
+# the Sectors header
+HEADER_SEARCH_ROWS = 10
+SECTOR_SEARCH_COLUMNS = 4
+# where the Sectors header is looked for when no USD header is found
+DEFAULT_HEADER_ROW = 4
+DEFAULT_SECTOR_COLUMN = 2
+
+# leading rows styled (and, in data mode, named) as headers
+HEADER_ROWS = 4
+
+SHEET_TITLE = "USD Data Only"
+
+HEADER_FONT = Font(bold=True, size=10)
+HEADER_FILL = PatternFill(start_color="B8CCE4", end_color="B8CCE4", fill_type="solid")
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center", wrap_text=True)
+
+MIN_WIDTH = 12
+MAX_WIDTH = 50
+WIDTH_PADDING = 2
+
+# rows per Parquet row group
+CHUNK_SIZE = 2000
+
+# rows kept for printing a preview
+PREVIEW_ROWS = 14
+
+# style key of the header rows (source style keys are tuples)
+HEADER_STYLE = "header"
+
+
+def parquet_available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+@dataclass
+class UsdLayout:
+    """
+    Where the USD block sits in the source sheet (1-based, as in Excel).
+    """
+    usd_col: int
+    sector_col: int
+    # row of the USD header, None when the USD block had to be assumed
+    header_row: Optional[int]
+    width: int
+
+    @property
+    def id_columns(self):
+        """
+        0-based source columns of Sr. No. and Sectors.
+        """
+        return [i for i in (self.sector_col - 2, self.sector_col - 1) if i >= 0]
+
+    @property
+    def columns(self):
+        """
+        0-based source columns copied, in output order.
+        """
+        return self.id_columns + list(range(self.usd_col - 1, self.width))
+
+
+@dataclass
+class UsdExtract:
+    layout: UsdLayout
+    rows: int = 0
+    widths: list = field(default_factory=list)
+    # first rows of the output, as values
+    preview: list = field(default_factory=list)
+
+
+# ======================================================
+# LAYOUT
+# ======================================================
+
+def find_layout(head) -> UsdLayout:
+    """
+    UsdLayout from the first rows of the sheet (lists of values): the
+    first cell mentioning USD starts the USD block (the middle of the
+    sheet if none does), and a Sectors header in the first few columns
+    of that row marks the sector column.
+    """
+    width = max((len(row) for row in head), default=0)
+
+    usd_col = header_row = None
+    for row_idx, row in enumerate(head[:HEADER_SEARCH_ROWS], 1):
+        for col_idx, value in enumerate(row, 1):
+            if value and USD_MARKER in str(value).upper():
+                usd_col, header_row = col_idx, row_idx
+                break
+        if usd_col:
+            break
+    if not usd_col:
+        usd_col = width // 2 + 1
+
+    sector_col = DEFAULT_SECTOR_COLUMN
+    search_row = header_row or DEFAULT_HEADER_ROW
+    row = head[search_row - 1] if search_row <= len(head) else []
+    for col_idx, value in enumerate(row[:SECTOR_SEARCH_COLUMNS], 1):
+        if value and SECTOR_MARKER in str(value):
+            sector_col = col_idx
+            break
+
+    return UsdLayout(usd_col, sector_col, header_row, width)
+
+
+def _source_rows(path):
+    """
+    Cell rows of the active sheet, streamed from a read-only workbook.
+    """
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        yield from wb.active.iter_rows()
+    finally:
+        wb.close()
+
+
+def _open(path):
+    """
+    (layout, head, rows): the layout found in the sheet's first rows, those
+    rows as cells, and the iterator over the rest.
+    """
+    rows = _source_rows(path)
+    head = list(islice(rows, HEADER_SEARCH_ROWS))
+    return find_layout([[cell.value for cell in row] for row in head]), head, rows
+
+
+def _usd_slice(rows, columns):
+    for row in rows:
+        yield [row[i] if i < len(row) else None for i in columns]
+
+
+def read_usd_cells(path):
+    """
+    (layout, rows): the sheet's layout, and an iterator over the USD slice
+    of every row as source cells (None past the end of a short row), read
+    once in read-only mode.
+    """
+    layout, head, rows = _open(path)
+    return layout, _usd_slice(chain(head, rows), layout.columns)
+
+
+# ======================================================
+# STYLED WORKBOOK (write-only)
+# ======================================================
+
+def _source_style(cell):
+    """
+    The formatting copied from a source cell: bold and size of its font,
+    its fill and alignment.
+    """
+    font = cell.font
+    return Font(bold=font.bold, size=font.size), copy(cell.fill), copy(cell.alignment)
+
+
+def _width(widest):
+    return max(min(widest + WIDTH_PADDING, MAX_WIDTH), MIN_WIDTH)
+
+
+def write_usd_workbook(source, output) -> UsdExtract:
+    """
+    Copy Sr. No., Sectors and the USD columns of ``source`` into a new
+    workbook at ``output``, with the header rows restyled.
+
+    The source is read once in read-only mode. Values go to a temporary
+    spool while the column widths are measured, because a write-only
+    sheet needs its widths before its first row; they are then streamed
+    into a write-only workbook. Each distinct source style is built once
+    and shared by every cell that uses it.
+    """
+    layout, rows = read_usd_cells(source)
+    result = UsdExtract(layout, widths=[0] * len(layout.columns))
+    widths = result.widths
+    # source style key -> (font, fill, alignment)
+    styles = {HEADER_STYLE: (HEADER_FONT, HEADER_FILL, HEADER_ALIGNMENT)}
+
+    with tempfile.TemporaryFile() as spool:
+        for row_number, cells in enumerate(rows, 1):
+            values, keys = [], []
+            for i, cell in enumerate(cells):
+                value = None if cell is None else cell.value
+                if value:
+                    widths[i] = max(widths[i], len(str(value)))
+
+                key = None
+                if row_number <= HEADER_ROWS:
+                    key = HEADER_STYLE
+                elif getattr(cell, "font", None) is not None:
+                    key = tuple(cell.style_array)
+                    if key not in styles:
+                        styles[key] = _source_style(cell)
+                values.append(value)
+                keys.append(key)
+
+            pickle.dump((values, keys), spool, pickle.HIGHEST_PROTOCOL)
+            if row_number <= PREVIEW_ROWS:
+                result.preview.append(values)
+            result.rows = row_number
+
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet(SHEET_TITLE)
+        for col_idx, widest in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = _width(widest)
+
+        # style key -> style array registered in the new workbook
+        registered = {}
+        spool.seek(0)
+        for _ in range(result.rows):
+            values, keys = pickle.load(spool)
+            out = []
+            for value, key in zip(values, keys):
+                cell = WriteOnlyCell(ws, value)
+                if key is not None:
+                    if key in registered:
+                        cell._style = copy(registered[key])
+                    else:
+                        cell.font, cell.fill, cell.alignment = styles[key]
+                        registered[key] = copy(cell._style)
+                out.append(cell)
+            ws.append(out)
+
+        wb.save(output)
+
+    return result
+
+
+# ======================================================
+# DATA MODE (DataFrame / Parquet, no styling)
+# ======================================================
+
+def _number(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        return parse_number(value)
+    return None
+
+
+def _text(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip() or None
+
+
+def column_names(header_rows, layout: UsdLayout):
+    """
+    One unique name per output column: its header texts top to bottom,
+    joined with " | ". Labels of merged cells (None to their right in
+    the source) are carried across the value columns first, so a period
+    label spanning the INR and USD blocks reaches the USD columns.
+    """
+    id_columns = set(layout.id_columns)
+    labels = {i: [] for i in layout.columns}
+    for row in header_rows:
+        carried = None
+        for i in range(layout.width):
+            text = _text(row[i]) if i < len(row) else None
+            if i not in id_columns:
+                text = carried = text or carried
+            if text and i in labels and text not in labels[i]:
+                labels[i].append(text)
+
+    names = []
+    for n, i in enumerate(layout.columns, 1):
+        name = " | ".join(labels[i]) or f"column_{n}"
+        base, suffix = name, 2
+        while name in names:
+            name, suffix = f"{base} ({suffix})", suffix + 1
+        names.append(name)
+    return names
+
+
+def read_usd_records(path):
+    """
+    (layout, names, records): column names from the header rows, and an
+    iterator over the data rows as typed tuples (Sr. No. and Sectors as
+    text, USD values as floats). Blank rows are left out.
+    """
+    layout, head, rows = _open(path)
+    id_count = len(layout.id_columns)
+
+    header_rows = [[cell.value for cell in row] for row in head[:HEADER_ROWS]]
+    names = column_names(header_rows, layout)
+
+    def records():
+        for cells in _usd_slice(chain(head[HEADER_ROWS:], rows), layout.columns):
+            values = [None if cell is None else cell.value for cell in cells]
+            record = tuple(
+                [_text(value) for value in values[:id_count]]
+                + [_number(value) for value in values[id_count:]]
+            )
+            if any(value is not None for value in record):
+                yield record
+
+    return layout, names, records()
+
+
+def usd_dataframe(path):
+    """
+    The USD slice of ``path`` as a DataFrame, one row per data row.
+    """
+    import pandas as pd
+
+    layout, names, records = read_usd_records(path)
+    df = pd.DataFrame.from_records(records, columns=names)
+    value_columns = names[len(layout.id_columns):]
+    df[value_columns] = df[value_columns].astype("float64")
+    return df
+
+
+def write_usd_parquet(path, output, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Write the USD slice of ``path`` to a Parquet file, one row group per
+    ``chunk_size`` rows, so memory stays flat however long the sheet is.
+    Returns the number of rows written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    layout, names, records = read_usd_records(path)
+    id_count = len(layout.id_columns)
+    schema = pa.schema(
+        [(name, pa.string()) for name in names[:id_count]]
+        + [(name, pa.float64()) for name in names[id_count:]]
+    )
+
+    written = 0
+    with pq.ParquetWriter(output, schema) as writer:
+        while batch := list(islice(records, chunk_size)):
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=f.type) for values, f in zip(columns, schema)],
+                schema=schema,
+            ))
+            written += len(batch)
+    return written
@@ -0,0 +1,88 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from market_data.models import AmfiMonthlyData
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    connection_created receiver: run settings.AMFI_SQLITE_PRAGMAS on every
+    new SQLite connection. journal_mode=WAL is stored in the database
+    file; the other pragmas only last as long as the connection.
+    """
+    if connection.vendor != "sqlite":
+        return
+
+    pragmas = getattr(settings, "AMFI_SQLITE_PRAGMAS", {})
+    for name, value in pragmas.items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
+
+
+# ======================================================
+# MATERIALIZED SUMMARIES
+# ======================================================
+
+def remember_month(sender, instance, raw=False, **kwargs):
+    """
+    pre_save receiver: note the stored month of an existing row, so a
+    row moved to another month refreshes both.
+    """
+    if raw or instance.pk is None:
+        instance._previous_month = None
+        return
+    instance._previous_month = (
+        AmfiMonthlyData.objects
+        .filter(pk=instance.pk)
+        .values_list("month", flat=True)
+        .first()
+    )
+
+
+def refresh_saved_month(sender, instance, raw=False, **kwargs):
+    """
+    post_save receiver: keep MonthlyBucketSummary (and, through the
+    dataset version, the cached API responses) in step with single-row
+    writes from any caller.
+    """
+    if raw:
+        return
+    from market_data.services.amfi_analytics import refresh_bucket_summaries
+
+    previous = getattr(instance, "_previous_month", None)
+    refresh_bucket_summaries([m for m in (previous, instance.month) if m])
+
+
+def _deleted_months(using):
+    # kept on the connection, so per thread like the transaction itself
+    connection = transaction.get_connection(using)
+    if not hasattr(connection, "amfi_deleted_months"):
+        connection.amfi_deleted_months = set()
+    return connection.amfi_deleted_months
+
+
+def remember_deleted_month(sender, instance, using, **kwargs):
+    """
+    pre_delete receiver: collect the month of every deleted row and
+    refresh them together when the deleting transaction commits, so a
+    queryset delete costs one refresh and one version bump, not one per
+    row.
+    """
+    _deleted_months(using).add(instance.month)
+    # every row registers a callback, so a rolled back delete cannot leave
+    # the next one without one; the first to run refreshes them all
+    transaction.on_commit(partial(refresh_deleted_months, using), using=using)
+
+
+def refresh_deleted_months(using=DEFAULT_DB_ALIAS):
+    """
+    Refresh the months collected by remember_deleted_month, if any, in
+    one call.
+    """
+    from market_data.services.amfi_analytics import refresh_bucket_summaries
+
+    pending = _deleted_months(using)
+    months = sorted(pending)
+    pending.clear()
+    refresh_bucket_summaries(months)
@@ -1,3 +1,1580 @@
-from django.test import TestCase
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import date
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import openpyxl
+import pandas as pd
+from openpyxl.styles import Font, PatternFill
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.http import QueryDict
+from django.test import (
+    AsyncRequestFactory,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+
+from market_data import views
+from market_data.models import (
+    FiiFortnight,
+    FiiSectorInvestment,
+    AmfiMonthlyData,
+    IngestedFile,
+    MonthlyBucketSummary,
+    SchemeCategory,
+    SchemeCategoryAlias,
+)
+from market_data.services import amfi_export, amfi_frame_cache, nsdl_usd_extract
+from market_data.signals import apply_sqlite_pragmas
+from market_data.services.amfi_downloader import (
+    DOWNLOADED,
+    KNOWN_MISSING,
+    META_FILENAME,
+    MISSING,
+    NOT_MODIFIED,
+    DownloadJob,
+    HostRateLimiter,
+    download_reports,
+)
+from market_data.management.commands.fetch_amfi_files import missing_ttl
+from market_data.services.amfi_admin_cache import period_index
+from market_data.services.amfi_api_cache import cache_key, current_version
+from market_data.services.amfi_categories import CategoryMap, default_bucket, normalize_name
+from market_data.services.amfi_analytics import (
+    amfi_pivot_columnar,
+    amfi_year_pivot,
+    compare_two_months,
+    monthly_amfi_summary,
+    monthly_summaries,
+    rebuild_bucket_summaries,
+)
+from market_data.services.amfi_extract import extract_reports
+from market_data.services.amfi_ingest import upsert_month
+from market_data.services.amfi_reader import stream_section_rows
+from market_data.services.amfi_sections import (
+    SectionNotFound,
+    extract_section,
+    locate_section,
+    section_rows,
+)
+from market_data.services.amfi_manifest import pending_files, record_ingested
+from market_data.services.amfi_periods import parse_month_label
+from market_data.services.amfi_metrics import RunMetrics, percentile
+from market_data.services.amfi_timeseries import amfi_timeseries
+from market_data.services.nsdl_fii_analytics import amfi_vs_fii
+from market_data.services.nsdl_fii_crawler import (
+    crawl,
+    fortnight_ends,
+    latest_fortnight_end,
+    report_name,
+    report_url,
+)
+from market_data.services.nsdl_fii_extract import (
+    LXML_PARSER,
+    STDLIB_PARSER,
+    fortnight_start,
+    html_tables,
+    lxml_available,
+    lxml_sector_rows,
+    parse_fii_report,
+)
+
+
+# checked-in sample reports (repository root)
+SAMPLE_REPORTS_DIR = Path(__file__).resolve().parents[2] / "amfi_downloads"
+SAMPLE_NSDL_PAGE = Path(__file__).resolve().parents[2] / "nsdl_page.html"
+
+
+def scheme_category(name):
+    return SchemeCategory.objects.get_or_create(
+        name=name, defaults={"bucket": default_bucket(name)}
+    )[0]
+
+
+# ======================================================
+# LOCAL HTTP STAND-IN
+# ======================================================
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Serves ``server.files`` (path -> bytes) with ETag support and
+    records every request it sees.
+    """
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        body = self.server.files.get(self.path)
+
+        if self.server.status_override:
+            self.send_response(self.server.status_override)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServerMixin:
+    def setUp(self):
+        super().setUp()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        self.server.files = {}
+        self.server.requests = []
+        self.server.status_override = None
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.tmp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        super().tearDown()
+
+
+# ======================================================
+# DOWNLOADER
+# ======================================================
+
+class DownloadReportsTests(StandInServerMixin, SimpleTestCase):
+    def jobs(self, *names):
+        return [
+            DownloadJob(f"{self.base_url}/{name}", self.tmp_dir / name)
+            for name in names
+        ]
+
+    def test_downloads_and_reports_missing(self):
+        self.server.files["/amjan2025repo.xls"] = b"january"
+
+        results = download_reports(
+            self.jobs("amjan2025repo.xls", "amfeb2025repo.xls"), rate_limit=0
+        )
+
+        self.assertEqual([r.status for r in results], [DOWNLOADED, MISSING])
+        self.assertEqual(results[0].bytes, 7)
+        self.assertEqual(results[1].http_status, 404)
+        self.assertEqual((self.tmp_dir / "amjan2025repo.xls").read_bytes(), b"january")
+        self.assertFalse(results[1].available)
+
+    def test_second_run_is_conditional(self):
+        self.server.files["/amjan2025repo.xls"] = b"january"
+        download_reports(self.jobs("amjan2025repo.xls"), rate_limit=0)
+
+        results = download_reports(self.jobs("amjan2025repo.xls"), rate_limit=0)
+
+        self.assertEqual(results[0].status, NOT_MODIFIED)
+        headers = self.server.requests[-1][1]
+        self.assertIn("If-None-Match", headers)
+        self.assertIn("If-Modified-Since", headers)
+
+    def test_changed_file_is_replaced(self):
+        self.server.files["/amjan2025repo.xls"] = b"january"
+        download_reports(self.jobs("amjan2025repo.xls"), rate_limit=0)
+        self.server.files["/amjan2025repo.xls"] = b"january (revised)"
+
+        results = download_reports(self.jobs("amjan2025repo.xls"), rate_limit=0)
+
+        self.assertEqual(results[0].status, DOWNLOADED)
+        self.assertEqual(
+            (self.tmp_dir / "amjan2025repo.xls").read_bytes(), b"january (revised)"
+        )
+
+    def test_results_keep_job_order(self):
+        names = [f"file{i}.xls" for i in range(12)]
+        for name in names[::2]:
+            self.server.files[f"/{name}"] = name.encode()
+
+        results = download_reports(self.jobs(*names), concurrency=4, rate_limit=0)
+
+        self.assertEqual([r.path.name for r in results], names)
+        self.assertEqual(
+            [r.status for r in results], [DOWNLOADED, MISSING] * 6
+        )
+
+    def test_missing_is_remembered_for_ttl(self):
+        job = DownloadJob(
+            f"{self.base_url}/amfeb2025repo.xls",
+            self.tmp_dir / "amfeb2025repo.xls",
+            missing_ttl=3600,
+        )
+        download_reports([job], rate_limit=0)
+
+        results = download_reports([job], rate_limit=0)
+
+        self.assertEqual(results[0].status, KNOWN_MISSING)
+        self.assertEqual(results[0].http_status, 404)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_expired_negative_cache_requests_again(self):
+        self.server.files["/amfeb2025repo.xls"] = b"february"
+        path = self.tmp_dir / "amfeb2025repo.xls"
+        (self.tmp_dir / META_FILENAME).write_text(json.dumps({
+            path.name: {"missing_checked": time.time() - 7200, "http_status": 404}
+        }))
+
+        expired = download_reports(
+            [DownloadJob(f"{self.base_url}/{path.name}", path, missing_ttl=3600)],
+            rate_limit=0,
+        )
+
+        self.assertEqual(expired[0].status, DOWNLOADED)
+        meta = json.loads((self.tmp_dir / META_FILENAME).read_text())
+        self.assertNotIn("missing_checked", meta[path.name])
+
+    def test_server_errors_are_not_remembered(self):
+        job = DownloadJob(
+            f"{self.base_url}/amfeb2025repo.xls",
+            self.tmp_dir / "amfeb2025repo.xls",
+            missing_ttl=3600,
+        )
+        self.server.status_override = 503
+        download_reports([job], rate_limit=0)
+        self.server.status_override = None
+
+        download_reports([job], rate_limit=0)
+
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_missing_ttl_grows_with_report_age(self):
+        ttls = [missing_ttl(age) for age in (0, 1, 2, 6, 24)]
+
+        self.assertEqual(ttls, sorted(ttls))
+        self.assertLess(missing_ttl(1), missing_ttl(2))
+        self.assertGreaterEqual(missing_ttl(24), 14 * 24 * 3600)
+
+
+class HostRateLimiterTests(SimpleTestCase):
+    def test_spaces_requests_to_same_host(self):
+        limiter = HostRateLimiter(20)
+        started = time.monotonic()
+        for _ in range(5):
+            limiter.wait("http://example.test/a")
+        self.assertGreaterEqual(time.monotonic() - started, 0.19)
+
+    def test_hosts_are_independent(self):
+        limiter = HostRateLimiter(1)
+        started = time.monotonic()
+        limiter.wait("http://a.test/x")
+        limiter.wait("http://b.test/x")
+        self.assertLess(time.monotonic() - started, 0.5)
+
+
+# ======================================================
+# BULK UPSERT
+# ======================================================
+
+class UpsertMonthTests(TestCase):
+    def test_counts_inserted_updated_unchanged(self):
+        first = upsert_month(
+            "January 2025",
+            [("Large Cap Fund", 10.0), ("Mid Cap Fund", 20.0)],
+        )
+        self.assertEqual(first, {"inserted": 2, "updated": 0, "unchanged": 0})
+
+        second = upsert_month(
+            "January 2025",
+            [("Large Cap Fund", 10.0), ("Mid Cap Fund", 25.0), ("ELSS", 5.0)],
+        )
+        self.assertEqual(second, {"inserted": 1, "updated": 1, "unchanged": 1})
+
+        values = dict(
+            AmfiMonthlyData.objects
+            .filter(month="January 2025")
+            .values_list("category__name", "net_inflow")
+        )
+        self.assertEqual(
+            values, {"Large Cap Fund": 10.0, "Mid Cap Fund": 25.0, "ELSS": 5.0}
+        )
+
+    def test_single_write_per_month(self):
+        rows = [(f"Category {i}", float(i)) for i in range(40)]
+        category_map = CategoryMap.load()
+        category_map.resolve_all([name for name, _ in rows])
+        # one SELECT for existing rows + one bulk INSERT (plus savepoint),
+        # then aggregate + DELETE + INSERT for the month's bucket summaries
+        # and the dataset version bump; names resolve in memory
+        with self.assertNumQueries(8):
+            upsert_month("February 2025", rows, category_map)
+
+    def test_months_are_independent(self):
+        upsert_month("January 2025", [("ELSS", 1.0)])
+        counts = upsert_month("February 2025", [("ELSS", 1.0)])
+        self.assertEqual(counts["inserted"], 1)
+
+    def test_sets_period(self):
+        upsert_month("November 2025", [("ELSS", 1.0)])
+
+        row = AmfiMonthlyData.objects.get(month="November 2025")
+        self.assertEqual(row.period, date(2025, 11, 1))
+
+
+class SchemeCategoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_name_variants_share_a_key(self):
+        self.assertEqual(
+            normalize_name("Sectoral / Thematic  Fund"),
+            normalize_name("Sectoral/Thematic Funds"),
+        )
+        self.assertNotEqual(normalize_name("Mid Cap Fund"), normalize_name("Small Cap Fund"))
+
+    def test_renamed_category_stays_in_its_bucket(self):
+        upsert_month("March 2025", [
+            ("Sectoral / Thematic Fund", 4.0),
+            ("Equity Linked Savings Scheme", 1.0),
+        ])
+
+        names = set(
+            AmfiMonthlyData.objects.values_list("category__name", flat=True)
+        )
+        self.assertEqual(names, {"Sectoral/Thematic Funds", "ELSS"})
+        self.assertEqual(monthly_amfi_summary("March 2025")["large_midcap"], 5.0)
+
+    def test_alias_rows_update_the_canonical_row(self):
+        upsert_month("March 2025", [("Sectoral/Thematic Funds", 4.0)])
+        counts = upsert_month("March 2025", [("Sectoral Funds", 6.0)])
+
+        self.assertEqual(counts, {"inserted": 0, "updated": 1, "unchanged": 0})
+        self.assertEqual(AmfiMonthlyData.objects.get().net_inflow, 6.0)
+
+    def test_unknown_names_create_categories_once(self):
+        category_map = CategoryMap.load()
+        upsert_month("March 2025", [("Gilt Fund", 1.0)], category_map)
+        with self.assertNumQueries(0):
+            category_map.resolve_all(["Gilt  Fund", "gilt funds"])
+
+        self.assertEqual(category_map.created, ["Gilt Fund"])
+        self.assertEqual(SchemeCategory.objects.get(name="Gilt Fund").bucket, "")
+
+    def test_bucket_column_decides_membership(self):
+        upsert_month("March 2025", [("Small Cap Fund", 2.0), ("Gilt Fund", 3.0)])
+        SchemeCategory.objects.filter(name="Gilt Fund").update(bucket="small_cap")
+        SchemeCategoryAlias.objects.create(
+            alias="Gilts", category=SchemeCategory.objects.get(name="Gilt Fund")
+        )
+        rebuild_bucket_summaries()
+
+        self.assertEqual(monthly_amfi_summary("March 2025")["small_cap"], 5.0)
+        self.assertEqual(
+            CategoryMap.load().resolve_all(["Gilts"]),
+            {"Gilts": SchemeCategory.objects.get(name="Gilt Fund").id},
+        )
+
+
+# ======================================================
+# INGESTION MANIFEST
+# ======================================================
+
+class IngestionManifestTests(TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.report = self.tmp_dir / "amjan2025repo.xls"
+        self.report.write_bytes(b"january")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def ingest(self, parser_version="1"):
+        pending = pending_files([self.report], parser_version)
+        for state in pending:
+            record_ingested(state, parser_version, row_count=3)
+        return pending
+
+    def test_new_file_is_pending_and_recorded(self):
+        pending = self.ingest()
+
+        self.assertEqual(len(pending), 1)
+        entry = IngestedFile.objects.get()
+        self.assertEqual(entry.sha256, hashlib.sha256(b"january").hexdigest())
+        self.assertEqual(entry.row_count, 3)
+
+    def test_unchanged_file_is_skipped_with_one_query(self):
+        self.ingest()
+        with self.assertNumQueries(1):
+            self.assertEqual(pending_files([self.report], "1"), [])
+
+    def test_touched_but_identical_file_is_skipped(self):
+        self.ingest()
+        stat = self.report.stat()
+        os.utime(self.report, (stat.st_atime, stat.st_mtime + 60))
+
+        self.assertEqual(pending_files([self.report], "1"), [])
+        self.assertEqual(
+            IngestedFile.objects.get().mtime, self.report.stat().st_mtime
+        )
+
+    def test_changed_content_or_parser_version_is_pending(self):
+        self.ingest()
+        self.assertEqual(len(pending_files([self.report], "2")), 1)
+
+        self.report.write_bytes(b"january (revised)")
+        self.assertEqual(len(pending_files([self.report], "1")), 1)
+
+    def test_force_returns_everything(self):
+        self.ingest()
+        self.assertEqual(len(pending_files([self.report], "1", force=True)), 1)
+
+
+# ======================================================
+# PARALLEL EXTRACTION
+# ======================================================
+
+class ExtractReportsTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.reports = sorted(SAMPLE_REPORTS_DIR.glob("*.xls"))[:3]
+        if not self.reports:
+            self.skipTest("sample AMFI reports not available")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_pool_matches_serial_and_reports_errors_per_file(self):
+        broken = self.tmp_dir / "broken.xls"
+        broken.write_bytes(b"not a workbook")
+        paths = [self.reports[0], broken] + self.reports[1:]
+
+        serial = extract_reports(paths, workers=1)
+        parallel = extract_reports(paths, workers=2)
+
+        self.assertEqual([r.path for r in parallel], paths)
+        self.assertEqual([r.rows for r in parallel], [r.rows for r in serial])
+        self.assertFalse(parallel[1].ok)
+        self.assertIn("unreadable", parallel[1].error)
+
+        for result in parallel[:1] + parallel[2:]:
+            self.assertTrue(result.ok)
+            self.assertTrue(result.rows)
+            scheme, net_inflow = result.rows[0]
+            self.assertIsInstance(scheme, str)
+            self.assertIsInstance(net_inflow, float)
+
+    def test_stream_reader_matches_pandas(self):
+        streamed = extract_reports(self.reports, reader="stream")
+        loaded = extract_reports(self.reports, reader="pandas")
+        self.assertEqual([r.rows for r in streamed], [r.rows for r in loaded])
+
+    def test_stream_reader_handles_xlsx(self):
+        path = self.tmp_dir / "amjan2025repo.xlsx"
+        sample_sheet().to_excel(path, header=False, index=False)
+
+        self.assertEqual(
+            stream_section_rows(path),
+            (("Large Cap Fund", 1500.25), ("Small Cap Fund", -42.0)),
+        )
+
+
+# ======================================================
+# SECTION ENGINE
+# ======================================================
+
+def sample_sheet():
+    nan = float("nan")
+    return pd.DataFrame([
+        [nan, "Monthly Report for the month of January 2025", nan, nan],
+        ["Sr ", "Net Inflow (+ve)/Outflow (-ve)", "Scheme Name ", "No. of Folios"],
+        ["I", nan, "Income/Debt Oriented Schemes", nan],
+        ["i", -10.5, "Liquid Fund", 100],
+        [nan, -10.5, "Sub Total - I", 100],
+        ["II", nan, "Growth/Equity Oriented Schemes", nan],
+        ["i", 1500.25, "Large Cap Fund", 200],
+        ["ii", "-", "Mid Cap Fund", 300],
+        ["iii", "-42", "Small Cap Fund", 400],
+        [nan, 1458.25, "Sub Total - II (i+ii+iii)", 900],
+        ["III", nan, "Hybrid Schemes", nan],
+    ])
+
+
+class SectionEngineTests(SimpleTestCase):
+    def test_locates_header_start_and_end(self):
+        bounds = locate_section(sample_sheet())
+        self.assertEqual((bounds.header_row, bounds.start, bounds.end), (1, 5, 9))
+
+    def test_rows_are_mapped_by_header_name(self):
+        self.assertEqual(
+            section_rows(sample_sheet()),
+            (("Large Cap Fund", 1500.25), ("Small Cap Fund", -42.0)),
+        )
+
+    def test_extract_section_names_columns(self):
+        section = extract_section(sample_sheet(), include_end=True)
+        self.assertEqual(
+            list(section.columns),
+            ["Sr", "Net Inflow (+ve)/Outflow (-ve)", "Scheme Name", "No. of Folios"],
+        )
+        self.assertEqual(len(section), 5)
+
+    def test_missing_section_raises(self):
+        sheet = sample_sheet().iloc[:5]
+        with self.assertRaises(SectionNotFound):
+            section_rows(sheet)
+
+
+# ======================================================
+# PARSED-FRAME CACHE
+# ======================================================
+
+class ParsedFrameCacheTests(SimpleTestCase):
+    def setUp(self):
+        if not amfi_frame_cache.cache_available():
+            self.skipTest("pyarrow not installed")
+        self.cache_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_round_trip_keeps_numbers_text_and_blanks(self):
+        sheet = sample_sheet()
+        amfi_frame_cache.put("abc", sheet, self.cache_dir)
+
+        cached = amfi_frame_cache.get("abc", self.cache_dir)
+
+        self.assertEqual(cached.shape, sheet.shape)
+        self.assertEqual(cached.iloc[6, 1], 1500.25)
+        self.assertEqual(cached.iloc[7, 1], "-")
+        self.assertEqual(cached.iloc[6, 2], "Large Cap Fund")
+        self.assertTrue(pd.isna(cached.iloc[0, 0]))
+        self.assertEqual(section_rows(cached), section_rows(sheet))
+
+    def test_miss_returns_none(self):
+        self.assertIsNone(amfi_frame_cache.get("missing", self.cache_dir))
+
+    def test_evicts_least_recently_used(self):
+        for i, key in enumerate(["old", "used", "new"]):
+            amfi_frame_cache.put(key, sample_sheet(), self.cache_dir)
+            path = amfi_frame_cache.cache_path(key, self.cache_dir)
+            os.utime(path, (1000 + i, 1000 + i))
+
+        # reading "used" makes it the most recent entry
+        amfi_frame_cache.get("used", self.cache_dir)
+        entry_size = amfi_frame_cache.cache_path("new", self.cache_dir).stat().st_size
+
+        removed = amfi_frame_cache.evict(self.cache_dir, max_bytes=entry_size * 2)
+
+        self.assertEqual(removed, 1)
+        self.assertIsNone(amfi_frame_cache.get("old", self.cache_dir))
+        self.assertIsNotNone(amfi_frame_cache.get("used", self.cache_dir))
+
+    def test_management_command_purges(self):
+        amfi_frame_cache.put("abc", sample_sheet(), self.cache_dir)
+        out = io.StringIO()
+
+        call_command("amfi_parsed_cache", dir=str(self.cache_dir), purge=True, stdout=out)
+
+        self.assertIn("Removed 1", out.getvalue())
+        self.assertEqual(amfi_frame_cache.stats(self.cache_dir).entries, 0)
+
+
+class RunMetricsTests(SimpleTestCase):
+    def test_percentile_interpolates(self):
+        values = [4, 1, 3, 2]
+
+        self.assertEqual(percentile(values, 50), 2.5)
+        self.assertEqual(percentile(values, 100), 4)
+        self.assertIsNone(percentile([], 50))
+
+    def test_jsonl_records_and_summary(self):
+        metrics = RunMetrics()
+        metrics.file("a", file="a.xls", month="January 2025",
+                     download_status=DOWNLOADED, download_seconds=0.2,
+                     download_bytes=100, parse_seconds=0.5, rows_extracted=3,
+                     rows_written=3, db_seconds=0.1, outcome="ingested")
+        metrics.file("b", file="b.xls", month="February 2025",
+                     download_status=MISSING, download_seconds=0.4)
+        metrics.file("b", outcome="skipped", reason="HTTP 404")
+        with metrics.stage("download"):
+            pass
+
+        handle = io.StringIO()
+        metrics.write_jsonl(handle)
+        lines = [json.loads(line) for line in handle.getvalue().splitlines()]
+
+        self.assertEqual([line["type"] for line in lines], ["file", "file", "summary"])
+        self.assertEqual(lines[1]["reason"], "HTTP 404")
+
+        summary = lines[-1]
+        self.assertEqual(summary["outcomes"], {"ingested": 1, "skipped": 1})
+        self.assertEqual(summary["rows_written"], 3)
+        self.assertEqual(summary["timings"]["download_seconds"]["count"], 2)
+        self.assertAlmostEqual(summary["timings"]["download_seconds"]["p50"], 0.3)
+        self.assertEqual(summary["timings"]["parse_seconds"]["count"], 1)
+        self.assertIn("download", summary["stage_seconds"])
+
+
+# ======================================================
+# ANALYTICS
+# ======================================================
+
+class AmfiAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        small, large, mid, gilt = (
+            scheme_category(name)
+            for name in ["Small Cap Fund", "Large Cap Fund", "Mid Cap Fund", "Gilt Fund"]
+        )
+        rows = []
+        for i in range(24):
+            month = f"{['January', 'February'][i % 2]} {2000 + i}"
+            rows += [
+                AmfiMonthlyData(month=month, category=small, net_inflow=i),
+                AmfiMonthlyData(month=month, category=large, net_inflow=10),
+                AmfiMonthlyData(month=month, category=mid, net_inflow=0.5),
+                AmfiMonthlyData(month=month, category=gilt, net_inflow=99),
+            ]
+        AmfiMonthlyData.objects.bulk_create(rows)
+        rebuild_bucket_summaries()
+        cls.months = sorted({row.month for row in rows})
+
+    def test_many_months_in_one_query(self):
+        with self.assertNumQueries(1):
+            summaries = monthly_summaries(self.months)
+
+        self.assertEqual(len(summaries), 24)
+        self.assertEqual(
+            summaries["January 2004"],
+            {"month": "January 2004", "small_cap": 4, "large_midcap": 10.5},
+        )
+
+    def test_single_month_and_missing_month(self):
+        self.assertEqual(monthly_amfi_summary("February 2001")["small_cap"], 1)
+        self.assertEqual(
+            monthly_amfi_summary("March 1999"),
+            {"month": "March 1999", "small_cap": 0, "large_midcap": 0},
+        )
+
+    def test_compare_is_one_query(self):
+        with self.assertNumQueries(1):
+            result = compare_two_months("January 2000", "January 2010")
+
+        self.assertEqual(result["small_cap_change"], 10)
+        self.assertEqual(result["large_midcap_change"], 0)
+        self.assertEqual(
+            compare_two_months("January 2000", "March 1999"),
+            {"error": "No data for March 1999"},
+        )
+
+    def test_summaries_endpoint(self):
+        response = self.client.get(
+            "/api/amfi/summaries/",
+            {"months": ["January 2000,February 2001", "March 1999"]},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(
+            [s["month"] for s in body["summaries"]], ["January 2000", "February 2001"]
+        )
+        self.assertEqual(body["missing"], ["March 1999"])
+
+    def test_summaries_endpoint_requires_months(self):
+        response = self.client.get("/api/amfi/summaries/")
+
+        self.assertEqual(response.status_code, 400)
+
+
+class BucketSummaryTests(TestCase):
+    def test_ingest_refreshes_touched_month(self):
+        upsert_month("March 2025", [("Small Cap Fund", 5.0), ("ELSS", 2.0)])
+        upsert_month("March 2025", [("Small Cap Fund", 7.5)])
+
+        self.assertEqual(
+            monthly_amfi_summary("March 2025"),
+            {"month": "March 2025", "small_cap": 7.5, "large_midcap": 2.0},
+        )
+        self.assertEqual(
+            MonthlyBucketSummary.objects.filter(month="March 2025").count(), 2
+        )
+
+    def test_month_without_bucket_categories_is_present(self):
+        upsert_month("March 2025", [("Gilt Fund", 5.0)])
+
+        self.assertIn("March 2025", monthly_summaries(["March 2025"]))
+
+    def test_model_writes_refresh_summaries(self):
+        version = current_version()[0]
+        row = AmfiMonthlyData.objects.create(
+            month="March 2025", category=scheme_category("Small Cap Fund"), net_inflow=5.0
+        )
+        self.assertEqual(monthly_amfi_summary("March 2025")["small_cap"], 5.0)
+        self.assertGreater(current_version()[0], version)
+
+        row.month = "April 2025"
+        row.save()
+        self.assertNotIn("March 2025", monthly_summaries(["March 2025"]))
+        self.assertEqual(monthly_amfi_summary("April 2025")["small_cap"], 5.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            row.delete()
+        self.assertFalse(MonthlyBucketSummary.objects.exists())
+
+    def test_queryset_delete_refreshes_each_month_once(self):
+        for month in ("March 2025", "April 2025"):
+            upsert_month(month, [(f"Category {n}", 1.0) for n in range(20)]
+                         + [("Small Cap Fund", 5.0)])
+        version = current_version()[0]
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                AmfiMonthlyData.objects.exclude(
+                    category__name="Small Cap Fund", month="April 2025"
+                ).delete()
+
+        self.assertEqual(current_version()[0], version + 1)
+        self.assertLessEqual(len(queries), 8)
+        self.assertNotIn("March 2025", monthly_summaries(["March 2025"]))
+        self.assertEqual(monthly_amfi_summary("April 2025")["small_cap"], 5.0)
+
+    def test_rebuild_command(self):
+        AmfiMonthlyData.objects.bulk_create([
+            AmfiMonthlyData(month="May 2025", period=date(2025, 5, 1),
+                            category=scheme_category("Small Cap Fund"), net_inflow=3.0),
+        ])
+        MonthlyBucketSummary.objects.create(month="Gone 1999", bucket="small_cap")
+        out = io.StringIO()
+
+        call_command("rebuild_amfi_summaries", stdout=out)
+
+        self.assertEqual(monthly_amfi_summary("May 2025")["small_cap"], 3.0)
+        self.assertFalse(MonthlyBucketSummary.objects.filter(month="Gone 1999").exists())
+        self.assertIn("2 summary row(s)", out.getvalue())
+
+
+class ApiResponseCacheTests(TestCase):
+    url = "/api/amfi/summary/"
+
+    def setUp(self):
+        cache.clear()
+        upsert_month("March 2025", [("Small Cap Fund", 5.0)])
+
+    def test_repeat_request_is_served_from_cache(self):
+        first = self.client.get(self.url, {"month": "March 2025"})
+
+        # only the dataset version is read
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url, {"month": "March 2025"})
+
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertIn("Last-Modified", second)
+
+    def test_conditional_requests_get_304(self):
+        first = self.client.get(self.url, {"month": "March 2025"})
+
+        by_etag = self.client.get(
+            self.url, {"month": "March 2025"}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        by_date = self.client.get(
+            self.url, {"month": "March 2025"},
+            HTTP_IF_MODIFIED_SINCE=first["Last-Modified"],
+        )
+
+        self.assertEqual(by_etag.status_code, 304)
+        self.assertEqual(by_date.status_code, 304)
+        self.assertEqual(by_etag.content, b"")
+
+    def test_ingest_invalidates(self):
+        first = self.client.get(self.url, {"month": "March 2025"})
+        version = current_version()[0]
+
+        upsert_month("March 2025", [("Small Cap Fund", 8.0)])
+        second = self.client.get(
+            self.url, {"month": "March 2025"}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+
+        self.assertEqual(current_version()[0], version + 1)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()["small_cap"], 8.0)
+
+    def test_equivalent_queries_share_a_key(self):
+        a = QueryDict("months=March 2025, April 2025&x=1")
+        b = QueryDict("x=1&months=March 2025&months=April 2025")
+
+        self.assertEqual(cache_key("v", 1, a), cache_key("v", 1, b))
+        self.assertNotEqual(cache_key("v", 1, a), cache_key("v", 2, a))
+
+    def test_single_value_params_are_not_split(self):
+        upsert_month("April 2025", [("Small Cap Fund", 7.0)])
+        self.client.get(self.url, {"month": "March 2025,April 2025"})
+
+        response = self.client.get(self.url + "?month=March 2025&month=April 2025")
+
+        self.assertEqual(response.json()["month"], "April 2025")
+        self.assertEqual(response.json()["small_cap"], 7.0)
+
+    def test_errors_are_not_cached(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 400)
+
+
+class AsyncViewTests(TestCase):
+    """
+    The async (ASGI) views must answer exactly like the sync ones.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        upsert_month("March 2025", [("Small Cap Fund", 5.0), ("ELSS", 2.0)])
+        upsert_month("April 2025", [("Small Cap Fund", 7.0), ("Gilt Fund", 1.0)])
+
+    def setUp(self):
+        cache.clear()
+
+    async def assertSameAnswer(self, sync_view, async_view, params):
+        request = RequestFactory().get("/", params)
+        expected = await sync_to_async(sync_view)(request)
+        response = await async_view(AsyncRequestFactory().get("/", params))
+
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(json.loads(response.content), json.loads(expected.content))
+
+    async def test_async_views_match_sync_views(self):
+        await self.assertSameAnswer(
+            views.amfi_monthly_summary_api, views.amfi_monthly_summary_api_async,
+            {"month": "March 2025"},
+        )
+        await self.assertSameAnswer(
+            views.amfi_monthly_summaries_api, views.amfi_monthly_summaries_api_async,
+            {"months": "March 2025,April 2025,May 2025"},
+        )
+        await self.assertSameAnswer(
+            views.amfi_compare_api, views.amfi_compare_api_async,
+            {"from": "March 2025", "to": "April 2025"},
+        )
+        await self.assertSameAnswer(
+            views.amfi_year_summary_api, views.amfi_year_summary_api_async,
+            {"year": "2025"},
+        )
+        await self.assertSameAnswer(
+            views.amfi_year_summary_api, views.amfi_year_summary_api_async,
+            {"from": "2024", "to": "2025", "format": "columnar"},
+        )
+        await self.assertSameAnswer(
+            views.amfi_timeseries_api, views.amfi_timeseries_api_async,
+            {"bucket": "small_cap", "windows": "2"},
+        )
+
+    async def test_async_views_validate_params(self):
+        response = await views.amfi_compare_api_async(AsyncRequestFactory().get("/"))
+
+        self.assertEqual(response.status_code, 400)
+
+    async def test_async_conditional_request(self):
+        view = views.amfi_monthly_summary_api_async
+        first = await view(AsyncRequestFactory().get("/", {"month": "March 2025"}))
+        second = await view(AsyncRequestFactory().get(
+            "/", {"month": "March 2025"}, headers={"If-None-Match": first["ETag"]}
+        ))
+
+        self.assertEqual(second.status_code, 304)
+
+
+class ReportingPeriodTests(TestCase):
+    def test_parses_every_stored_label_format(self):
+        self.assertEqual(parse_month_label("November 2025"), date(2025, 11, 1))
+        self.assertEqual(parse_month_label("Nov 2025"), date(2025, 11, 1))
+        self.assertEqual(parse_month_label("2025-11"), date(2025, 11, 1))
+        self.assertIsNone(parse_month_label("sometime"))
+
+    def test_save_derives_period(self):
+        row = AmfiMonthlyData.objects.create(
+            month="2024-02", category=scheme_category("ELSS"), net_inflow=1.0
+        )
+
+        self.assertEqual(row.period, date(2024, 2, 1))
+
+    def test_year_pivot_is_in_calendar_order(self):
+        for month in ["December 2024", "2024-02", "April 2024", "January 2025"]:
+            AmfiMonthlyData.objects.create(
+                month=month, category=scheme_category("ELSS"), net_inflow=1.0
+            )
+
+        pivot = amfi_year_pivot("2024")
+
+        self.assertEqual(pivot["months"], ["2024-02", "2024-04", "2024-12"])
+        self.assertEqual(pivot["matrix"]["2024-12"], {"ELSS": 1.0})
+
+    def test_columnar_pivot_spans_years(self):
+        for month, category, value in [
+            ("December 2023", "ELSS", 1.0),
+            ("2024-02", "Gilt Fund", 2.0),
+            ("January 2024", "ELSS", 3.0),
+            ("January 2026", "ELSS", 9.0),
+        ]:
+            AmfiMonthlyData.objects.create(
+                month=month, category=scheme_category(category), net_inflow=value
+            )
+
+        with self.assertNumQueries(1):
+            pivot = amfi_pivot_columnar(2023, 2024)
+
+        self.assertEqual(pivot["months"], ["2023-12", "2024-01", "2024-02"])
+        self.assertEqual(pivot["categories"], ["ELSS", "Gilt Fund"])
+        self.assertEqual(pivot["values"], [[1.0, None], [3.0, None], [None, 2.0]])
+
+    def test_year_summary_endpoint_formats(self):
+        cache.clear()
+        AmfiMonthlyData.objects.create(
+            month="March 2024", category=scheme_category("ELSS"), net_inflow=1.0
+        )
+
+        columnar = self.client.get(
+            "/api/amfi/year-summary/", {"from": "2023", "to": "2024"}
+        )
+        matrix = self.client.get("/api/amfi/year-summary/", {"year": "2024"})
+        mixed = self.client.get(
+            "/api/amfi/year-summary/", {"from": "2023", "to": "2024", "format": "matrix"}
+        )
+
+        self.assertEqual(columnar.json()["values"], [[1.0]])
+        self.assertEqual(matrix.json()["matrix"], {"2024-03": {"ELSS": 1.0}})
+        self.assertEqual(mixed.status_code, 400)
+
+    def test_year_summary_rejects_years_outside_date_range(self):
+        cache.clear()
+        for params in (
+            {"year": "0"},
+            {"from": "9990", "to": "10000", "format": "columnar"},
+        ):
+            response = self.client.get("/api/amfi/year-summary/", params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("years must be numbers", response.json()["error"])
+
+
+# ======================================================
+# TIME SERIES
+# ======================================================
+
+class TimeseriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Small Cap: 1..24 over 2023-2024, June 2023 missing; Mid Cap: 10 a month
+        for i in range(24):
+            period = date(2023 + i // 12, i % 12 + 1, 1)
+            rows = [("Mid Cap Fund", 10.0)]
+            if period != date(2023, 6, 1):
+                rows.append(("Small Cap Fund", float(i + 1)))
+            upsert_month(period.strftime("%B %Y"), rows)
+
+    def setUp(self):
+        cache.clear()
+
+    def series(self, result, name):
+        return next(s for s in result["series"] if s["name"] == name)
+
+    def test_windows_yoy_and_cumulative(self):
+        result = amfi_timeseries(categories=["Small Cap Fund"], windows=[3])
+        small = self.series(result, "Small Cap Fund")
+
+        self.assertEqual(len(result["months"]), 24)
+        self.assertEqual(small["net_inflow"][:3], [1.0, 2.0, 3.0])
+        # incomplete windows (start of history, the June gap) are null
+        self.assertEqual(small["rolling"]["3"][:4], [None, None, 6.0, 9.0])
+        self.assertEqual(small["rolling"]["3"][5:9], [None, None, None, 24.0])
+        self.assertEqual(small["yoy_change"][11], None)
+        self.assertEqual(small["yoy_change"][12], 12.0)
+        self.assertEqual(small["yoy_pct"][12], 1200.0)
+        self.assertEqual(small["cumulative"][4], 15.0)
+        self.assertEqual(small["cumulative"][5], None)
+        self.assertEqual(small["cumulative"][6], 22.0)
+
+    def test_buckets_by_default(self):
+        result = amfi_timeseries()
+
+        self.assertEqual(
+            [s["name"] for s in result["series"]], ["small_cap", "large_midcap"]
+        )
+        self.assertEqual(self.series(result, "large_midcap")["rolling"]["12"][11], 120.0)
+
+    def test_range_keeps_lookback(self):
+        result = amfi_timeseries(
+            buckets=["small_cap"], from_period=date(2024, 1, 1),
+            to_period=date(2024, 3, 1), windows=[3],
+        )
+        small = self.series(result, "small_cap")
+
+        self.assertEqual(result["months"], ["2024-01", "2024-02", "2024-03"])
+        self.assertEqual(small["rolling"]["3"], [36.0, 39.0, 42.0])
+        self.assertEqual(small["cumulative"], [13.0, 27.0, 42.0])
+
+    def test_matrix_is_loaded_once_per_dataset_version(self):
+        with self.assertNumQueries(2):
+            amfi_timeseries(buckets=["small_cap"])
+        with self.assertNumQueries(1):
+            amfi_timeseries(categories=["Mid Cap Fund"])
+
+        upsert_month("January 2025", [("Small Cap Fund", 50.0)])
+
+        result = amfi_timeseries(buckets=["small_cap"])
+        self.assertEqual(result["months"][-1], "2025-01")
+
+    def test_endpoint(self):
+        response = self.client.get(
+            "/api/amfi/timeseries/", {"bucket": "small_cap", "from": "2024-12"}
+        )
+        unknown = self.client.get("/api/amfi/timeseries/", {"category": "Nope"})
+        bad_window = self.client.get("/api/amfi/timeseries/", {"windows": "0"})
+
+        self.assertEqual(response.json()["months"], ["2024-12"])
+        self.assertEqual(response.json()["windows"], [3, 6, 12])
+        self.assertEqual(unknown.status_code, 400)
+        self.assertEqual(bad_window.status_code, 400)
+
+
+# ======================================================
+# EXPORT
+# ======================================================
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        upsert_month("December 2023", [("Small Cap Fund", 1.0), ("Gilt Fund", 9.0)])
+        upsert_month("January 2024", [("Small Cap Fund", 2.0), ("ELSS", 3.5)])
+        upsert_month("February 2024", [("Mid Cap Fund", None)])
+
+    def get(self, **params):
+        response = self.client.get("/api/amfi/export/", params)
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content)
+
+    def test_csv_streams_in_chunks(self):
+        with mock.patch.object(amfi_export, "EXPORT_CHUNK_SIZE", 2):
+            response, _ = self.get()
+            chunks = list(self.client.get("/api/amfi/export/").streaming_content)
+
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+        self.assertTrue(response.streaming)
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(rows[0], amfi_export.COLUMNS)
+        self.assertEqual(rows[1], ["December 2023", "2023-12-01", "Small Cap Fund", "small_cap", "1.0"])
+        self.assertEqual(len(rows), 6)
+        self.assertIn('filename="amfi-export.csv"', response["Content-Disposition"])
+
+    def test_filters(self):
+        _, body = self.get(format="ndjson", year="2024", bucket="small_cap")
+        records = [json.loads(line) for line in body.decode().splitlines()]
+
+        self.assertEqual(records, [{
+            "month": "January 2024", "period": "2024-01-01",
+            "category": "Small Cap Fund", "bucket": "small_cap", "net_inflow": 2.0,
+        }])
+
+        _, body = self.get(format="ndjson", category="Gilt Fund,Mid Cap Fund")
+        self.assertEqual(len(body.splitlines()), 2)
+
+    def test_gzip(self):
+        response, body = self.get(compress="gzip", **{"from": "2024", "to": "2024"})
+        _, plain = self.get(**{"from": "2024", "to": "2024"})
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn("amfi-export-2024-2024.csv.gz", response["Content-Disposition"])
+        self.assertEqual(gzip.decompress(body), plain)
+
+    @skipUnless(amfi_export.parquet_available(), "pyarrow not installed")
+    def test_parquet(self):
+        import pyarrow.parquet as pq
+
+        with mock.patch.object(amfi_export, "EXPORT_CHUNK_SIZE", 2):
+            _, body = self.get(format="parquet")
+        table = pq.read_table(io.BytesIO(body))
+
+        self.assertEqual(table.column_names, amfi_export.COLUMNS)
+        self.assertEqual(pq.ParquetFile(io.BytesIO(body)).num_row_groups, 3)
+        self.assertEqual(table.column("net_inflow").to_pylist(), [1.0, 9.0, 3.5, 2.0, None])
+
+    def test_conditional_request_and_bad_params(self):
+        response, _ = self.get()
+        again = self.client.get("/api/amfi/export/", headers={"If-None-Match": response["ETag"]})
+
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(self.client.get("/api/amfi/export/", {"format": "xml"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/amfi/export/", {"bucket": "gilt"}).status_code, 400)
+
+    def test_year_params_are_range_checked(self):
+        for params, error in [
+            ({"year": "99999"}, "years must be numbers"),
+            ({"year": "0"}, "years must be numbers"),
+            ({"to": "2025"}, "from (or year) is required with to"),
+            ({"from": "2025", "to": "2024"}, "from must not be after to"),
+        ]:
+            response = self.client.get("/api/amfi/export/", params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn(error, response.json()["error"])
+
+    async def test_async_view_streams_the_same_bytes(self):
+        params = {"format": "ndjson", "compress": "gzip"}
+        expected = await sync_to_async(
+            lambda: b"".join(views.amfi_export_api(RequestFactory().get("/", params)))
+        )()
+        response = await views.amfi_export_api_async(AsyncRequestFactory().get("/", params))
+
+        self.assertTrue(response.is_async)
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(gzip.decompress(body), gzip.decompress(expected))
+
+
+class SqlitePragmasTests(SimpleTestCase):
+    def connect(self):
+        wrapper = mock.Mock(vendor="sqlite", connection=sqlite3.connect(":memory:"))
+        self.addCleanup(wrapper.connection.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        return wrapper.connection.execute(f"PRAGMA {name}").fetchone()[0]
+
+    @override_settings(AMFI_SQLITE_PRAGMAS={"busy_timeout": 5000, "temp_store": "MEMORY"})
+    def test_pragmas_run_on_new_sqlite_connections(self):
+        wrapper = self.connect()
+        apply_sqlite_pragmas(sender=None, connection=wrapper)
+
+        self.assertEqual(self.pragma(wrapper, "busy_timeout"), 5000)
+        # 2 = MEMORY
+        self.assertEqual(self.pragma(wrapper, "temp_store"), 2)
+
+    @override_settings(AMFI_SQLITE_PRAGMAS={})
+    def test_default_profile_leaves_connections_alone(self):
+        wrapper = self.connect()
+        apply_sqlite_pragmas(sender=None, connection=wrapper)
+
+        self.assertEqual(self.pragma(wrapper, "temp_store"), 0)
+
+
+class AdminChangelistTests(TestCase):
+    url = "/admin/market_data/amfimonthlydata/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("admin", password="admin")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def ingest(self, months, first_year=2020):
+        for n in range(months):
+            label = f"{date(first_year + n // 12, n % 12 + 1, 1):%B %Y}"
+            upsert_month(label, [
+                ("Small Cap Fund", float(n)),
+                ("Mid Cap Fund", 1.0),
+                (f"Category {n % 5}", 2.0),
+            ])
+
+    def warm_queries(self, params):
+        self.client.get(self.url, params)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [query["sql"] for query in queries]
+
+    def test_warm_changelist_queries_do_not_grow_with_the_table(self):
+        self.ingest(12)
+        small = self.warm_queries({"year": "2020"})
+
+        self.ingest(60, first_year=2021)
+        large = self.warm_queries({"year": "2020"})
+
+        # session, user, the dataset version (for each filter and the
+        # count) and the page itself
+        self.assertEqual(len(small), 6)
+        self.assertEqual(len(large), len(small))
+        for sql in large:
+            self.assertNotIn("COUNT(", sql)
+            self.assertNotIn("DISTINCT", sql)
+            # no "-pk" tie-break, which SQLite has to sort for
+            self.assertNotIn("DESC", sql)
+
+    def test_filter_lookups_follow_ingest(self):
+        self.ingest(3)
+        self.assertEqual(period_index(), {2020: [1, 2, 3]})
+
+        response = self.client.get(self.url, {"year": "2020", "month_num": "2"})
+        self.assertEqual(response.context["cl"].result_count, 3)
+        self.assertContains(response, "?month_num=3&amp;year=2020")
+
+        self.ingest(1, first_year=2026)
+        response = self.client.get(self.url)
+
+        self.assertContains(response, "?year=2026")
+        self.assertEqual(response.context["cl"].result_count, 12)
+
+    def test_delete_selected_refreshes_months_once(self):
+        self.ingest(3)
+        version = current_version()[0]
+        selected = AmfiMonthlyData.objects.filter(period__month__in=[1, 2])
+
+        response = self.client.post(self.url, {
+            "action": "delete_selected",
+            "_selected_action": list(selected.values_list("pk", flat=True)),
+            "post": "yes",
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(current_version()[0], version + 1)
+        self.assertEqual(
+            set(MonthlyBucketSummary.objects.values_list("month", flat=True)),
+            {"March 2020"},
+        )
+
+
+def nsdl_page(end, rows):
+    """
+    A minimal NSDL sector page for the fortnight ending ``end``: AUC and
+    net investment, INR and USD, Equity and Debt VRR plus Total columns.
+    ``rows`` are (sector, auc, net_investment) strings for the INR Equity
+    column; every other cell is 1.
+    """
+    periods = [
+        f"AUC as on {end:%B %d, %Y}",
+        f"Net Investment {end:%B} {fortnight_start(end).day}-{end:%d, %Y}",
+    ]
+    cell = lambda text, span=1: f'<td colspan="{span}">{text}</td>'
+    header = [
+        cell("") * 2 + "".join(cell(p, 6) for p in periods),
+        cell("") * 2 + (cell("IN INR Cr.", 3) + cell("IN USD Mn", 3)) * 2,
+        cell("") * 2 + (cell("Equity") + cell("Debt") + cell("")) * 4,
+        cell("Sr. No.") + cell("Sectors") + (cell("Equity") + cell("Debt VRR") + cell("Total")) * 4,
+    ]
+    body = [
+        cell(i) + cell(sector) + "".join(
+            cell(value) + cell("1") + cell("x") + cell("1") * 3 for value in (auc, net)
+        )
+        for i, (sector, auc, net) in enumerate(rows, 1)
+    ]
+    body.append(cell("") + cell("Grand Total") + cell("9,99,999") * 12)
+    return "<table>" + "".join(f"<tr>{row}</tr>" for row in header + body) + "</table>"
+
+
+class NsdlFiiTests(TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def fetch(self, html):
+        path = self.tmp_dir / "page.html"
+        path.write_text(html)
+        out = io.StringIO()
+        call_command("fetch_nsdl_fii", file=path, stdout=out)
+        return out.getvalue()
+
+    def test_spans_are_expanded(self):
+        tables = html_tables(
+            "<table><tr><td rowspan=2>a</td><td colspan=2>b &amp; c</td></tr>"
+            "<tr><td>d</td><td>e</td></tr></table>"
+        )
+        self.assertEqual(tables, [[["a", "b & c", "b & c"], ["a", "d", "e"]]])
+
+    @skipUnless(lxml_available(), "lxml not installed")
+    def test_lxml_rows_match_stdlib_tables(self):
+        page = (
+            "<table><tr><td>other</td></tr></table>"
+            "<table><tr><td rowspan=2>a</td><td colspan=2>b<br>c</td></tr>"
+            "<tr><td>Sectors</td><td>d</td></tr>"
+            "<tr><td><table><tr><td>nested</td></tr></table></td><td>e</td></tr></table>"
+            "<table><tr><td>Sectors</td></tr></table>"
+        )
+        rows = list(lxml_sector_rows(page))
+
+        # nested tables keep their own text, as in html_tables(), which
+        # lists them before the table they sit in
+        self.assertEqual(rows, [["a", "b c", "b c"], ["a", "Sectors", "d"], ["", "e"]])
+        self.assertEqual(rows, html_tables(page)[2])
+
+    @skipUnless(SAMPLE_NSDL_PAGE.exists(), "sample NSDL page not checked in")
+    def test_sample_page(self):
+        html = SAMPLE_NSDL_PAGE.read_text(encoding="utf-8")
+        report = parse_fii_report(html, STDLIB_PARSER)
+        if lxml_available():
+            self.assertEqual(parse_fii_report(html.encode(), LXML_PARSER), report)
+
+        self.assertEqual(report.fortnights, {
+            date(2025, 11, 30): date(2025, 11, 16),
+            date(2025, 12, 15): date(2025, 12, 1),
+        })
+        # 24 sectors x 11 asset classes x 2 currencies per fortnight
+        self.assertEqual(len(report.rows), 2 * 24 * 11 * 2)
+        self.assertIn(
+            (date(2025, 11, 30), "Automobile and Auto Components", "equity", "INR", 571606.0, -1257.0),
+            report.rows,
+        )
+        # the page's Grand Total, up to its rounding
+        total = sum(
+            row[4] for row in report.rows
+            if row[0] == date(2025, 11, 30) and row[2:4] == ("equity", "INR")
+        )
+        self.assertAlmostEqual(total, 7457871, delta=12)
+
+    def test_command_is_idempotent_and_merges_overlapping_pages(self):
+        first = nsdl_page(date(2025, 11, 30), [
+            ("Capital Goods", "4,18,470", "-1,257"),
+            ("Power", "2,33,495", "(35)"),
+        ])
+        out = self.fetch(first)
+
+        self.assertIn("Rows inserted: 8", out)
+        self.assertIn("Nov 16-30, 2025", out)
+        row = FiiSectorInvestment.objects.get(
+            sector__name="Capital Goods", asset_class="equity", currency="INR"
+        )
+        self.assertEqual((row.auc, row.net_investment), (418470.0, -1257.0))
+        self.assertEqual(row.fortnight.period, date(2025, 11, 1))
+
+        self.assertIn("unchanged: 8", self.fetch(first))
+
+        revised = first.replace("(35)", "-40")
+        self.assertIn("updated: 1, unchanged: 7", self.fetch(revised))
+        self.assertEqual(FiiSectorInvestment.objects.count(), 8)
+
+    def test_fii_flows_alongside_amfi(self):
+        upsert_month("November 2025", [("Small Cap Fund", 4000.0)])
+        self.fetch(nsdl_page(date(2025, 11, 30), [
+            ("Capital Goods", "10", "-1,000"),
+            ("Power", "10", "250.5"),
+        ]))
+
+        self.assertEqual(amfi_vs_fii(2025), [
+            {"month": "2025-11", "small_cap": 4000.0, "large_midcap": 0.0, "fii_equity": -749.5},
+        ])
+
+
+
+class NsdlCrawlerTests(StandInServerMixin, TestCase):
+    ROWS = [("Capital Goods", "4,18,470", "-1,257"), ("Power", "2,33,495", "(35)")]
+
+    def serve(self, ends):
+        for end in ends:
+            self.server.files[f"/{report_name(end)}"] = nsdl_page(end, self.ROWS).encode()
+
+    def backfill(self, since, until, **options):
+        out = io.StringIO()
+        call_command(
+            "fetch_nsdl_fii", f"--since={since}", f"--until={until}", base_url=self.base_url,
+            download_dir=self.tmp_dir, rate_limit=0, stdout=out, **options
+        )
+        return out.getvalue()
+
+    def test_fortnight_ends(self):
+        self.assertEqual(
+            fortnight_ends(date(2024, 1, 10), date(2024, 3, 14)),
+            [date(2024, 1, 15), date(2024, 1, 31), date(2024, 2, 15), date(2024, 2, 29)],
+        )
+        self.assertEqual(fortnight_ends(date(2024, 1, 16), date(2024, 1, 30)), [])
+        self.assertEqual(latest_fortnight_end(date(2025, 3, 10)), date(2025, 2, 28))
+        self.assertEqual(latest_fortnight_end(date(2025, 3, 16)), date(2025, 3, 15))
+        self.assertEqual(
+            report_url(date(2025, 12, 15), "http://host/reports/"),
+            "http://host/reports/FIIInvestSector_Dec152025.html",
+        )
+
+    def test_backfill_stores_every_published_fortnight(self):
+        ends = fortnight_ends(date(2024, 1, 1), date(2024, 3, 31))
+        self.serve(ends[:3] + ends[4:])
+
+        out = self.backfill("2024-01-01", "2024-03-31", concurrency=3)
+
+        self.assertIn("Pages: 6 (ingested: 5, skipped: 1)", out)
+        self.assertIn("Not stored: Feb 29, 2024", out)
+        self.assertEqual(
+            sorted(FiiFortnight.objects.values_list("end", flat=True)),
+            ends[:3] + ends[4:],
+        )
+        self.assertEqual(FiiSectorInvestment.objects.count(), 5 * 8)
+        # one request per page, all in the browser-like headers
+        self.assertEqual(len(self.server.requests), 6)
+        self.assertTrue(all(
+            headers["User-Agent"].startswith("Mozilla/") for _, headers in self.server.requests
+        ))
+
+    def test_interrupted_backfill_resumes(self):
+        ends = fortnight_ends(date(2024, 1, 1), date(2024, 3, 31))
+        self.serve(ends)
+        seen = []
+
+        def interrupt(page):
+            seen.append(page)
+            if len(seen) == 2:
+                raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            crawl(
+                ends, base_url=self.base_url, download_dir=self.tmp_dir,
+                rate_limit=0, batch_size=2, progress=interrupt,
+            )
+        self.assertEqual(FiiFortnight.objects.count(), 2)
+        self.server.requests.clear()
+
+        out = self.backfill("2024-01-01", "2024-03-31", batch_size=2)
+
+        self.assertIn("Pages: 6 (checkpointed: 2, ingested: 4)", out)
+        self.assertEqual(
+            sorted(path for path, _ in self.server.requests),
+            sorted(f"/{report_name(end)}" for end in ends[2:]),
+        )
+        self.assertEqual(FiiFortnight.objects.count(), 6)
+
+    def test_unchanged_pages_are_skipped_by_content_hash(self):
+        ends = fortnight_ends(date(2024, 1, 1), date(2024, 1, 31))
+        self.serve(ends)
+        self.backfill("2024-01-01", "2024-01-31")
+        # forget the ETags: the pages come back in full and are rewritten
+        (self.tmp_dir / META_FILENAME).unlink()
+
+        with CaptureQueriesContext(connection) as queries:
+            out = self.backfill("2024-01-01", "2024-01-31", recheck=True)
+
+        self.assertIn("Pages: 2 (unchanged: 2)", out)
+        self.assertIn("Rows inserted: 0, updated: 0, unchanged: 0", out)
+        self.assertFalse([
+            q for q in queries.captured_queries
+            if "fii" in q["sql"].lower() and not q["sql"].startswith("SELECT")
+        ])
+        self.assertEqual(len(self.server.requests), 4)
+
+        self.server.files[f"/{report_name(ends[1])}"] = nsdl_page(
+            ends[1], [("Capital Goods", "4,18,470", "-1,300"), self.ROWS[1]]
+        ).encode()
+        out = self.backfill("2024-01-01", "2024-01-31", recheck=True)
+        self.assertIn("Pages: 2 (ingested: 1, unchanged: 1)", out)
+        self.assertIn("updated: 1", out)
+
+
+def usd_workbook(path, sectors=(("Capital Goods", 12.5, "-1,257"), ("Power", 3, "(35)"))):
+    """
+    A small NSDL sector sheet: Sr. No., Sectors, then an INR and a USD
+    block (Equity, Debt) with the period label merged over all four.
+    Sector names are bold, their odd rows shaded.
+    """
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["", "", "AUC as on December 15, 2025", None, None, None])
+    ws.merge_cells("C1:F1")
+    ws.append(["", "", "IN INR Cr.", None, "IN USD Mn", None])
+    ws.append(["", "", "Equity", "Debt", "Equity", "Debt"])
+    ws.append(["Sr. No.", "Sectors", "Equity", "Debt", "Equity", "Debt"])
+    for n, (sector, equity, debt) in enumerate(sectors, 1):
+        ws.append([n, sector, 1000, 1000, equity, debt])
+        ws.cell(ws.max_row, 2).font = Font(bold=True)
+        if n % 2:
+            ws.cell(ws.max_row, 2).fill = PatternFill("solid", start_color="FFF2CC")
+    ws.append([None, "Grand Total", 2000, 2000, "A very long total label indeed", 0])
+    wb.save(path)
+    return path
+
+
+class NsdlUsdExtractTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.source = usd_workbook(self.tmp_dir / "NSDL_FII_test.xlsx")
+
+    def test_styled_workbook_keeps_sectors_and_usd_columns(self):
+        output = self.tmp_dir / "usd.xlsx"
+        result = nsdl_usd_extract.write_usd_workbook(self.source, output)
+
+        self.assertEqual((result.layout.header_row, result.layout.usd_col), (2, 5))
+        self.assertEqual(result.rows, 7)
+        ws = openpyxl.load_workbook(output).active
+        self.assertEqual(ws.title, nsdl_usd_extract.SHEET_TITLE)
+        self.assertEqual(
+            [list(row) for row in ws.iter_rows(min_row=2, max_row=5, values_only=True)],
+            [
+                [None, None, "IN USD Mn", None],
+                [None, None, "Equity", "Debt"],
+                ["Sr. No.", "Sectors", "Equity", "Debt"],
+                [1, "Capital Goods", 12.5, "-1,257"],
+            ],
+        )
+
+        header, bold, plain = ws["C1"], ws["B5"], ws["B6"]
+        self.assertTrue(header.font.bold)
+        self.assertEqual(header.fill.fgColor.rgb, "00B8CCE4")
+        self.assertTrue(header.alignment.wrap_text)
+        self.assertTrue(bold.font.bold)
+        self.assertEqual(bold.fill.fgColor.rgb, "00FFF2CC")
+        self.assertEqual(plain.fill.fill_type, None)
+
+        # widths from the same pass: min 12, longest value + 2, max 50
+        self.assertEqual(ws.column_dimensions["A"].width, 12)
+        self.assertEqual(ws.column_dimensions["C"].width, len("A very long total label indeed") + 2)
+        self.assertEqual(ws.column_dimensions["D"].width, 12)
+
+    def test_layout_without_usd_header(self):
+        layout = nsdl_usd_extract.find_layout([
+            ["x", "Sectors", "a", "b", "c", "d"],
+        ])
+
+        self.assertIsNone(layout.header_row)
+        self.assertEqual(layout.usd_col, 4)
+        self.assertEqual(layout.columns, [0, 1, 3, 4, 5])
+
+    def test_dataframe_has_named_typed_columns(self):
+        df = nsdl_usd_extract.usd_dataframe(self.source)
+
+        self.assertEqual(list(df.columns), [
+            "Sr. No.",
+            "Sectors",
+            "AUC as on December 15, 2025 | IN USD Mn | Equity",
+            "AUC as on December 15, 2025 | IN USD Mn | Debt",
+        ])
+        self.assertEqual(df["Sectors"].tolist(), ["Capital Goods", "Power", "Grand Total"])
+        self.assertEqual(df["Sr. No."].tolist(), ["1", "2", None])
+        self.assertEqual(df["AUC as on December 15, 2025 | IN USD Mn | Debt"].tolist(), [-1257.0, -35.0, 0.0])
+        self.assertTrue(pd.isna(df["AUC as on December 15, 2025 | IN USD Mn | Equity"].iloc[2]))
+
+    @skipUnless(nsdl_usd_extract.parquet_available(), "pyarrow not installed")
+    def test_parquet_matches_dataframe(self):
+        import pyarrow.parquet as pq
+
+        output = self.tmp_dir / "usd.parquet"
+        rows = nsdl_usd_extract.write_usd_parquet(self.source, output, chunk_size=2)
+
+        self.assertEqual(rows, 3)
+        self.assertEqual(pq.ParquetFile(output).num_row_groups, 2)
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(output), nsdl_usd_extract.usd_dataframe(self.source)
+        )
@@ -1,46 +1,401 @@
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from market_data.services.amfi_analytics import (
     monthly_amfi_summary,
+    monthly_summaries,
     compare_two_months
 )
-from market_data.services.amfi_analytics import amfi_year_pivot
+from market_data.services.amfi_analytics import amfi_pivot_columnar, amfi_year_pivot
+from market_data.services.amfi_analytics import (
+    aamfi_pivot_columnar,
+    aamfi_year_pivot,
+    acompare_two_months,
+    amonthly_amfi_summary,
+    amonthly_summaries,
+)
+from market_data.services.amfi_analytics import BUCKETS
+from market_data.services.amfi_api_cache import (
+    acurrent_version,
+    cached_api,
+    current_version,
+    not_modified,
+    set_validators,
+    versioned_etag,
+)
+from market_data.services.amfi_export import (
+    EXPORT_FORMATS,
+    GZIP_CONTENT_TYPE,
+    aexport_stream,
+    export_queryset,
+    export_stream,
+    parquet_available,
+)
+from market_data.services.amfi_periods import parse_month_label
+from market_data.services.amfi_timeseries import (
+    ROLLING_WINDOWS,
+    UnknownSeries,
+    aamfi_timeseries,
+    amfi_timeseries,
+)
 
 
+# a 10-year dashboard fits comfortably
+MAX_SUMMARY_MONTHS = 120
 
-def amfi_monthly_summary_api(request):
+# keeps a columnar response to a few hundred KB
+MAX_PIVOT_YEARS = 30
+
+PIVOT_FORMATS = ["matrix", "columnar"]
+
+# what datetime.date accepts
+MIN_YEAR, MAX_YEAR = 1, 9999
+
+MAX_TIMESERIES_SERIES = 20
+
+# five years
+MAX_ROLLING_WINDOW = 60
+
+
+def _error(message):
+    return JsonResponse({"error": message}, status=400)
+
+
+# ======================================================
+# QUERY PARAMS (shared by the sync and async views)
+# ======================================================
+
+def _month_param(request):
     month = request.GET.get("month")
 
     if not month:
-        return JsonResponse(
-            {"error": "month query param is required"},
-            status=400
-        )
+        return None, _error("month query param is required")
+    return month, None
 
-    data = monthly_amfi_summary(month)
-    return JsonResponse(data)
 
+def _months_param(request):
+    """
+    ?months=November 2025,October 2025 (comma-separated and/or repeated)
+    """
+    months = [
+        month.strip()
+        for value in request.GET.getlist("months")
+        for month in value.split(",")
+        if month.strip()
+    ]
+    months = list(dict.fromkeys(months))
 
-def amfi_compare_api(request):
+    if not months:
+        return None, _error("months query param is required")
+
+    if len(months) > MAX_SUMMARY_MONTHS:
+        return None, _error(f"at most {MAX_SUMMARY_MONTHS} months per request")
+    return months, None
+
+
+def _compare_params(request):
     month_a = request.GET.get("from")
     month_b = request.GET.get("to")
 
     if not month_a or not month_b:
-        return JsonResponse(
-            {"error": "from and to query params are required"},
-            status=400
+        return None, _error("from and to query params are required")
+    return (month_a, month_b), None
+
+
+def _year(value):
+    """
+    A year query param as an int, or None unless it is a number from
+    MIN_YEAR to MAX_YEAR.
+    """
+    if not value or not value.isdigit() or not MIN_YEAR <= int(value) <= MAX_YEAR:
+        return None
+    return int(value)
+
+
+def _pivot_params(request):
+    """
+    ?year=2025                       month -> category -> value matrix
+    ?from=2021&to=2025&format=columnar
+        months[], categories[] and a dense values[month][category] array
+    """
+    year = request.GET.get("year")
+    from_year = request.GET.get("from") or year
+    to_year = request.GET.get("to") or year
+    output = request.GET.get("format") or ("matrix" if year else "columnar")
+
+    if not from_year or not to_year:
+        return None, _error("year (or from and to) query params are required")
+
+    from_year, to_year = _year(from_year), _year(to_year)
+    if from_year is None or to_year is None:
+        return None, _error(f"years must be numbers from {MIN_YEAR} to {MAX_YEAR}, e.g. 2025")
+
+    if from_year > to_year or to_year - from_year >= MAX_PIVOT_YEARS:
+        return None, _error(
+            f"from must not be after to, at most {MAX_PIVOT_YEARS} years"
         )
 
-    data = compare_two_months(month_a, month_b)
+    if output not in PIVOT_FORMATS:
+        return None, _error(f"format must be one of {', '.join(PIVOT_FORMATS)}")
+
+    if output == "matrix" and from_year != to_year:
+        return None, _error("format=matrix covers a single year; use format=columnar")
+
+    return (from_year, to_year, output), None
+
+
+def _list_param(request, name):
+    return list(dict.fromkeys(
+        part.strip()
+        for value in request.GET.getlist(name)
+        for part in value.split(",")
+        if part.strip()
+    ))
+
+
+def _timeseries_params(request):
+    """
+    ?bucket=small_cap&category=Mid Cap Fund   (comma-separated and/or repeated)
+    &from=2023-01&to=2025-12                   (YYYY-MM or "January 2023")
+    &windows=3,6,12
+    """
+    categories = _list_param(request, "category")
+    buckets = _list_param(request, "bucket")
+    if len(categories) + len(buckets) > MAX_TIMESERIES_SERIES:
+        return None, _error(f"at most {MAX_TIMESERIES_SERIES} series per request")
+
+    periods = []
+    for name in ("from", "to"):
+        value = request.GET.get(name)
+        period = parse_month_label(value) if value else None
+        if value and period is None:
+            return None, _error(f"{name} must be a month, e.g. 2025-11")
+        periods.append(period)
+
+    if periods[0] and periods[1] and periods[0] > periods[1]:
+        return None, _error("from must not be after to")
+
+    windows = _list_param(request, "windows") or [str(w) for w in ROLLING_WINDOWS]
+    if not all(w.isdigit() and 1 <= int(w) <= MAX_ROLLING_WINDOW for w in windows):
+        return None, _error(f"windows must be between 1 and {MAX_ROLLING_WINDOW} months")
+
+    return {
+        "categories": categories,
+        "buckets": buckets,
+        "from_period": periods[0],
+        "to_period": periods[1],
+        "windows": sorted({int(w) for w in windows}),
+    }, None
+
+
+def _export_params(request):
+    """
+    ?format=csv|ndjson|parquet      (default csv)
+    &year=2025 or &from=2021&to=2025 (default: all history)
+    &category=...&bucket=...         (comma-separated and/or repeated)
+    &compress=gzip
+    """
+    output = request.GET.get("format") or "csv"
+    if output not in EXPORT_FORMATS:
+        return None, _error(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    if output == "parquet" and not parquet_available():
+        return None, _error("parquet export needs pyarrow installed")
+
+    compress = request.GET.get("compress")
+    if compress not in (None, "", "gzip"):
+        return None, _error("compress must be gzip")
+
+    year = request.GET.get("year")
+    from_value = request.GET.get("from") or year
+    to_value = request.GET.get("to") or from_value
+    from_year = to_year = None
+    if to_value and not from_value:
+        return None, _error("from (or year) is required with to")
+    if from_value:
+        from_year, to_year = _year(from_value), _year(to_value)
+        if from_year is None or to_year is None:
+            return None, _error(f"years must be numbers from {MIN_YEAR} to {MAX_YEAR}, e.g. 2025")
+        if from_year > to_year:
+            return None, _error("from must not be after to")
+
+    buckets = _list_param(request, "bucket")
+    unknown = [b for b in buckets if b not in BUCKETS]
+    if unknown:
+        return None, _error(f"unknown bucket: {', '.join(unknown)}")
+
+    return {
+        "output": output,
+        "compress": compress == "gzip",
+        "filters": {
+            "from_year": from_year,
+            "to_year": to_year,
+            "categories": _list_param(request, "category"),
+            "buckets": buckets,
+        },
+    }, None
+
+
+def _export_response(request, params, version, updated_at, stream):
+    etag = versioned_etag("amfi_export_api", version, request.GET)
+    unchanged = not_modified(request, etag, updated_at)
+    if unchanged is not None:
+        return unchanged
+
+    output, compress, filters = params["output"], params["compress"], params["filters"]
+    content_type, extension = EXPORT_FORMATS[output]
+
+    name = "amfi-export"
+    if filters["from_year"] is not None:
+        name += f"-{filters['from_year']}-{filters['to_year']}"
+    name += f".{extension}"
+    if compress:
+        content_type, name = GZIP_CONTENT_TYPE, name + ".gz"
+
+    response = StreamingHttpResponse(
+        stream(output, export_queryset(**filters), compress),
+        content_type=content_type,
+    )
+    response["Content-Disposition"] = f'attachment; filename="{name}"'
+    set_validators(response, etag, updated_at)
+    return response
+
+
+def _summaries_payload(months, summaries):
+    return {
+        "summaries": [summaries[m] for m in months if m in summaries],
+        "missing": [m for m in months if m not in summaries],
+    }
+
+
+# ======================================================
+# WSGI VIEWS
+# ======================================================
+
+@cached_api
+def amfi_monthly_summary_api(request):
+    month, error = _month_param(request)
+    if error:
+        return error
+
+    data = monthly_amfi_summary(month)
     return JsonResponse(data)
 
+
+@cached_api
+def amfi_monthly_summaries_api(request):
+    months, error = _months_param(request)
+    if error:
+        return error
+
+    return JsonResponse(_summaries_payload(months, monthly_summaries(months)))
+
+
+@cached_api
+def amfi_compare_api(request):
+    params, error = _compare_params(request)
+    if error:
+        return error
+
+    data = compare_two_months(*params)
+    return JsonResponse(data)
+
+
+@cached_api
 def amfi_year_summary_api(request):
-    year = request.GET.get("year")
+    params, error = _pivot_params(request)
+    if error:
+        return error
 
-    if not year:
-        return JsonResponse(
-            {"error": "year query param is required"},
-            status=400
-        )
+    from_year, to_year, output = params
+    if output == "columnar":
+        return JsonResponse(amfi_pivot_columnar(from_year, to_year))
+
+    data = amfi_year_pivot(str(from_year))
+    return JsonResponse(data)
+
+
+@cached_api
+def amfi_timeseries_api(request):
+    params, error = _timeseries_params(request)
+    if error:
+        return error
 
-    data = amfi_year_pivot(year)
+    try:
+        return JsonResponse(amfi_timeseries(**params))
+    except UnknownSeries as e:
+        return _error(str(e))
+
+
+# streamed, so not in the response cache; conditional requests still
+# get a 304 until the dataset changes
+def amfi_export_api(request):
+    params, error = _export_params(request)
+    if error:
+        return error
+
+    return _export_response(request, params, *current_version(), export_stream)
+
+
+# ======================================================
+# ASGI VIEWS (async ORM; routed when AMFI_ASYNC_VIEWS is on)
+# ======================================================
+
+@cached_api
+async def amfi_monthly_summary_api_async(request):
+    month, error = _month_param(request)
+    if error:
+        return error
+
+    data = await amonthly_amfi_summary(month)
     return JsonResponse(data)
+
+
+@cached_api
+async def amfi_monthly_summaries_api_async(request):
+    months, error = _months_param(request)
+    if error:
+        return error
+
+    return JsonResponse(_summaries_payload(months, await amonthly_summaries(months)))
+
+
+@cached_api
+async def amfi_compare_api_async(request):
+    params, error = _compare_params(request)
+    if error:
+        return error
+
+    data = await acompare_two_months(*params)
+    return JsonResponse(data)
+
+
+@cached_api
+async def amfi_year_summary_api_async(request):
+    params, error = _pivot_params(request)
+    if error:
+        return error
+
+    from_year, to_year, output = params
+    if output == "columnar":
+        return JsonResponse(await aamfi_pivot_columnar(from_year, to_year))
+
+    data = await aamfi_year_pivot(str(from_year))
+    return JsonResponse(data)
+
+
+@cached_api
+async def amfi_timeseries_api_async(request):
+    params, error = _timeseries_params(request)
+    if error:
+        return error
+
+    try:
+        return JsonResponse(await aamfi_timeseries(**params))
+    except UnknownSeries as e:
+        return _error(str(e))
+
+
+async def amfi_export_api_async(request):
+    params, error = _export_params(request)
+    if error:
+        return error
+
+    return _export_response(request, params, *await acurrent_version(), aexport_stream)
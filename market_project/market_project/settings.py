@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -84,6 +85,58 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# AMFI API responses are keyed on a DB-stored dataset version, so any
+# backend works; use FileBasedCache to share entries between workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'market-data',
+    }
+}
+
+AMFI_API_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Route the AMFI APIs to their async (async ORM) views. asgi.py turns
+# this on; WSGI keeps the sync views, which need no event loop per request.
+AMFI_ASYNC_VIEWS = os.environ.get('AMFI_ASYNC_VIEWS') == '1'
+
+# Production SQLite profile, so API reads keep flowing while the ingest
+# cron writes: set AMFI_SQLITE_PROFILE=production on the deployed server.
+# Opt-in because journal_mode=WAL is written into the database file, and
+# the development db.sqlite3 is checked in.
+AMFI_SQLITE_PROFILE = os.environ.get('AMFI_SQLITE_PROFILE', 'default')
+
+# run on every new connection (see market_data.signals)
+AMFI_SQLITE_PRAGMAS = {}
+
+if AMFI_SQLITE_PROFILE == 'production':
+    AMFI_SQLITE_PRAGMAS = {
+        # readers see the last commit instead of waiting for the writer
+        'journal_mode': 'WAL',
+        # with WAL, fsync at checkpoints only; a power cut can lose the
+        # last commits but never corrupts the file
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        # negative = KiB, i.e. 64 MB page cache per connection
+        'cache_size': -64 * 1024,
+        # wait for the write lock instead of failing with "database is locked"
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+    }
+    DATABASES['default']['OPTIONS'] = {
+        # take the write lock at BEGIN: a deferred transaction that reads
+        # and then writes cannot wait for a busy writer and fails at once
+        'transaction_mode': 'IMMEDIATE',
+    }
+    # persistent connections for WSGI worker threads; async views get a
+    # new thread (and connection) per request, so they close instead
+    DATABASES['default']['CONN_MAX_AGE'] = 0 if AMFI_ASYNC_VIEWS else 600
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -14,17 +14,34 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
-from market_data.views import amfi_monthly_summary_api, amfi_compare_api
-from market_data.views import amfi_year_summary_api
+from market_data import views
+
+if settings.AMFI_ASYNC_VIEWS:
+    # ASGI: async ORM views (see settings.AMFI_ASYNC_VIEWS)
+    summary_api = views.amfi_monthly_summary_api_async
+    summaries_api = views.amfi_monthly_summaries_api_async
+    compare_api = views.amfi_compare_api_async
+    year_summary_api = views.amfi_year_summary_api_async
+    timeseries_api = views.amfi_timeseries_api_async
+    export_api = views.amfi_export_api_async
+else:
+    summary_api = views.amfi_monthly_summary_api
+    summaries_api = views.amfi_monthly_summaries_api
+    compare_api = views.amfi_compare_api
+    year_summary_api = views.amfi_year_summary_api
+    timeseries_api = views.amfi_timeseries_api
+    export_api = views.amfi_export_api
 
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("api/amfi/summary/", amfi_monthly_summary_api),
-    path("api/amfi/compare/", amfi_compare_api),
-    path("api/amfi/year-summary/", amfi_year_summary_api),
-
-
+    path("api/amfi/summary/", summary_api),
+    path("api/amfi/summaries/", summaries_api),
+    path("api/amfi/compare/", compare_api),
+    path("api/amfi/year-summary/", year_summary_api),
+    path("api/amfi/timeseries/", timeseries_api),
+    path("api/amfi/export/", export_api),
 ]